@@ -0,0 +1,202 @@
+import argparse
+import configparser
+import os
+import re
+import socket
+import sys
+import time
+from datetime import datetime
+import pandas as pd
+from catalog import fetch_components
+from reconcile import apply_variances
+
+# Column names accepted in count sheets (compared case-insensitively)
+CODE_COLUMNS = ('barcode', 'code', 'id', 'item', 'item id', 'sku')
+QTY_COLUMNS = ('qty', 'quantity', 'count', 'counted', 'counted qty', 'user_qty')
+SEPARATOR_RE = re.compile(r'[,;\t]')
+
+def load_config():
+    """Load configuration from config.ini"""
+    config = configparser.ConfigParser()
+    config_file = 'config.ini'
+    if not os.path.exists(config_file):
+        print(f"Error: {config_file} not found. Create it with your Supabase credentials (see README.md).")
+        sys.exit(1)
+    config.read(config_file)
+    return config
+
+def has_header(path):
+    """Check whether the first non-empty line of a counts file names its columns."""
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            if line.strip():
+                tokens = [token.strip().lower() for token in SEPARATOR_RE.split(line)]
+                return any(token in CODE_COLUMNS + QTY_COLUMNS for token in tokens)
+    return False
+
+def read_counts(path, fmt='auto'):
+    """Read a count sheet (CSV with a header) or a scanner dump into one row per code.
+
+    Scanner dumps have one scan per line, either just a code (one piece) or
+    a code and a quantity separated by a comma, semicolon or tab. Repeated
+    codes are summed. Returns (counts, invalid): counts has columns code and
+    user_qty, invalid holds the lines that could not be read.
+    """
+    if fmt == 'auto':
+        fmt = 'csv' if has_header(path) else 'dump'
+    if fmt == 'csv':
+        df = pd.read_csv(path, dtype=str, skipinitialspace=True, encoding='utf-8')
+        columns = {str(column).strip().lower(): column for column in df.columns}
+        code_column = next((columns[name] for name in CODE_COLUMNS if name in columns), None)
+        qty_column = next((columns[name] for name in QTY_COLUMNS if name in columns), None)
+        if code_column is None:
+            raise ValueError(f"{path} has no barcode or ID column")
+        codes = df[code_column]
+        qty = df[qty_column] if qty_column else pd.Series('1', index=df.index)
+    else:
+        # Dumps vary by scanner model, so split lines directly rather than as strict CSV
+        codes, quantities = [], []
+        with open(path, encoding='utf-8', errors='replace') as f:
+            for line in f:
+                fields = SEPARATOR_RE.split(line.strip())
+                if fields == ['']:
+                    continue
+                codes.append(fields[0])
+                quantities.append(fields[1] if len(fields) > 1 and fields[1].strip() else '1')
+        codes = pd.Series(codes, dtype=str)
+        qty = pd.Series(quantities, dtype=str)
+
+    counts = pd.DataFrame({
+        'code': codes.str.strip(),
+        'user_qty': pd.to_numeric(qty.str.strip(), errors='coerce')
+    })
+    bad = (counts['code'].isna() | (counts['code'] == '') | counts['user_qty'].isna()
+           | (counts['user_qty'] < 0) | (counts['user_qty'] % 1 != 0))
+    invalid = counts[bad]
+    counts = counts[~bad].astype({'user_qty': 'int64'})
+    counts = counts.groupby('code', sort=False, as_index=False)['user_qty'].sum()
+    return counts, invalid
+
+def reconcile_counts(counts, catalog):
+    """Join counts against catalog rows by barcode, falling back to ID for manual entries.
+
+    Returns (lines, unknown): one line per counted item with its expected and
+    counted quantity, variance and match flag, and the counts whose code
+    matched no item.
+    """
+    catalog = catalog[['barcode', 'id', 'description', 'quantity', 'location']]
+    by_barcode = counts.merge(catalog, left_on='code', right_on='barcode', how='left', indicator=True)
+    found = by_barcode['_merge'] == 'both'
+    rest = by_barcode.loc[~found, ['code', 'user_qty']]
+    by_id = rest.merge(catalog, left_on='code', right_on='id', how='left', indicator=True)
+    found_id = by_id['_merge'] == 'both'
+    matched = pd.concat([by_barcode[found], by_id[found_id]])
+    # A barcode and its ID may both appear in one file
+    lines = matched.groupby('barcode', sort=False, as_index=False).agg(
+        id=('id', 'first'),
+        description=('description', 'first'),
+        location=('location', 'first'),
+        expected_qty=('quantity', 'first'),
+        user_qty=('user_qty', 'sum')
+    )
+    lines['expected_qty'] = lines['expected_qty'].fillna(0).astype('int64')
+    lines['variance'] = lines['user_qty'] - lines['expected_qty']
+    lines['match'] = lines['variance'] == 0
+    return lines, by_id.loc[~found_id, ['code', 'user_qty']]
+
+def apply_mismatches(supabase, mismatches, station, session_id=None, batch_size=500):
+    """Apply counted quantities through the apply_count_adjustments RPC, one call per batch."""
+    variances = [
+        {'barcode': row.barcode, 'expected_qty': int(row.expected_qty), 'new_qty': int(row.user_qty)}
+        for row in mismatches.itertuples(index=False)
+    ]
+    results = {}
+    for start in range(0, len(variances), batch_size):
+        results.update(apply_variances(supabase, variances[start:start + batch_size], station, session_id))
+        print(f"Applied {min(start + batch_size, len(variances))} of {len(variances)} updates...")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile a count sheet or scanner dump against the catalog.")
+    parser.add_argument('counts_file', help="CSV count sheet or scanner dump")
+    parser.add_argument('--format', choices=('auto', 'csv', 'dump'), default='auto',
+                        help="counts file format (default: detect from the first line)")
+    parser.add_argument('--location', help="only reconcile against items in this location")
+    parser.add_argument('--output', help="prefix for the result files (default: next to the counts file)")
+    parser.add_argument('--apply', action='store_true',
+                        help="admin mode: set the database quantity of every mismatch to the counted quantity")
+    parser.add_argument('--session-id', help="count session recorded in the audit log when applying")
+    parser.add_argument('--yes', action='store_true', help="apply without asking for confirmation")
+    args = parser.parse_args()
+
+    config = load_config()
+    station = config.get('STATION', 'NAME', fallback=socket.gethostname())
+    from supabase import create_client
+    try:
+        supabase = create_client(config['SUPABASE']['URL'], config['SUPABASE']['KEY'])
+    except Exception as e:
+        print(f"Error connecting to Supabase: {e}")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    try:
+        counts, invalid = read_counts(args.counts_file, args.format)
+    except (OSError, ValueError) as e:
+        print(f"Error reading {args.counts_file}: {e}")
+        sys.exit(1)
+    print(f"Loaded {len(counts)} counted codes from {args.counts_file}")
+    if len(invalid):
+        print(f"WARNING: {len(invalid)} lines could not be read (missing code or invalid quantity)")
+
+    try:
+        catalog = pd.DataFrame(
+            fetch_components(supabase, 'barcode,id,description,quantity,location', args.location),
+            columns=['barcode', 'id', 'description', 'quantity', 'location']
+        )
+    except Exception as e:
+        print(f"Error loading catalog: {e}")
+        sys.exit(1)
+
+    lines, unknown = reconcile_counts(counts, catalog)
+    matches = lines[lines['match']]
+    mismatches = lines[~lines['match']]
+
+    prefix = args.output or (
+        f"{os.path.splitext(args.counts_file)[0]}_reconcile_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    )
+    written = []
+    for name, frame in (('matches', matches), ('mismatches', mismatches), ('unknown', unknown), ('invalid', invalid)):
+        if name == 'invalid' and frame.empty:
+            continue
+        path = f"{prefix}_{name}.csv"
+        frame.drop(columns='match', errors='ignore').to_csv(path, index=False)
+        written.append(path)
+
+    print(f"Reconciled {len(lines)} items in {time.perf_counter() - started:.2f} s: "
+          f"{len(matches)} match, {len(mismatches)} mismatch, {len(unknown)} unknown codes")
+    for path in written:
+        print(f"  {path}")
+
+    if not args.apply or mismatches.empty:
+        return
+    if not args.yes:
+        choice = input(f"Set the database quantity of {len(mismatches)} items to the counted quantity? (y/n): ")
+        if choice.lower() != 'y':
+            return
+    try:
+        results = apply_mismatches(supabase, mismatches, station, args.session_id)
+    except Exception as e:
+        print(f"Error applying updates: {e}")
+        sys.exit(1)
+
+    applied = mismatches.assign(status=[
+        results[barcode]['status'] if barcode in results else 'missing' for barcode in mismatches['barcode']
+    ])
+    path = f"{prefix}_applied.csv"
+    applied.drop(columns='match').to_csv(path, index=False)
+    statuses = applied['status'].value_counts()
+    print(f"Applied {statuses.get('applied', 0)} updates, skipped {len(applied) - statuses.get('applied', 0)} "
+          f"whose quantity changed since the catalog was read or that no longer exist: {path}")
+
+if __name__ == "__main__":
+    main()
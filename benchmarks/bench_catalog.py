@@ -0,0 +1,43 @@
+"""Benchmark CompactCatalog size, build, open and lookup times.
+
+Usage: python benchmarks/bench_catalog.py [rows]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from catalog import CompactCatalog
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rows = [
+        {'barcode': f"MSC{i:07d}", 'id': f"MSC{i:07d}", 'description': f"GR Flower/Smalls Pouch {i % 5000}g"}
+        for i in range(count)
+    ]
+
+    start = time.perf_counter()
+    catalog = CompactCatalog.build(rows)
+    build_time = time.perf_counter() - start
+
+    path = os.path.join(tempfile.mkdtemp(), 'catalog.bin')
+    catalog.save(path)
+    start = time.perf_counter()
+    mapped = CompactCatalog.open(path)
+    open_time = time.perf_counter() - start
+
+    rng = random.Random(42)
+    keys = [rows[rng.randrange(count)]['barcode'] for _ in range(100_000)]
+    start = time.perf_counter()
+    for key in keys:
+        mapped[key]
+    lookup_time = time.perf_counter() - start
+
+    print(f"{count:,} rows: built in {build_time:.2f}s, file {os.path.getsize(path) / 1e6:.1f} MB")
+    print(f"Opened in {open_time * 1e3:.2f} ms, {lookup_time / len(keys) * 1e6:.2f} us per lookup")
+    os.remove(path)
+
+if __name__ == "__main__":
+    main()
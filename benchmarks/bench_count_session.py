@@ -0,0 +1,56 @@
+"""Benchmark the headless CountSession engine.
+
+Usage: python benchmarks/bench_count_session.py [catalog_size] [scans]
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from count_session import CountSession
+from count_snapshot import CountSnapshot
+
+def main():
+    catalog_size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    scans = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000_000
+
+    rows = [
+        {'id': f"MSC{i:06d}", 'barcode': f"MSC{i:06d}", 'description': f"Component {i}",
+         'quantity': i % 50, 'location': 'Warehouse'}
+        for i in range(catalog_size)
+    ]
+    snapshot = CountSnapshot(rows)
+    session = CountSession(snapshot.all_items(), source=snapshot)
+    events = [0]
+    session.subscribe(lambda event, barcode, item: events.__setitem__(0, events[0] + 1))
+
+    rng = random.Random(42)
+    codes = [rows[rng.randrange(catalog_size)]['barcode'] for _ in range(scans)]
+    quantities = [rng.randrange(50) for _ in range(scans)]
+
+    start = time.perf_counter()
+    for code, qty in zip(codes, quantities):
+        session.scan(session.lookup(code))
+        session.count(code, qty)
+    elapsed = time.perf_counter() - start
+    emitted = events[0]
+
+    # Measure per-item state separately; tracing allocations slows the loop down
+    session.clear()
+    tracemalloc.start()
+    for code in snapshot.items:
+        session.scan(session.lookup(code))
+        session.count(code, 1)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{scans:,} scan+count pairs over {catalog_size:,} items in {elapsed:.2f}s "
+          f"({scans / elapsed:,.0f}/s, {elapsed / scans * 1e6:.2f} us each), {emitted:,} events")
+    scanned, unscanned = session.counts()
+    print(f"Session state: {current / scanned:.0f} bytes per scanned item "
+          f"({scanned:,} scanned, {len(session.mismatches()):,} mismatches)")
+
+if __name__ == "__main__":
+    main()
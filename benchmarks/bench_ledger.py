@@ -0,0 +1,117 @@
+"""Benchmark movement ledger appends and snapshot-plus-tail on-hand queries.
+
+Runs the inventory_movements / inventory_snapshots layout from README.md in
+SQLite so it needs no server; absolute numbers differ from Postgres but the
+shape (append cost as the ledger grows, on-hand cost independent of ledger
+size) is the same.
+
+Usage: python benchmarks/bench_ledger.py [movements] [items]
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+
+SCHEMA = """
+CREATE TABLE inventory_movements (
+    id INTEGER PRIMARY KEY,
+    client_key TEXT UNIQUE,
+    barcode TEXT NOT NULL,
+    delta INTEGER NOT NULL,
+    quantity_after INTEGER,
+    reason TEXT NOT NULL,
+    station TEXT
+);
+CREATE INDEX inventory_movements_barcode ON inventory_movements (barcode, id);
+CREATE TABLE inventory_snapshots (
+    barcode TEXT PRIMARY KEY,
+    quantity INTEGER NOT NULL,
+    last_movement_id INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+ON_HAND = """
+SELECT s.barcode, s.quantity + coalesce((
+    SELECT sum(m.delta) FROM inventory_movements m WHERE m.barcode = s.barcode AND m.id > s.last_movement_id
+), 0)
+FROM inventory_snapshots s WHERE s.barcode = ?
+"""
+
+FULL_SUM = "SELECT sum(delta) FROM inventory_movements WHERE barcode = ?"
+
+SNAPSHOT = """
+INSERT INTO inventory_snapshots (barcode, quantity, last_movement_id)
+SELECT barcode, sum(delta), ? FROM inventory_movements WHERE id > ? AND id <= ? GROUP BY barcode
+ON CONFLICT (barcode) DO UPDATE
+SET quantity = quantity + excluded.quantity, last_movement_id = excluded.last_movement_id
+"""
+
+def append(db, rng, barcodes, count, batch_size=500):
+    """Insert `count` movements in batches; return seconds per batch for the first and last 10%."""
+    times = []
+    for start in range(0, count, batch_size):
+        rows = [
+            (str(uuid.UUID(int=rng.getrandbits(128))), rng.choice(barcodes), rng.randint(-5, 5), None, 'adjust', 'bench')
+            for _ in range(min(batch_size, count - start))
+        ]
+        began = time.perf_counter()
+        db.executemany(
+            "INSERT INTO inventory_movements (client_key, barcode, delta, quantity_after, reason, station) "
+            "VALUES (?, ?, ?, ?, ?, ?)", rows
+        )
+        db.commit()
+        times.append(time.perf_counter() - began)
+    tenth = max(len(times) // 10, 1)
+    return sum(times[:tenth]) / tenth, sum(times[-tenth:]) / tenth
+
+def query_time(db, sql, keys):
+    began = time.perf_counter()
+    for key in keys:
+        db.execute(sql, (key,)).fetchone()
+    return (time.perf_counter() - began) / len(keys)
+
+def main():
+    movements = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    items = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    path = os.path.join(tempfile.mkdtemp(), 'ledger.db')
+    db = sqlite3.connect(path)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.executescript(SCHEMA)
+
+    rng = random.Random(42)
+    barcodes = [f"MSC{i:07d}" for i in range(items)]
+    db.executemany("INSERT INTO inventory_snapshots (barcode, quantity) VALUES (?, 0)", ((b,) for b in barcodes))
+    db.commit()
+
+    began = time.perf_counter()
+    first, last = append(db, rng, barcodes, movements)
+    elapsed = time.perf_counter() - began
+    print(f"Appended {movements:,} movements in {elapsed:.1f}s ({movements / elapsed:,.0f}/s)")
+    print(f"500-row batch: {first * 1e3:.2f} ms at the start, {last * 1e3:.2f} ms at the end")
+
+    keys = [rng.choice(barcodes) for _ in range(2000)]
+    print(f"On-hand without a snapshot (full history sum): {query_time(db, FULL_SUM, keys) * 1e6:.0f} us per item")
+
+    upto = db.execute("SELECT max(id) FROM inventory_movements").fetchone()[0]
+    began = time.perf_counter()
+    db.execute(SNAPSHOT, (upto, 0, upto))
+    db.commit()
+    print(f"Snapshot of {movements:,} movements in {time.perf_counter() - began:.1f}s")
+
+    tail = max(movements // 1000, 1000)
+    append(db, rng, barcodes, tail)
+    print(f"On-hand from snapshot + {tail:,}-movement tail: {query_time(db, ON_HAND, keys) * 1e6:.0f} us per item")
+
+    check = keys[0]
+    expected = db.execute(FULL_SUM, (check,)).fetchone()[0] or 0
+    assert db.execute(ON_HAND, (check,)).fetchone()[1] == expected
+    print(f"Ledger file {os.path.getsize(path) / 1e6:,.0f} MB")
+    db.close()
+    os.remove(path)
+
+if __name__ == "__main__":
+    main()
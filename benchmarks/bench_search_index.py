@@ -0,0 +1,39 @@
+"""Benchmark SearchIndex build and query times.
+
+Usage: python benchmarks/bench_search_index.py [rows]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from search_index import SearchIndex
+
+WORDS = ['GR', 'Flower/Smalls', 'Pouch', '14g', '28g', 'Jar', 'Mylar', '3.25”W', 'x', 'Inner', 'Label', 'THC',
+         'Child-Resistant', 'Lid', 'Black', 'Pre-Roll', 'Tube', 'Vape', 'Cart', 'Box', 'Screw', 'M3', '10CT']
+QUERIES = ['msc00012', 'MSC00012', 'msc0', 'lab1234', 'pouch', 'flower pouch 14g', 'mylar 3.25', 'x', 'ab',
+           'screw x', 'nosuchthing']
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    rng = random.Random(42)
+    prefixes = ['MSC', 'LAB', 'PKG', 'RAW', 'EQP']
+    catalog = {}
+    for i in range(count):
+        id_str = f"{prefixes[i % 5]}{i // 5:05d}"
+        catalog[id_str] = {'id': id_str, 'description': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(3, 9)))}
+
+    start = time.perf_counter()
+    index = SearchIndex.from_catalog(catalog)
+    print(f"{count:,} items: built in {time.perf_counter() - start:.2f}s")
+
+    for query in QUERIES:
+        index.search(query)
+        start = time.perf_counter()
+        for _ in range(20):
+            results = index.search(query)
+        print(f"{query!r:20} {(time.perf_counter() - start) / 20 * 1e3:7.2f} ms  {len(results)} results")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from array import array
+from collections.abc import Mapping
+
+# Shared catalog helpers
+
+def fetch_components(supabase, columns='*', location=None, page_size=1000):
+    """Fetch every components row, paging past the PostgREST row limit."""
+    rows = []
+    start = 0
+    while True:
+        query = supabase.table('components').select(columns)
+        if location:
+            query = query.eq('location', location)
+        result = query.order('barcode').range(start, start + page_size - 1).execute()
+        page = result.data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        start += page_size
+
+# Compact columnar catalog
+MAGIC = b'WHCAT001'
+HEADER = struct.Struct('<8sIII')  # magic, rows, hash table slots, blob bytes
+COLUMNS = ('barcode', 'id', 'description')
+
+class CompactCatalog(Mapping):
+    """Read-only catalog mapping barcode to {'id', 'description'}.
+
+    All strings live in one UTF-8 blob, interned so that an ID equal to its
+    barcode (or a repeated description) is stored once. Each row keeps a start
+    offset and length per column in flat arrays, and an open-addressing hash
+    table maps crc32(barcode) to the row. The same layout can be written to a
+    file and memory-mapped, so several local processes share one read-only
+    copy of the pages. Files use native byte order and are meant for the
+    machine that wrote them.
+    """
+
+    def __init__(self, count, starts, lengths, table, blob, mapped=None):
+        self.count = count
+        self.starts = starts    # 3 * count uint32, row-major (barcode, id, description)
+        self.lengths = lengths  # 3 * count uint16
+        self.table = table      # uint32 slots holding row + 1, 0 for empty
+        self.blob = blob
+        self.mapped = mapped
+        self.mask = len(table) - 1
+
+    @classmethod
+    def build(cls, rows):
+        """Build from dicts with barcode, id and description; later duplicates are skipped."""
+        interned = {}
+        blob = bytearray()
+        starts = array('I')
+        lengths = array('H')
+        seen = set()
+        count = 0
+        for row in rows:
+            barcode = row['barcode']
+            if barcode in seen:
+                continue
+            seen.add(barcode)
+            for column in COLUMNS:
+                data = (row[column] or '').encode('utf-8')[:0xFFFF]
+                offset = interned.get(data)
+                if offset is None:
+                    offset = len(blob)
+                    interned[data] = offset
+                    blob += data
+                starts.append(offset)
+                lengths.append(len(data))
+            count += 1
+
+        size = 8
+        while size < count * 2:
+            size <<= 1
+        table = array('I', bytes(4 * size))
+        mask = size - 1
+        for row_index in range(count):
+            start = starts[row_index * 3]
+            slot = zlib.crc32(blob[start:start + lengths[row_index * 3]]) & mask
+            while table[slot]:
+                slot = (slot + 1) & mask
+            table[slot] = row_index + 1
+        return cls(count, starts, lengths, table, bytes(blob))
+
+    @classmethod
+    def from_items(cls, all_items):
+        """Build from a {barcode: {'id', 'description'}} dict."""
+        return cls.build({'barcode': barcode, 'id': item['id'], 'description': item['description']}
+                         for barcode, item in all_items.items())
+
+    def save(self, path):
+        """Write the catalog file atomically; processes mapping the old file keep their copy."""
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"  # Several processes may refresh at once
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, self.count, len(self.table), len(self.blob)))
+            f.write(memoryview(self.starts).cast('B'))
+            f.write(memoryview(self.lengths).cast('B'))
+            if len(self.lengths) % 2:
+                f.write(b'\0\0')  # keep the hash table 4-byte aligned
+            f.write(memoryview(self.table).cast('B'))
+            f.write(self.blob)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map a catalog file read-only without copying it."""
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapped)
+        magic, count, table_size, blob_len = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a catalog file")
+        offset = HEADER.size
+        starts = view[offset:offset + 12 * count].cast('I')
+        offset += 12 * count
+        lengths = view[offset:offset + 6 * count].cast('H')
+        offset += 6 * count + (2 if count % 2 else 0)
+        table = view[offset:offset + 4 * table_size].cast('I')
+        offset += 4 * table_size
+        blob = view[offset:offset + blob_len]
+        return cls(count, starts, lengths, table, blob, mapped)
+
+    def _string(self, index):
+        start = self.starts[index]
+        return str(self.blob[start:start + self.lengths[index]], 'utf-8', 'replace')
+
+    def _row_of(self, barcode):
+        if not isinstance(barcode, str):
+            return -1
+        key = barcode.encode('utf-8')
+        slot = zlib.crc32(key) & self.mask
+        while True:
+            entry = self.table[slot]
+            if not entry:
+                return -1
+            row_index = entry - 1
+            start = self.starts[row_index * 3]
+            if self.blob[start:start + self.lengths[row_index * 3]] == key:
+                return row_index
+            slot = (slot + 1) & self.mask
+
+    def __getitem__(self, barcode):
+        row_index = self._row_of(barcode)
+        if row_index < 0:
+            raise KeyError(barcode)
+        return {'id': self._string(row_index * 3 + 1), 'description': self._string(row_index * 3 + 2)}
+
+    def __contains__(self, barcode):
+        return self._row_of(barcode) >= 0
+
+    def __iter__(self):
+        for row_index in range(self.count):
+            yield self._string(row_index * 3)
+
+    def __len__(self):
+        return self.count
+
+    def rows(self):
+        """Iterate (barcode, id, description) tuples in row order."""
+        string = self._string
+        for row_index in range(self.count):
+            yield string(row_index * 3), string(row_index * 3 + 1), string(row_index * 3 + 2)
+
+CACHE_MAX_AGE = 3600  # Seconds before a cached catalog is refreshed in the background
+refreshing = set()  # Cache files being refreshed by this process
+refreshing_lock = threading.Lock()
+
+def load_catalog(supabase, cache_path=None, location=None, refresh=False, max_age=CACHE_MAX_AGE):
+    """Load the catalog into a CompactCatalog.
+
+    With a cache path (whole catalog only) an existing cache file is
+    memory-mapped straight away, so every local process shares the same
+    pages and none waits for a download. A cache older than `max_age`
+    seconds is refreshed in the background for the next load. Otherwise,
+    or with `refresh=True` (e.g. after an import), the catalog is fetched
+    and written to the cache first. If the fetch fails the last cached file
+    is used instead.
+    """
+    cached = bool(cache_path) and not location
+    if cached and not refresh and os.path.exists(cache_path):
+        try:
+            catalog = CompactCatalog.open(cache_path)
+        except (OSError, ValueError) as e:
+            print(f"Error reading catalog cache, fetching the catalog: {e}")
+        else:
+            if time.time() - os.path.getmtime(cache_path) > max_age:
+                refresh_cache(supabase, cache_path)
+            return catalog
+    try:
+        rows = fetch_components(supabase, 'barcode,id,description', location)
+    except Exception as e:
+        if cached and os.path.exists(cache_path):
+            print(f"Error loading catalog, using cached copy: {e}")
+            return CompactCatalog.open(cache_path)
+        raise
+    catalog = CompactCatalog.build(rows)
+    if cached:
+        try:
+            catalog.save(cache_path)
+            return CompactCatalog.open(cache_path)
+        except OSError as e:
+            print(f"Error writing catalog cache: {e}")
+    return catalog
+
+def refresh_cache(supabase, cache_path):
+    """Fetch the catalog and replace the cache file on a background thread; returns the thread.
+
+    Mappings of the old file stay valid; the next load maps the new one.
+    Returns None if this process is already refreshing the file.
+    """
+    with refreshing_lock:
+        if cache_path in refreshing:
+            return None
+        refreshing.add(cache_path)
+
+    def perform_refresh():
+        try:
+            CompactCatalog.build(fetch_components(supabase, 'barcode,id,description')).save(cache_path)
+        except Exception as e:
+            print(f"Error refreshing catalog cache: {e}")
+        finally:
+            with refreshing_lock:
+                refreshing.discard(cache_path)
+
+    thread = threading.Thread(target=perform_refresh, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,199 @@
+import json
+import os
+import time
+from datetime import datetime
+import pandas as pd
+from catalog import fetch_components
+
+# Diff-based catalog import
+
+def prepare_components(df):
+    """Normalize an ID/Description frame into id, barcode and description columns.
+
+    The component ID doubles as its barcode. Returns (components, duplicates)
+    where duplicates holds repeated IDs after the first.
+    """
+    components = pd.DataFrame({
+        'id': df['ID'].astype(str).str.strip(),
+        'description': df['Description'].fillna('').astype(str).str.strip()
+    })
+    components = components[components['id'] != '']
+    repeated = components['id'].duplicated()
+    duplicates = components[repeated]
+    components = components[~repeated].assign(barcode=lambda frame: frame['id'])
+    return components[['id', 'barcode', 'description']], duplicates
+
+def diff_catalog(components, current):
+    """Compare incoming components with the current catalog, keyed by ID.
+
+    Returns a dict of frames: 'new' (not in the catalog), 'changed' (a
+    different description), 'unchanged' and 'removed' (in the catalog but not
+    in the incoming rows). 'changed' carries the old description as
+    description_current.
+    """
+    merged = components.merge(
+        current[['id', 'description']], on='id', how='outer', suffixes=('', '_current'), indicator=True
+    )
+    both = merged[merged['_merge'] == 'both']
+    differs = both['description'].fillna('') != both['description_current'].fillna('')
+    return {
+        'new': merged.loc[merged['_merge'] == 'left_only', ['id', 'barcode', 'description']],
+        'changed': both.loc[differs, ['id', 'barcode', 'description', 'description_current']],
+        'unchanged': both.loc[~differs, ['id', 'barcode', 'description']],
+        'removed': merged.loc[merged['_merge'] == 'right_only', ['id', 'description_current']]
+    }
+
+def fetch_current(supabase):
+    """Fetch the catalog columns the diff needs in one paged read."""
+    return pd.DataFrame(fetch_components(supabase, 'id,description'), columns=['id', 'description'])
+
+def apply_catalog_diff(supabase, diff, batch_size=500, delete_removed=False, progress=None):
+    """Send only new rows and the changed fields of changed rows, in batches.
+
+    New rows are sent without quantity or location so they get the table
+    defaults; changed rows are sent as id and description only, so existing
+    items keep their on-hand quantity, location and barcode. Each batch has
+    one set of columns. Removed rows are deleted only when asked.
+    `progress(sent, total)` is called after every upserted batch. Returns
+    the number of rows sent.
+    """
+    batches = (diff['new'][['id', 'barcode', 'description']].to_dict('records'),
+               diff['changed'][['id', 'description']].to_dict('records'))
+    total = sum(len(rows) for rows in batches)
+    sent = 0
+    for rows in batches:
+        for start in range(0, len(rows), batch_size):
+            supabase.table('components').upsert(rows[start:start + batch_size]).execute()
+            sent += len(rows[start:start + batch_size])
+            if progress:
+                progress(sent, total)
+    if delete_removed:
+        removed = diff['removed']['id'].tolist()
+        for start in range(0, len(removed), batch_size):
+            supabase.table('components').delete().in_('id', removed[start:start + batch_size]).execute()
+    return total
+
+def import_catalog(supabase, df, delete_removed=False, progress=None):
+    """Diff an ID/Description frame against the catalog and upload only what changed.
+
+    Returns the diff, plus the skipped duplicate IDs under 'duplicates'.
+    """
+    components, duplicates = prepare_components(df)
+    diff = diff_catalog(components, fetch_current(supabase))
+    apply_catalog_diff(supabase, diff, delete_removed=delete_removed, progress=progress)
+    diff['duplicates'] = duplicates
+    return diff
+
+def summarize(diff):
+    return (f"{len(diff['new'])} new, {len(diff['changed'])} changed, {len(diff['unchanged'])} unchanged, "
+            f"{len(diff['removed'])} not in the import")
+
+# Resumable streamed import for large files
+class ImportCheckpoint:
+    """Durable record of how many CSV rows have been committed.
+
+    Written atomically and fsynced after every committed batch, so an import
+    that dies resumes after the last batch that reached the database. The
+    checkpoint remembers the file's size and modification time and refuses
+    to resume against a file that has changed.
+    """
+
+    def __init__(self, csv_path, path=None):
+        self.path = path or csv_path + '.checkpoint.json'
+        stat = os.stat(csv_path)
+        self.source = {'file': os.path.abspath(csv_path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+        self.state = {'rows_done': 0, 'new': 0, 'changed': 0, 'unchanged': 0, 'duplicates': 0}
+
+    def load(self):
+        """Return the saved progress, or a fresh state when there is no checkpoint."""
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved['source'] != self.source:
+                raise ValueError(f"{self.source['file']} changed since the checkpoint was written")
+            self.state = saved['state']
+        return self.state
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'source': self.source, 'state': self.state,
+                       'updated_at': datetime.now().isoformat(timespec='seconds')}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+def count_rows(csv_path):
+    """Count data rows by scanning for line breaks (quoted line breaks make this an estimate)."""
+    lines = 0
+    last = b'\n'
+    with open(csv_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            lines += block.count(b'\n')
+            last = block[-1:]
+    if last != b'\n':
+        lines += 1
+    return max(lines - 1, 0)
+
+def import_batch(supabase, batch):
+    """Diff one batch against the rows with the same IDs and send only what changed."""
+    components, duplicates = prepare_components(batch)
+    ids = components['id'].tolist()
+    result = supabase.table('components').select('id,description').in_('id', ids).execute() if ids else None
+    current = pd.DataFrame(result.data if result else [], columns=['id', 'description'])
+    diff = diff_catalog(components, current)
+    apply_catalog_diff(supabase, diff)
+    return {'new': len(diff['new']), 'changed': len(diff['changed']),
+            'unchanged': len(diff['unchanged']), 'duplicates': len(duplicates)}
+
+def stream_import(supabase, csv_path, checkpoint, chunk_size=5000, batch_size=500,
+                  retries=3, report_every=2.0, progress=print):
+    """Import a large ID/Description CSV in chunks, resuming from the checkpoint.
+
+    Only one chunk is in memory at a time. Each batch is diffed against the
+    database rows with the same IDs, so replaying a batch after a crash
+    changes nothing. Failed batches are retried with backoff before giving
+    up. Returns the final checkpoint state.
+    """
+    state = checkpoint.load()
+    total = count_rows(csv_path)
+    resumed_at = state['rows_done']
+    if resumed_at:
+        progress(f"Resuming after row {resumed_at:,} of about {total:,}")
+    started = time.monotonic()
+    last_report = started
+
+    position = 0
+    reader = pd.read_csv(csv_path, dtype=str, keep_default_na=False, encoding='utf-8', chunksize=chunk_size)
+    for chunk in reader:
+        skip = max(state['rows_done'] - position, 0)
+        position += len(chunk)
+        for start in range(skip, len(chunk), batch_size):
+            batch = chunk.iloc[start:start + batch_size]
+            for attempt in range(retries + 1):
+                try:
+                    counts = import_batch(supabase, batch)
+                    break
+                except Exception as e:
+                    if attempt == retries:
+                        raise
+                    delay = 2 ** attempt
+                    progress(f"Batch at row {state['rows_done']:,} failed ({e}); retrying in {delay}s")
+                    time.sleep(delay)
+            for name, value in counts.items():
+                state[name] += value
+            state['rows_done'] += len(batch)
+            checkpoint.save()
+
+            now = time.monotonic()
+            if now - last_report >= report_every or state['rows_done'] >= total:
+                last_report = now
+                rate = (state['rows_done'] - resumed_at) / max(now - started, 1e-6)
+                remaining = max(total - state['rows_done'], 0) / rate if rate else 0
+                progress(f"{state['rows_done']:,} / ~{total:,} rows, {rate:,.0f} rows/s, "
+                         f"ETA {time.strftime('%H:%M:%S', time.gmtime(remaining))}")
+    return state
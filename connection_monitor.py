@@ -0,0 +1,198 @@
+import http.client
+import statistics
+import threading
+import time
+import traceback
+from collections import deque
+
+try:
+    import httpx
+    NETWORK_ERRORS = (OSError, http.client.HTTPException, httpx.TransportError)
+except ImportError:
+    NETWORK_ERRORS = (OSError, http.client.HTTPException)
+
+STATE_COLORS = {'offline': "#c00000", 'slow': "#b36b00"}  # Status bar text colour per state
+
+class OfflineError(ConnectionError):
+    """Raised instead of trying the network while the connection is down."""
+
+# Connection heartbeat and circuit breaker
+class ConnectionMonitor:
+    """Track whether the database is reachable and how fast it answers.
+
+    A heartbeat thread runs `probe` (one small round trip) every `interval`
+    seconds and keeps the recent round-trip times. After `failure_threshold`
+    network failures in a row, from the heartbeat or from calls made through
+    `call`, the breaker opens: the state becomes 'offline' and `call` fails
+    at once instead of waiting for a timeout. While offline or failing, the
+    heartbeat probes every `retry_interval` seconds, and the first success
+    closes the breaker again. `on_update(monitor)`, and every listener added
+    with `subscribe`, is called from any thread after every probe and state
+    change.
+    """
+
+    def __init__(self, probe, on_update=None, interval=15, retry_interval=5, failure_threshold=3,
+                 slow_ms=1500, window=10):
+        self.probe = probe
+        self.listeners = [on_update] if on_update else []
+        self.interval = interval
+        self.retry_interval = retry_interval
+        self.failure_threshold = failure_threshold
+        self.slow_ms = slow_ms
+        self.latencies = deque(maxlen=window)  # Recent round trips in ms
+        self.state = 'connecting'  # 'connecting', 'online', 'slow' or 'offline'
+        self.failures = 0
+        self.last_error = None
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        """Start the heartbeat, or check right away if it is already running."""
+        if self.thread.is_alive():
+            self.check_now()
+        else:
+            self.thread.start()
+        return self
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def check_now(self):
+        """Run a heartbeat right away instead of waiting for the next one."""
+        self.wake.set()
+
+    def allow(self):
+        """Whether calls should try the network (the breaker is closed)."""
+        return self.state != 'offline'
+
+    def latency(self):
+        """Median of the recent round trips in ms, or None before the first one."""
+        with self.lock:
+            return statistics.median(self.latencies) if self.latencies else None
+
+    def describe(self):
+        latency = self.latency()
+        if self.state == 'offline':
+            return "Offline - local mode"
+        if self.state == 'connecting':
+            return "Connecting..." if not self.failures else f"Connection failing ({self.failures})"
+        text = "Online" if self.state == 'online' else "Slow"
+        # A call can succeed before the heartbeat has timed a round trip
+        return text if latency is None else f"{text} - {latency:.0f} ms"
+
+    def call(self, func, *args):
+        """Run a network call through the breaker, recording network failures."""
+        if not self.allow():
+            raise OfflineError(f"Offline: {self.last_error or 'the database is unreachable'}")
+        try:
+            result = func(*args)
+        except NETWORK_ERRORS as e:
+            self.record_failure(e)
+            raise
+        self.record_success()
+        return result
+
+    def record_success(self, latency=None):
+        with self.lock:
+            self.failures = 0
+            if latency is not None:
+                self.latencies.append(latency)
+            if latency is not None or self.state == 'connecting':
+                median = statistics.median(self.latencies) if self.latencies else 0
+                self.state = 'slow' if median > self.slow_ms else 'online'
+        self._notify()
+
+    def record_failure(self, error):
+        with self.lock:
+            self.failures += 1
+            self.last_error = str(error)
+            if self.failures >= self.failure_threshold:
+                self.state = 'offline'
+        if self.failures >= self.failure_threshold:
+            self.wake.set()  # Start probing at the retry interval
+        self._notify()
+
+    def _notify(self):
+        # A failing listener must not turn a successful call into a failed one
+        for listener in list(self.listeners):
+            try:
+                listener(self)
+            except Exception:
+                traceback.print_exc()
+
+    def _run(self):
+        while True:
+            started = time.perf_counter()
+            try:
+                self.probe()
+            except Exception as e:
+                self.record_failure(e)
+            else:
+                self.record_success((time.perf_counter() - started) * 1000)
+            self.wake.wait(self.retry_interval if self.failures else self.interval)
+            self.wake.clear()
+
+def database_probe(supabase, source=None):
+    """Return the cheapest round trip for an app: the lookup service's health check or one row."""
+    health = getattr(source, 'health', None)
+    if health is not None:
+        return health
+    return lambda: supabase.table('components').select('id').limit(1).execute()
+
+# Lookup source that degrades to the local catalog
+class ResilientSource:
+    """Wrap a lookup source so it falls back to the local catalog while offline.
+
+    Calls go through the monitor's breaker. While the breaker is open,
+    lookups are answered by `offline_lookup(code)` (a `catalog_row`, or
+    None) and writes fail at once with OfflineError.
+    `local` is true while offline, so callers skip their lookup threads.
+    """
+
+    def __init__(self, source, monitor, offline_lookup):
+        self.source = source
+        self.monitor = monitor
+        self.offline_lookup = offline_lookup
+
+    @property
+    def local(self):
+        return self.source.local or not self.monitor.allow()
+
+    def lookup(self, code):
+        if self.monitor.allow():
+            try:
+                return self.monitor.call(self.source.lookup, code)
+            except NETWORK_ERRORS:
+                if self.monitor.allow():
+                    raise
+        return self.offline_lookup(code)
+
+    def lookup_many(self, codes):
+        if self.monitor.allow():
+            try:
+                return self.monitor.call(self.source.lookup_many, codes)
+            except NETWORK_ERRORS:
+                if self.monitor.allow():
+                    raise
+        rows = {}
+        for code in codes:
+            row = self.offline_lookup(code)
+            if row is not None:
+                rows[code] = row
+        return rows
+
+    def update(self, barcode, fields, *movement):
+        return self.monitor.call(self.source.update, barcode, fields, *movement)
+
+    def __getattr__(self, name):
+        return getattr(self.source, name)
+
+def catalog_row(barcode, id, description):
+    """A lookup row built from the local catalog; quantity and location are unknown."""
+    return {'barcode': barcode, 'id': id, 'description': description, 'quantity': None, 'location': None,
+            'offline': True}
@@ -0,0 +1,163 @@
+import json
+import os
+import queue
+import threading
+from datetime import datetime
+
+# Field order for compact journal lines; new fields go at the end so older lines still load
+FIELDS = ('id', 'description', 'supabase_qty', 'user_qty', 'location', 'local_qty')
+
+# Crash-safe count session journal
+class CountJournal:
+    """Append-only local journal of a count session with snapshot compaction.
+
+    Each scan or count is written as one short JSON line by a background
+    writer thread, so the scan path only pays for a queue put. Every
+    `compact_every` lines the writer folds the journal into a snapshot file
+    and truncates it. Lines record the full item state, so replaying a
+    journal over a snapshot that already contains it is harmless.
+    """
+
+    def __init__(self, name, directory='sessions', compact_every=1000):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.name = name
+        self.journal_path = os.path.join(directory, f"{name}.journal")
+        self.snapshot_path = os.path.join(directory, f"{name}.snapshot.json")
+        self.location_path = os.path.join(directory, f"{name}.location.json")
+        self.compact_every = compact_every
+
+        self.state = {}
+        self.lines_since_compact = 0
+        self.queue = queue.Queue()
+        self.writer = None
+
+    def load(self):
+        """Rebuild the session from snapshot plus journal and start the writer."""
+        self.state = {}
+        if os.path.exists(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                    self.state = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Error reading session snapshot: {e}")
+
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'rb+') as f:
+                good_end = 0  # Offset just past the last complete line
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # A torn last line from a crash mid-write
+                    good_end += len(line)
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        print(f"Skipping corrupt session journal line: {line[:80]!r}")
+                        continue
+                    self._apply(entry)
+                    self.lines_since_compact += 1
+                # Cut off a torn tail so new lines don't run into it
+                f.truncate(good_end)
+
+        self.journal = open(self.journal_path, 'a', encoding='utf-8')
+        self.writer = threading.Thread(target=self._run, daemon=True)
+        self.writer.start()
+        return {barcode: dict(details) for barcode, details in self.state.items()}
+
+    def _apply(self, entry):
+        if entry[0] == 's':
+            self.state[entry[1]] = dict(zip(FIELDS, entry[2:]))
+        elif entry[0] == 'r':
+            self.state = {}
+
+    def record(self, barcode, details):
+        """Queue the current state of a scanned item."""
+        self.queue.put(['s', barcode] + [details.get(field) for field in FIELDS])
+
+    def reset(self):
+        """Queue a session reset; the previous session is archived first."""
+        self.queue.put(['r'])
+
+    def listener(self, event, barcode, details):
+        """CountSession listener that journals scans and resets."""
+        if event in ('scanned', 'updated'):
+            self.record(barcode, details)
+        elif event == 'cleared':
+            self.reset()
+
+    def close(self):
+        """Flush pending lines, compact and stop the writer."""
+        if self.writer is None:
+            return
+        self.queue.put(None)
+        self.writer.join()
+        self.writer = None
+
+    def _run(self):
+        while True:
+            entries = [self.queue.get()]
+            # Drain whatever else is queued so a burst costs one fsync
+            while True:
+                try:
+                    entries.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in entries
+            for entry in entries:
+                if entry is None:
+                    continue
+                if entry[0] == 'r' and self.state:
+                    self._archive()
+                self.journal.write(json.dumps(entry, separators=(',', ':')) + '\n')
+                self._apply(entry)
+                self.lines_since_compact += 1
+            try:
+                self.journal.flush()
+                os.fsync(self.journal.fileno())
+                if stop or self.lines_since_compact >= self.compact_every:
+                    self._compact()
+            except OSError as e:
+                print(f"Error writing session journal: {e}")
+
+            if stop:
+                self.journal.close()
+                return
+
+    def load_location(self):
+        """Return the location the saved session is limited to, or None."""
+        if not os.path.exists(self.location_path):
+            return None
+        try:
+            with open(self.location_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('location')
+        except (OSError, ValueError) as e:
+            print(f"Error reading session location: {e}")
+            return None
+
+    def save_location(self, location):
+        """Remember the session's location across restarts (None for the whole catalog)."""
+        if location:
+            self._write_json(self.location_path, {'location': location})
+        elif os.path.exists(self.location_path):
+            os.remove(self.location_path)
+
+    def _write_json(self, path, data):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _compact(self):
+        """Write the current state as the snapshot and truncate the journal."""
+        self._write_json(self.snapshot_path, self.state)
+        self.journal.seek(0)
+        self.journal.truncate()
+        self.lines_since_compact = 0
+
+    def _archive(self):
+        """Keep a copy of a session that is about to be reset."""
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self._write_json(os.path.join(self.directory, f"{self.name}_{stamp}.archive.json"), self.state)
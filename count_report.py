@@ -0,0 +1,157 @@
+import os
+import re
+from array import array
+import numpy as np
+import pandas as pd
+
+# Leading letters of a component ID (MSC, LAB, ...) used for prefix rollups
+PREFIX_RE = re.compile(r'[A-Za-z]+')
+
+def build_frame(scanned_items, unit_costs=None):
+    """Build a columnar frame of counted lines from a session's scanned items.
+
+    Items that were scanned but never counted are left out, as are items
+    counted offline whose database quantity is unknown (see `build_unverified`).
+    `unit_costs` maps barcode to unit cost and adds a `unit_cost` column for
+    value weighting; missing costs count as 1. The components table has no
+    costs, so without them the report is weighted by quantity only.
+    """
+    barcodes, ids, descriptions, locations, prefixes = [], [], [], [], []
+    supabase_qty = array('q')
+    user_qty = array('q')
+    match_prefix = PREFIX_RE.match
+    for barcode, d in scanned_items.items():
+        if d.get('user_qty') is None or d.get('supabase_qty') is None:
+            continue
+        barcodes.append(barcode)
+        ids.append(d['id'])
+        descriptions.append(d['description'])
+        locations.append(d.get('location') or 'Unknown')
+        prefix = match_prefix(d['id'])
+        prefixes.append(prefix.group(0).upper() if prefix else 'Other')
+        supabase_qty.append(int(d['supabase_qty']))
+        user_qty.append(int(d['user_qty']))
+
+    df = pd.DataFrame({
+        'barcode': barcodes,
+        'id': ids,
+        'description': descriptions,
+        'location': pd.Categorical(locations),
+        'prefix': pd.Categorical(prefixes),
+        'supabase_qty': np.frombuffer(supabase_qty, dtype=np.int64),
+        'user_qty': np.frombuffer(user_qty, dtype=np.int64),
+    })
+    if unit_costs:
+        df['unit_cost'] = df['barcode'].map(unit_costs).fillna(1.0).astype(np.float64)
+    return df
+
+def build_unverified(scanned_items):
+    """Counted items whose database quantity is unknown, e.g. counted offline and not yet refreshed."""
+    rows = [
+        {'barcode': barcode, 'id': d['id'], 'description': d['description'],
+         'location': d.get('location') or 'Unknown', 'user_qty': int(d['user_qty'])}
+        for barcode, d in scanned_items.items()
+        if d.get('user_qty') is not None and d.get('supabase_qty') is None
+    ]
+    return pd.DataFrame(rows, columns=['barcode', 'id', 'description', 'location', 'user_qty'])
+
+def compute_metrics(df):
+    """Add per-line variance and error columns to a counted-lines frame."""
+    df = df.copy()
+    df['variance'] = df['user_qty'] - df['supabase_qty']
+    df['abs_error'] = df['variance'].abs()
+    book = df['supabase_qty'].to_numpy(dtype=np.float64)
+    error = df['abs_error'].to_numpy(dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct = np.where(book > 0, error / book * 100.0, np.where(error > 0, np.inf, 0.0))
+    df['pct_error'] = pct
+    df['match'] = df['variance'] == 0
+    if 'unit_cost' in df:
+        df['book_value'] = df['supabase_qty'] * df['unit_cost']
+        df['error_value'] = df['abs_error'] * df['unit_cost']
+    return df
+
+def _weighted_accuracy(book, error):
+    """1 - error / book, clipped at 0; all-or-nothing when the book total is 0."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(book > 0, np.clip(1.0 - error / book, 0.0, None), (error == 0).astype(np.float64))
+
+def _accuracy(frame):
+    """Item accuracy and quantity-weighted accuracy for a frame, plus value-weighted accuracy if it has costs."""
+    item_accuracy = frame['match'].mean() if len(frame) else 1.0
+    qty_accuracy = float(_weighted_accuracy(frame['supabase_qty'].sum(), frame['abs_error'].sum()))
+    if 'book_value' not in frame:
+        return item_accuracy, qty_accuracy, None
+    return item_accuracy, qty_accuracy, float(_weighted_accuracy(frame['book_value'].sum(), frame['error_value'].sum()))
+
+def rollup(df, key):
+    """Aggregate counted lines by a column such as 'location' or 'prefix'."""
+    grouped = df.groupby(key, sort=True, observed=True)
+    columns = dict(
+        lines=('barcode', 'size'),
+        matched=('match', 'sum'),
+        net_variance=('variance', 'sum'),
+        book_qty=('supabase_qty', 'sum'),
+        abs_error=('abs_error', 'sum'),
+    )
+    if 'book_value' in df:
+        columns.update(book_value=('book_value', 'sum'), error_value=('error_value', 'sum'))
+    out = grouped.agg(**columns)
+    out['item_accuracy'] = out['matched'] / out['lines']
+    out['qty_accuracy'] = _weighted_accuracy(out['book_qty'], out['abs_error'])
+    if 'book_value' in out:
+        out['value_accuracy'] = _weighted_accuracy(out['book_value'], out['error_value'])
+    return out.reset_index()
+
+def build_report(scanned_items, unit_costs=None):
+    """Compute lines, summary and rollups for a session.
+
+    Returns a dict of frames: 'lines', 'summary', 'by_location', 'by_prefix'
+    and 'unverified' (counted lines with no database quantity to compare).
+    Accuracy is given per item and weighted by quantity ('qty_accuracy');
+    'value_accuracy' is only reported when `unit_costs` are given.
+    """
+    lines = compute_metrics(build_frame(scanned_items, unit_costs))
+    unverified = build_unverified(scanned_items)
+    item_accuracy, qty_accuracy, value_accuracy = _accuracy(lines)
+    summary = {
+        'lines': len(lines),
+        'matched': int(lines['match'].sum()),
+        'mismatched': int((~lines['match']).sum()),
+        'net_variance': int(lines['variance'].sum()),
+        'abs_error': int(lines['abs_error'].sum()),
+        'item_accuracy': item_accuracy,
+        'qty_accuracy': qty_accuracy,
+    }
+    if value_accuracy is not None:
+        summary['value_accuracy'] = value_accuracy
+    summary['unverified'] = len(unverified)
+    summary = pd.DataFrame([summary])
+    return {
+        'lines': lines,
+        'summary': summary,
+        'by_location': rollup(lines, 'location'),
+        'by_prefix': rollup(lines, 'prefix'),
+        'unverified': unverified,
+    }
+
+def write_report(report, base_path, formats=('csv', 'parquet')):
+    """Write each report frame as <base>_<name>.<fmt>; returns the written paths.
+
+    Parquet needs pyarrow; without it only the CSV files are written.
+    """
+    base_path = os.path.splitext(base_path)[0]
+    written = []
+    for name, frame in report.items():
+        if 'csv' in formats:
+            path = f"{base_path}_{name}.csv"
+            frame.to_csv(path, index=False)
+            written.append(path)
+        if 'parquet' in formats:
+            path = f"{base_path}_{name}.parquet"
+            try:
+                frame.to_parquet(path, index=False)
+                written.append(path)
+            except ImportError as e:
+                print(f"Skipping Parquet output: {e}")
+    return written
@@ -0,0 +1,702 @@
+import os
+import threading
+import tkinter as tk
+from datetime import datetime
+from tkinter import messagebox, simpledialog, filedialog
+from session_status import SessionStatusWindow, SessionSummaryWindow
+from count_session import CountSession
+from lookup_client import lookup_source
+from write_queue import WriteQueue
+from ui_dispatch import UIDispatcher
+from count_journal import CountJournal
+from shared_session import SharedSessionSync
+from reconcile import ReconcileWindow
+from count_report import build_report, write_report
+from count_snapshot import CountSnapshot
+from catalog import load_catalog
+from connection_monitor import ConnectionMonitor, ResilientSource, STATE_COLORS, database_probe, catalog_row
+
+# Count screen controller shared by the cycle count dashboard and the inventory manager
+class CountScreen:
+    """Session, connection, tally and reconcile handling behind a count screen.
+
+    An app mixes this in, calls `setup_counting` from its __init__ and
+    builds its own widgets: `status_var`, `connection_label` and, on the
+    count screen, `barcode_var`, `barcode_entry`, `id_var`, `desc_var`,
+    `supabase_qty_var`, `user_qty_var`, `user_qty_entry`, `match_var`,
+    `match_label`, `tally_var`, `tally_frame` and `bin_var`. It may override
+    `offline_lookup` and `catalog_changed`. `COUNT_CLEAR_MS` is how long a
+    compared count stays on screen.
+    """
+
+    COUNT_CLEAR_MS = 15000
+
+    def setup_counting(self, supabase, station, service_url, catalog_cache, name, workstation=None,
+                       service_token=None):
+        """Create the session and its services, and resume a session left by the last run."""
+        self.supabase = supabase
+        self.station = station
+        self.catalog_cache = catalog_cache
+        self.workstation = workstation  # Services shared with other tools when hosted by the launcher
+        self.mode = None
+        self.current_item = None
+        self.clear_job = None  # Pending delayed clear of the count display
+        self.last_tally = None  # Code of the last piece tallied, for undo
+        self.all_items = {}  # {barcode: {id, description}} for the session's location
+
+        # A heartbeat tracks the connection; after repeated failures lookups
+        # come from the local catalog instead of waiting for timeouts
+        source = lookup_source(supabase, service_url, service_token)
+        self.monitor = workstation.monitor if workstation else ConnectionMonitor(database_probe(supabase, source))
+        self.monitor.subscribe(self.on_connection)
+        self.connection_state = self.monitor.state
+        self.connection_var = tk.StringVar(value=self.monitor.describe())
+        # Also takes quantity writes, so a lookup service sees them
+        self.source = ResilientSource(source, self.monitor, self.offline_lookup)
+        self.session = CountSession(source=self.source)
+        self.scanned_items = self.session.scanned_items  # {barcode: ItemCount}
+        self.status_window = None
+        self.summary_window = None  # Server-side status of the shared session
+        self.shared_sync = None  # Set while joined to a multi-station session
+
+        # Background threads update the UI through the dispatcher; quantity
+        # updates are saved in the background
+        self.ui = UIDispatcher(self.root)
+        self.pending_var = tk.StringVar()
+        self.writes = WriteQueue(self.ui, self.show_pending)
+
+        # Load the items of the session's location (or all items) at startup
+        self.journal = CountJournal(name)
+        self.location = self.journal.load_location()
+        self.load_all_items(refresh=False)
+
+        # Resume any session left in the local journal
+        self.session.restore(self.journal.load())
+        self.session.subscribe(self.journal.listener)
+        if self.scanned_items:
+            print(f"Resumed session with {len(self.scanned_items)} scanned items")
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Resume a freeze-at-start session if one was running
+        self.snapshot = None
+        self.snapshot_path = os.path.join(self.journal.directory, f"{name}.frozen.json")
+        if os.path.exists(self.snapshot_path):
+            try:
+                self.use_snapshot(CountSnapshot.load(self.snapshot_path))
+                print(f"Resumed frozen session from snapshot taken {self.snapshot.taken_at}")
+            except Exception as e:
+                print(f"Error loading frozen snapshot: {e}")
+
+    def offline_lookup(self, code):
+        """A catalog row for `code` while the database is unreachable, or None."""
+        item = self.all_items.get(code)
+        return catalog_row(code, item['id'], item['description']) if item else None
+
+    def catalog_changed(self):
+        """Called after `all_items` is replaced."""
+
+    def load_all_items(self, refresh=True):
+        """Load the session's items from Supabase to track unscanned items.
+
+        `refresh=False` reuses the catalog already loaded for the location under
+        the launcher, or the catalog cache file.
+        """
+        try:
+            if self.workstation:
+                self.all_items = self.workstation.catalog(self.location, refresh)
+            else:
+                self.all_items = load_catalog(self.supabase, self.catalog_cache, self.location, refresh)
+            if self.all_items:
+                print(f"Loaded {len(self.all_items)} items from {self.location or 'Supabase'}")
+            else:
+                print("No items found in Supabase")
+        except Exception as e:
+            print(f"Error loading all items: {e}")
+            self.all_items = {}
+        self.session.set_catalog(self.all_items, self.location)
+        self.catalog_changed()
+
+    # Connection
+    def check_connection(self):
+        """Check the connection to Supabase now rather than at the next heartbeat."""
+        self.monitor.check_now()
+
+    def on_connection(self, monitor):
+        # Called on whichever thread made the call or ran the heartbeat
+        self.ui.post(self.show_connection, monitor.state, monitor.describe(), monitor.last_error,
+                     key='connection')
+
+    def show_connection(self, state, text, error):
+        """Show the connection state and react when the breaker opens or closes."""
+        self.connection_var.set(text)
+        self.connection_label.configure(foreground=STATE_COLORS.get(state, ""))
+        previous, self.connection_state = self.connection_state, state
+        if state == previous:
+            return
+        if state == 'offline':
+            self.status_var.set(f"Database unreachable; counting against the local catalog: {error}")
+        elif previous == 'offline':
+            self.status_var.set(f"Connection restored. {datetime.now().strftime('%H:%M:%S')}")
+            self.refresh_offline_counts()
+        elif previous == 'connecting':
+            self.status_var.set(f"Connected to database. {datetime.now().strftime('%H:%M:%S')}")
+
+    def refresh_offline_counts(self):
+        """Fetch database quantities for items scanned while offline."""
+        codes = [barcode for barcode, item in self.scanned_items.items() if item.supabase_qty is None]
+        if not codes or self.session.source.local:
+            return
+
+        def perform_refresh():
+            try:
+                self.ui.post(self.apply_refreshed, self.session.lookup_many(codes))
+            except Exception as e:
+                print(f"Error refreshing offline counts: {e}")
+
+        threading.Thread(target=perform_refresh, daemon=True).start()
+
+    def apply_refreshed(self, rows):
+        for barcode, row in rows.items():
+            item = self.scanned_items.get(barcode)
+            if item is not None and item.supabase_qty is None and not row.get('offline'):
+                self.session.update_scan(barcode, supabase_qty=row['quantity'], location=row['location'])
+        if self.current_item is not None and self.current_item.barcode in rows and self.mode == "admin":
+            self.supabase_qty_var.set(str(self.current_item.supabase_qty))
+
+    def on_close(self):
+        """Flush the shared session and journal before closing the window."""
+        if self.writes.pending():
+            wait = messagebox.askyesnocancel(
+                "Unsaved Updates", f"{self.writes.pending()} quantity updates are still being saved. "
+                "Wait for them to finish before closing?"
+            )
+            if wait is None:
+                return
+            if wait:
+                self.writes.wait()
+        if self.session.bin and not messagebox.askyesno(
+            "Open Bin", "The open tally bin has not been closed. Discard it and exit?"
+        ):
+            return
+        self.leave_shared_session()
+        self.journal.close()
+        self.monitor.unsubscribe(self.on_connection)
+        self.root.destroy()
+
+    # Sessions
+    def start_new_session(self):
+        """Start a new scan session by resetting tracked items."""
+        if self.scanned_items and not messagebox.askyesno(
+            "Start New Session",
+            f"The current session has {len(self.scanned_items)} scanned items. "
+            "It will be archived and a new session started. Continue?"
+        ):
+            return
+        location = simpledialog.askstring(
+            "New Session", "Location to count (leave blank for the whole catalog):", parent=self.root
+        )
+        if location is None:
+            return
+        location = location.strip() or None
+        self.leave_shared_session()
+        self.session.clear()
+        reload = location != self.location
+        self.location = location
+        self.journal.save_location(location)
+        if self.snapshot is not None:
+            self.drop_snapshot()
+        elif reload:
+            self.load_all_items()
+        self.status_var.set(
+            f"New scan session started for {location or 'the whole catalog'} "
+            f"({len(self.all_items)} items). Select a mode to begin."
+        )
+        messagebox.showinfo("Session Started", "New scan session has begun. Scanned items will be tracked.")
+
+    def start_frozen_session(self):
+        """Start a session counted against a snapshot of quantities taken now."""
+        if self.scanned_items and not messagebox.askyesno(
+            "Start Frozen Session",
+            f"The current session has {len(self.scanned_items)} scanned items. "
+            "It will be archived and a new session started. Continue?"
+        ):
+            return
+        location = simpledialog.askstring(
+            "Frozen Session", "Location to snapshot (leave blank for the whole catalog):", parent=self.root
+        )
+        if location is None:
+            return
+        location = location.strip() or None
+        self.status_var.set(f"Taking snapshot of {location or 'the whole catalog'}...")
+
+        def perform_snapshot():
+            try:
+                snapshot = CountSnapshot.take(self.supabase, location)
+                self.ui.post(self.begin_frozen_session, snapshot)
+            except Exception as e:
+                error_msg = str(e)
+                self.ui.post(self.show_task_error, "Snapshot Error", error_msg)
+
+        threading.Thread(target=perform_snapshot).start()
+
+    def begin_frozen_session(self, snapshot):
+        """Switch to the new snapshot and start counting against it."""
+        self.leave_shared_session()
+        self.session.clear()
+        try:
+            snapshot.save(self.snapshot_path)
+        except OSError as e:
+            print(f"Error saving frozen snapshot: {e}")
+        self.journal.save_location(snapshot.location)
+        self.use_snapshot(snapshot)
+        self.status_var.set(
+            f"Frozen session started: {len(snapshot.items)} items snapshotted at {snapshot.taken_at}."
+        )
+
+    def use_snapshot(self, snapshot):
+        """Serve lookups from the snapshot and limit the session to its items."""
+        self.snapshot = snapshot
+        self.session.source = snapshot
+        self.location = snapshot.location
+        self.all_items = snapshot.all_items()
+        self.session.set_catalog(self.all_items, self.location)
+        self.catalog_changed()
+
+    def drop_snapshot(self):
+        """Leave frozen mode and go back to live lookups on the session's catalog."""
+        self.snapshot = None
+        self.session.source = self.source
+        if os.path.exists(self.snapshot_path):
+            os.remove(self.snapshot_path)
+        self.load_all_items()
+
+    def check_movements(self):
+        """Report items whose live quantity moved since the snapshot was taken."""
+        if self.snapshot is None:
+            messagebox.showinfo("Check Movements", "No frozen session is running.")
+            return
+        self.status_var.set("Checking movements since snapshot...")
+
+        def perform_check():
+            try:
+                moved = self.snapshot.movements(self.supabase)
+                self.ui.post(self.show_movements, moved)
+            except Exception as e:
+                error_msg = str(e)
+                self.ui.post(self.show_task_error, "Movement Check Error", error_msg)
+
+        threading.Thread(target=perform_check).start()
+
+    def show_task_error(self, title, error_msg):
+        """Report a failed background task without touching the count screen."""
+        self.status_var.set(f"Error: {error_msg}")
+        messagebox.showerror(title, f"An error occurred: {error_msg}")
+
+    def show_movements(self, moved):
+        self.status_var.set(f"{len(moved)} items moved since snapshot taken {self.snapshot.taken_at}.")
+        if not moved:
+            messagebox.showinfo("Check Movements", "No items moved since the snapshot was taken.")
+            return
+        lines = [f"{m['barcode']}: {m['frozen_qty']} -> {m['live_qty']} ({m['change']:+d})" for m in moved[:20]]
+        if len(moved) > 20:
+            lines.append(f"... and {len(moved) - 20} more")
+        messagebox.showinfo("Check Movements", "\n".join(lines))
+
+    def join_shared_session(self):
+        """Join a session shared by several counting stations."""
+        session_id = simpledialog.askstring("Shared Session", "Session name:", parent=self.root)
+        if not session_id or not session_id.strip():
+            return
+        if self.scanned_items and not messagebox.askyesno(
+            "Join Shared Session",
+            f"The current session has {len(self.scanned_items)} scanned items. "
+            "It will be archived before joining. Continue?"
+        ):
+            return
+
+        self.leave_shared_session()
+        self.session.clear()
+        self.shared_sync = SharedSessionSync(
+            self.supabase, session_id.strip(), self.station,
+            on_merged=lambda rows: self.ui.post(self.apply_merged_rows, rows),
+            location=self.location
+        )
+        self.session.subscribe(self.shared_sync.listener)
+        self.shared_sync.start()
+        self.status_var.set(f"Joined shared session {session_id.strip()} as {self.station}.")
+
+    def leave_shared_session(self):
+        """Flush pending counts and stop syncing with the shared session."""
+        if self.shared_sync is None:
+            return
+        self.session.unsubscribe(self.shared_sync.listener)
+        self.shared_sync.stop()
+        self.shared_sync = None
+
+    def apply_merged_rows(self, rows):
+        """Apply merged counts from all stations to the session status."""
+        if self.shared_sync is None:
+            return
+        for row in rows:
+            self.session.apply_merged(row)
+
+    # Counting
+    def clear_display(self):
+        """Clear the display fields and prepare for the next scan."""
+        self.id_var.set("")
+        self.desc_var.set("")
+        self.supabase_qty_var.set("")
+        self.user_qty_var.set("")
+        self.match_var.set("")
+        self.match_label.configure(background="#f0f0f0")
+        self.current_item = None
+        self.clear_job = None
+        self.barcode_var.set("")
+        self.barcode_entry.focus()  # Focus back on barcode entry for the next scan
+
+    def schedule_clear(self, delay):
+        """Clear the display after a delay unless another item is shown first."""
+        self.cancel_clear()
+        self.clear_job = self.root.after(delay, self.clear_display)
+
+    def cancel_clear(self):
+        if self.clear_job is not None:
+            self.root.after_cancel(self.clear_job)
+            self.clear_job = None
+
+    def lookup_barcode(self, event=None):
+        """Look up the scanned barcode in Supabase."""
+        barcode = self.barcode_var.get().strip()
+        if not barcode:
+            messagebox.showwarning("Input Error", "Please scan a barcode")
+            return
+
+        if self.tally_var.get():
+            self.tally_scan(barcode)
+            return
+
+        # Frozen sessions are served from the snapshot without touching the network
+        if self.session.source.local:
+            item = self.session.lookup(barcode)
+            if item:
+                self.display_item(item)
+            else:
+                self.handle_not_found(barcode)
+            return
+
+        self.status_var.set(f"Looking up barcode: {barcode}...")
+        self.root.update_idletasks()
+
+        def perform_lookup():
+            try:
+                item = self.session.lookup(barcode)
+                if item:
+                    self.ui.post(self.display_item, item)
+                else:
+                    self.ui.post(self.handle_not_found, barcode)
+            except Exception as e:
+                error_msg = str(e)
+                self.ui.post(self.handle_error, error_msg)
+
+        threading.Thread(target=perform_lookup).start()
+
+    def display_item(self, item):
+        """Display the item details based on the mode."""
+        if not self.session.in_scope(item):
+            self.handle_out_of_scope(item)
+            return
+        # Track the scanned item (on the UI thread, so status views can follow)
+        self.cancel_clear()
+        self.current_item = self.session.scan(item)
+        self.id_var.set(self.current_item.id)
+        if self.mode == "admin":
+            self.desc_var.set(self.current_item.description)
+            # Items looked up offline have no database quantity yet
+            qty = self.current_item.supabase_qty
+            self.supabase_qty_var.set("Offline" if qty is None else str(qty))
+        self.user_qty_var.set("")
+        self.match_var.set("")
+        self.match_label.configure(background="#f0f0f0")
+
+        self.status_var.set(f"Item found: {self.current_item.id}. Enter your count.")
+        self.user_qty_entry.focus()  # Focus on quantity entry after lookup
+
+    def handle_not_found(self, barcode):
+        """Handle case where the barcode is not found."""
+        self.clear_display()
+        self.status_var.set(f"No item found with barcode: {barcode}")
+        messagebox.showinfo("Not Found", f"No item found with barcode: {barcode}")
+        self.barcode_entry.focus()
+
+    def handle_out_of_scope(self, item):
+        """Refuse to count an item stored outside the session's location."""
+        self.clear_display()
+        self.status_var.set(f"{item['id']} is in {item.get('location')}, not {self.location}; not counted.")
+        messagebox.showwarning(
+            "Other Location",
+            f"{item['id']} belongs to {item.get('location')}, outside this session's location "
+            f"({self.location}). It was not counted."
+        )
+        self.barcode_entry.focus()
+
+    def handle_error(self, error_msg):
+        """Handle errors during lookup."""
+        self.status_var.set(f"Error: {error_msg}")
+        messagebox.showerror("Database Error", f"An error occurred: {error_msg}")
+        self.clear_display()
+        self.barcode_entry.focus()
+
+    def compare_quantities(self, event=None):
+        """Compare the user's counted quantity with the Supabase quantity."""
+        if not self.current_item:
+            messagebox.showwarning("No Item", "Please scan an item first")
+            return
+
+        try:
+            user_qty = int(self.user_qty_var.get().strip())
+            if user_qty < 0:
+                messagebox.showwarning("Invalid Quantity", "Quantity cannot be negative")
+                return
+
+            # Record the count in the session and check it against the database quantity
+            matched = self.session.count(self.current_item.barcode, user_qty)
+            supabase_qty = self.current_item.supabase_qty
+
+            if supabase_qty is None:
+                # Counted offline; compared once the connection returns
+                self.match_var.set("Recorded")
+                self.match_label.configure(background="#f0f0f0")
+                self.status_var.set("Count recorded offline; it will be compared when the connection returns.")
+            elif matched:
+                self.match_var.set("Match")
+                self.match_label.configure(background="green")
+                self.status_var.set("Quantities match!")
+            else:
+                self.match_var.set("Mismatch")
+                self.match_label.configure(background="red")
+                if self.mode == "admin":
+                    self.status_var.set(f"Mismatch: Supabase has {supabase_qty}, you counted {user_qty}")
+                else:
+                    self.status_var.set("Quantities do not match")
+
+            # Clear the display for the next scan
+            self.schedule_clear(self.COUNT_CLEAR_MS)
+
+        except ValueError:
+            messagebox.showwarning("Invalid Input", "Please enter a valid number")
+            self.user_qty_var.set("")
+            self.user_qty_entry.focus()
+
+    def update_quantity(self):
+        """Update the quantity in Supabase (admin mode only)."""
+        if self.mode != "admin":
+            return
+
+        if not self.current_item:
+            messagebox.showwarning("No Item", "Please scan an item first")
+            return
+
+        if not self.monitor.allow():
+            messagebox.showwarning("Offline", "The database is unreachable. Quantities can be updated "
+                                   "once the connection returns.")
+            return
+
+        try:
+            new_qty = int(self.user_qty_var.get().strip())
+            if new_qty < 0:
+                messagebox.showwarning("Invalid Quantity", "Quantity cannot be negative")
+                return
+
+            # Update the tracked item and display now; the write runs in the background
+            barcode = self.current_item.barcode
+            old_qty = self.current_item.supabase_qty
+            session_id = self.shared_sync.session_id if self.shared_sync else None
+            self.session.set_quantity(barcode, new_qty)
+            self.supabase_qty_var.set(str(new_qty))
+            self.compare_quantities()  # Re-compare to update the match status
+            # The database records the movement from the quantity it holds, not from old_qty,
+            # which may be stale
+            self.writes.submit(
+                barcode,
+                lambda: self.source.update(barcode, {'quantity': new_qty}, 'count', self.station, session_id),
+                on_failure=lambda error: self.rollback_quantity(barcode, old_qty, error)
+            )
+
+            # Clear the display for the next scan after 3 seconds
+            self.schedule_clear(3000)
+
+        except ValueError:
+            messagebox.showwarning("Invalid Input", "Please enter a valid number")
+            self.user_qty_var.set("")
+            self.user_qty_entry.focus()
+        except Exception as e:
+            self.status_var.set(f"Error updating quantity: {str(e)}")
+            messagebox.showerror("Update Error", f"Failed to update quantity: {str(e)}")
+
+    def rollback_quantity(self, barcode, old_qty, error):
+        """Undo an optimistic quantity update whose write failed."""
+        # A newer update of the same item is still being saved; let it decide
+        if not self.writes.pending(barcode):
+            self.session.update_scan(barcode, supabase_qty=old_qty)
+            if self.current_item is not None and self.current_item.barcode == barcode:
+                self.supabase_qty_var.set(str(old_qty))
+                self.compare_quantities()
+        self.status_var.set(f"Error updating quantity of {barcode}; rolled back to {old_qty}: {error}")
+        messagebox.showerror(
+            "Update Error",
+            f"Failed to update quantity of {barcode}: {error}\n\nThe database quantity is still {old_qty}."
+        )
+
+    def show_pending(self, count):
+        self.pending_var.set(f"Saving {count} update{'s' if count != 1 else ''}..." if count else "")
+
+    # Tally bins
+    def toggle_tally(self):
+        """Switch between tally mode and entering a count per scan."""
+        if self.tally_var.get():
+            self.cancel_clear()
+            self.clear_display()
+            self.tally_frame.pack(fill=tk.X, pady=10)
+            self.user_qty_entry.state(['disabled'])
+            self.update_bin_status()
+            self.status_var.set("Tally mode: scan each piece, then close the bin.")
+        else:
+            self.tally_frame.pack_forget()
+            self.user_qty_entry.state(['!disabled'])
+            if self.session.bin:
+                self.status_var.set("The open bin is kept until it is closed in tally mode.")
+
+    def tally_scan(self, code):
+        """Count one piece in the open bin; items are only looked up when the bin is closed."""
+        self.cancel_clear()
+        pieces = self.session.tally(code)
+        self.last_tally = code
+        self.show_tally(code, pieces)
+        self.barcode_var.set("")
+        self.barcode_entry.focus()
+
+    def undo_tally(self):
+        """Take back the last piece tallied."""
+        if self.last_tally is None or self.last_tally not in self.session.bin:
+            return
+        pieces = self.session.tally(self.last_tally, -1)
+        self.show_tally(self.last_tally, pieces)
+        self.barcode_entry.focus()
+
+    def show_tally(self, code, pieces):
+        # Names come from the local catalog; unknown codes are checked when the bin closes
+        item = self.all_items.get(code)
+        self.id_var.set(item['id'] if item else code)
+        if self.mode == "admin":
+            self.desc_var.set(item['description'] if item else "Not in catalog")
+        self.user_qty_var.set(str(pieces))
+        self.update_bin_status()
+        self.status_var.set(f"Tallied {item['id'] if item else code}: {pieces} pieces")
+
+    def update_bin_status(self):
+        items, pieces = self.session.bin_totals()
+        self.bin_var.set(f"Open bin: {items} items, {pieces} pieces")
+
+    def close_bin(self):
+        """Commit the open bin to the session with one batched lookup."""
+        if not self.session.bin:
+            messagebox.showinfo("Close Bin", "The open bin is empty")
+            return
+        tallies = self.session.close_bin()
+        self.last_tally = None
+        self.update_bin_status()
+        self.clear_display()
+
+        if self.session.source.local:
+            self.commit_bin(tallies, self.session.lookup_many(tallies))
+            return
+
+        self.status_var.set(f"Closing bin: looking up {len(tallies)} items...")
+
+        def perform_lookup():
+            try:
+                rows = self.session.lookup_many(tallies)
+                self.ui.post(self.commit_bin, tallies, rows)
+            except Exception as e:
+                error_msg = str(e)
+                self.ui.post(self.handle_bin_error, tallies, error_msg)
+
+        threading.Thread(target=perform_lookup).start()
+
+    def commit_bin(self, tallies, rows):
+        unresolved = self.session.commit_tallies(tallies, rows)
+        pieces = sum(tallies.values()) - sum(unresolved.values())
+        self.status_var.set(f"Bin closed: {len(tallies) - len(unresolved)} items, {pieces} pieces counted")
+        if unresolved:
+            listed = "\n".join(f"{code}: {count} pieces" for code, count in list(unresolved.items())[:10])
+            messagebox.showwarning(
+                "Unknown Items",
+                f"{len(unresolved)} scanned codes did not match any item in this session and were not counted:\n{listed}"
+            )
+
+    def handle_bin_error(self, tallies, error_msg):
+        # Put the pieces back so the bin can be closed again
+        self.session.reopen_bin(tallies)
+        if self.tally_var.get():
+            self.update_bin_status()
+        self.status_var.set(f"Error closing bin: {error_msg}")
+        messagebox.showerror("Database Error", f"Failed to close the bin: {error_msg}")
+
+    # Reconcile, reports and status
+    def show_reconcile(self):
+        """Preview and apply every mismatched count in one batch (admin mode only)."""
+        if self.mode != "admin":
+            return
+        session_id = self.shared_sync.session_id if self.shared_sync else None
+        ReconcileWindow(self.root, self.ui, self.session, self.supabase, self.station, session_id, self.source,
+                        frozen=self.snapshot is not None)
+
+    def export_report(self):
+        """Export variance and accuracy reports for the session (admin mode only)."""
+        if self.mode != "admin":
+            return
+        output = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            initialfile=f"count_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            filetypes=[("Report files", "*.csv *.parquet")]
+        )
+        if not output:
+            return
+        try:
+            report = build_report(self.scanned_items)
+            written = write_report(report, output)
+            summary = report['summary'].iloc[0]
+            self.status_var.set(
+                f"Report written: {summary['lines']} lines, "
+                f"{summary['item_accuracy']:.1%} item accuracy, {summary['qty_accuracy']:.1%} quantity-weighted accuracy"
+            )
+            unverified = ""
+            if summary['unverified']:
+                unverified = (f"\n\n{summary['unverified']} items counted without a database quantity "
+                              "are listed in the unverified report, not in the accuracy figures.")
+            messagebox.showinfo("Report Exported", "Written:\n" + "\n".join(written) + unverified)
+        except Exception as e:
+            self.status_var.set(f"Error exporting report: {str(e)}")
+            messagebox.showerror("Export Error", f"Failed to export report: {str(e)}")
+
+    def show_session_status(self):
+        """Show the live session status window, creating it on first use."""
+        if self.shared_sync is not None:
+            self.show_session_summary()
+            return
+        if self.status_window is None or not self.status_window.matches(self.mode):
+            if self.status_window is not None:
+                self.status_window.destroy()
+            self.status_window = SessionStatusWindow(self.root, self.session, self.mode)
+        self.status_window.show()
+
+    def show_session_summary(self):
+        """Show a shared session's status as totalled by the database, without the catalog."""
+        session_id = self.shared_sync.session_id
+        if self.summary_window is None or not self.summary_window.matches(self.mode, session_id):
+            if self.summary_window is not None:
+                self.summary_window.destroy()
+            self.summary_window = SessionSummaryWindow(self.root, self.ui, self.supabase, session_id, self.mode)
+        else:
+            self.summary_window.refresh()
+        self.summary_window.show()
@@ -0,0 +1,337 @@
+# Headless cycle count engine shared by the count screens
+
+class ItemCount:
+    """Compact per-item count state.
+
+    Supports read access by key (`item['id']`, `item.get('user_qty')`) so
+    listeners, the journal and reports can treat it like the dicts used before.
+    `user_qty` is the item's count; in a shared session it is the total
+    merged across stations and `local_qty` is this station's part of it.
+    """
+
+    __slots__ = ('barcode', 'id', 'description', 'location', 'supabase_qty', 'user_qty', 'stations',
+                 'local_qty')
+
+    def __init__(self, barcode, id, description, supabase_qty=None, user_qty=None, location=None, stations=1,
+                 local_qty=None):
+        self.barcode = barcode
+        self.id = id
+        self.description = description
+        self.supabase_qty = supabase_qty
+        self.user_qty = user_qty
+        self.location = location
+        self.stations = stations
+        self.local_qty = local_qty
+
+    @classmethod
+    def from_row(cls, row):
+        """Build from a components row (quantity is the database quantity)."""
+        return cls(row['barcode'], row['id'], row['description'], row.get('quantity'),
+                   None, row.get('location'))
+
+    def set_local(self, local_qty):
+        """Set this station's count, keeping what other stations counted in the total."""
+        others = (self.user_qty or 0) - (self.local_qty or 0)
+        self.local_qty = local_qty
+        self.user_qty = None if local_qty is None and not others else others + (local_qty or 0)
+
+    @property
+    def variance(self):
+        if self.user_qty is None or self.supabase_qty is None:
+            return None
+        return self.user_qty - self.supabase_qty
+
+    @property
+    def counted(self):
+        return self.user_qty is not None
+
+    @property
+    def matched(self):
+        return self.user_qty is not None and self.user_qty == self.supabase_qty
+
+    def __getitem__(self, key):
+        if key == 'variance':
+            return self.variance
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class LiveLookup:
+    """Look up items in the components table, by barcode or by ID for manual entry."""
+
+    local = False
+
+    def __init__(self, supabase):
+        self.supabase = supabase
+
+    def lookup(self, code):
+        result = self.supabase.table('components').select('*').eq('barcode', code).execute()
+        if not result.data:
+            result = self.supabase.table('components').select('*').eq('id', code).execute()
+        return result.data[0] if result.data else None
+
+    def update(self, barcode, fields, reason='adjust', station=None, session_id=None):
+        """Update fields of one item and return the updated row.
+
+        update_component changes the row and records the movement in one
+        transaction, measured from the quantity it locked rather than the
+        one this station last saw. `reason` is 'adjust', 'count' or 'move'.
+        """
+        result = self.supabase.rpc('update_component', {
+            'p_barcode': barcode, 'p_fields': fields, 'p_reason': reason, 'p_station': station,
+            'p_session_id': session_id
+        }).execute()
+        if not result.data:
+            raise RuntimeError(f"No item found with barcode: {barcode}")
+        return result.data[0]
+
+    def refresh(self, barcodes):
+        """Nothing is cached here; rows are read fresh on every lookup."""
+
+    def lookup_many(self, codes):
+        """Return {code: row} for many codes with one `in` query, retrying misses by ID."""
+        codes = list(dict.fromkeys(codes))
+        if not codes:
+            return {}
+        result = self.supabase.table('components').select('*').in_('barcode', codes).execute()
+        rows = {row['barcode']: row for row in result.data or []}
+        missing = [code for code in codes if code not in rows]
+        if missing:
+            result = self.supabase.table('components').select('*').in_('id', missing).execute()
+            for row in result.data or []:
+                rows.setdefault(row['id'], row)
+        return rows
+
+class CountSession:
+    """Tracks a count session independently of any UI.
+
+    The engine keeps scanned items, the unscanned set and match state, and
+    reports every change to listeners as (event, barcode, item):
+    'scanned' and 'updated' for local scans and counts, 'merged' for counts
+    merged from other stations, 'reset' when the catalog or restored state
+    is replaced, and 'cleared' for a new session. `source` answers lookups
+    (a LiveLookup or a CountSnapshot); `source.local` tells callers whether
+    a lookup may block on the network. In tally mode each scan adds a piece
+    to an in-memory bin; nothing is looked up or emitted until the bin is
+    closed. A session limited to one `location` only counts items stored
+    there, so unscanned items and variances cover that location alone.
+    Not thread-safe: drive it from one thread and run only `lookup`
+    and `lookup_many` elsewhere.
+    """
+
+    def __init__(self, all_items=None, source=None):
+        self.source = source
+        self.all_items = {}
+        self.location = None  # Location the session is limited to, None for the whole catalog
+        self.scanned_items = {}  # {barcode: ItemCount}
+        self.unscanned = set()
+        self.listeners = []
+        self.bin = {}  # {scanned code: pieces} for the open tally bin
+        self.set_catalog(all_items or {})
+
+    # Events
+    def subscribe(self, listener):
+        """Register a callable receiving (event, barcode, item)."""
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def _emit(self, event, barcode=None, item=None):
+        for listener in list(self.listeners):
+            listener(event, barcode, item)
+
+    # Catalog and session lifecycle
+    def set_catalog(self, all_items, location=None):
+        """Replace the catalog the unscanned set is measured against."""
+        self.all_items = all_items
+        self.location = location
+        self.unscanned = set(all_items) - set(self.scanned_items)
+        self._emit('reset')
+
+    def clear(self):
+        """Forget all scans for a new session."""
+        self.scanned_items.clear()
+        self.bin = {}
+        self.unscanned = set(self.all_items)
+        self._emit('cleared')
+
+    def restore(self, scanned_items):
+        """Load scans recovered from a journal without re-emitting them as scans."""
+        self.scanned_items.clear()
+        for barcode, details in scanned_items.items():
+            self.scanned_items[barcode] = ItemCount(
+                barcode, details['id'], details['description'], details.get('supabase_qty'),
+                details.get('user_qty'), details.get('location'),
+                # Journals written before local counts were kept hold only the total
+                local_qty=details.get('local_qty', details.get('user_qty'))
+            )
+        self.unscanned = set(self.all_items) - set(self.scanned_items)
+        self._emit('reset')
+
+    # Counting
+    def in_scope(self, row):
+        """Check whether a looked-up row belongs to the session's location.
+
+        Rows served from the local catalog while offline carry no location;
+        they are in scope when the session's catalog has them.
+        """
+        if row.get('offline'):
+            return self.location is None or row['barcode'] in self.all_items
+        return self.location is None or row.get('location') == self.location
+
+    def lookup(self, code):
+        """Find a components row through the session's source."""
+        return self.source.lookup(code)
+
+    def scan(self, row):
+        """Track a looked-up item; a rescan resets this station's count."""
+        barcode = row['barcode']
+        event = 'updated' if barcode in self.scanned_items else 'scanned'
+        item = ItemCount.from_row(row)
+        earlier = self.scanned_items.get(barcode)
+        if earlier is not None and earlier.user_qty != earlier.local_qty:
+            # Keep what other stations in a shared session counted
+            item.user_qty, item.local_qty, item.stations = earlier.user_qty, earlier.local_qty, earlier.stations
+            item.set_local(None)
+        self.scanned_items[barcode] = item
+        self.unscanned.discard(barcode)
+        self._emit(event, barcode, item)
+        return item
+
+    def lookup_many(self, codes):
+        """Find components rows for many codes at once; returns {code: row}."""
+        return self.source.lookup_many(codes)
+
+    def count(self, barcode, user_qty):
+        """Record a counted quantity and return whether it matches the database."""
+        if user_qty < 0:
+            raise ValueError("Quantity cannot be negative")
+        item = self.scanned_items[barcode]
+        item.set_local(user_qty)
+        self._emit('updated', barcode, item)
+        return item.matched
+
+    def add_count(self, row, pieces):
+        """Add counted pieces to an item, tracking it first if it was not scanned yet."""
+        barcode = row['barcode']
+        item = self.scanned_items.get(barcode)
+        if item is None:
+            item = ItemCount.from_row(row)
+            self.scanned_items[barcode] = item
+            self.unscanned.discard(barcode)
+            self._emit('scanned', barcode, item)
+        item.set_local(max(0, (item.local_qty or 0) + pieces))
+        self._emit('updated', barcode, item)
+        return item
+
+    # Tally bins
+    def tally(self, code, step=1):
+        """Add (or with a negative step, take back) pieces of a code in the open bin."""
+        pieces = self.bin.get(code, 0) + step
+        if pieces > 0:
+            self.bin[code] = pieces
+        else:
+            self.bin.pop(code, None)
+        return max(pieces, 0)
+
+    def bin_totals(self):
+        return len(self.bin), sum(self.bin.values())
+
+    def close_bin(self):
+        """Close the open bin and return its {code: pieces}; scanning continues in a new bin."""
+        tallies, self.bin = self.bin, {}
+        return tallies
+
+    def reopen_bin(self, tallies):
+        """Put back tallies whose commit failed."""
+        for code, pieces in tallies.items():
+            self.tally(code, pieces)
+
+    def commit_tallies(self, tallies, rows):
+        """Add closed-bin pieces to the counts using rows from `lookup_many(tallies)`.
+
+        Pieces are added to each item's count, so an item found in several
+        bins is counted once in total. Returns {code: pieces} for codes that
+        did not resolve to an item in the session's location.
+        """
+        unresolved = {}
+        committed = {}  # {barcode: (row, pieces)}
+        for code, pieces in tallies.items():
+            row = rows.get(code)
+            if row is None or not self.in_scope(row):
+                unresolved[code] = pieces
+                continue
+            # A barcode and its ID may both have been scanned into one bin
+            _, earlier = committed.get(row['barcode'], (row, 0))
+            committed[row['barcode']] = (row, earlier + pieces)
+        for row, pieces in committed.values():
+            self.add_count(row, pieces)
+        return unresolved
+
+    def set_quantity(self, barcode, quantity):
+        """Record that the database quantity was set to the counted quantity."""
+        item = self.scanned_items.get(barcode)
+        if item is None:
+            return
+        item.supabase_qty = quantity
+        if item.user_qty != quantity:
+            # Other stations' counts stay in the total; this station's part makes up the rest
+            others = (item.user_qty or 0) - (item.local_qty or 0)
+            item.set_local(max(0, quantity - others))
+        self._emit('updated', barcode, item)
+
+    def update_scan(self, barcode, **fields):
+        """Update fields of an already scanned item."""
+        item = self.scanned_items.get(barcode)
+        if item is None:
+            return
+        for name, value in fields.items():
+            setattr(item, name, value)
+        self._emit('updated', barcode, item)
+
+    def apply_merged(self, row):
+        """Apply a merged row from a shared session; listeners do not re-send it.
+
+        The row's count is the total over all stations; this station's own
+        count is kept as it is. When the row has `others_qty` (the other
+        stations' part), the total is rebuilt from it and this station's
+        latest count, which may not have reached the server yet.
+        """
+        barcode = row['barcode']
+        item = self.scanned_items.get(barcode)
+        if item is None:
+            item = ItemCount(barcode, row['id'], row['description'])
+            self.scanned_items[barcode] = item
+            self.unscanned.discard(barcode)
+        # Update in place so screens holding the item see the merged values
+        item.supabase_qty = row['supabase_qty']
+        if 'others_qty' in row:
+            others = row['others_qty']
+            item.user_qty = None if others is None and item.local_qty is None else (others or 0) + (item.local_qty or 0)
+        else:
+            item.user_qty = row['user_qty']
+        item.location = row.get('location')
+        item.stations = row.get('stations', 1)
+        self._emit('merged', barcode, item)
+
+    # Queries
+    def counts(self):
+        return len(self.scanned_items), len(self.unscanned)
+
+    def mismatches(self):
+        """Counted items whose count differs from the database quantity."""
+        return [item for item in self.scanned_items.values()
+                if item.user_qty is not None and item.supabase_qty is not None
+                and item.user_qty != item.supabase_qty]
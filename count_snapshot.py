@@ -0,0 +1,87 @@
+import json
+import os
+from datetime import datetime
+from catalog import CompactCatalog, fetch_components
+
+# Freeze-at-start count snapshot
+class CountSnapshot:
+    """Quantities frozen when a count session starts.
+
+    Every lookup and comparison is served from the snapshot, so counting
+    needs no network and variances are measured against one point in time.
+    Movements made while the count runs are found by comparing the frozen
+    quantities with the live table.
+    """
+
+    local = True
+
+    def __init__(self, rows, location=None, taken_at=None):
+        self.items = {row['barcode']: row for row in rows}
+        self.ids = {row['id']: row['barcode'] for row in rows}
+        self.location = location
+        self.taken_at = taken_at or datetime.now().isoformat(timespec='seconds')
+
+    @classmethod
+    def take(cls, supabase, location=None):
+        """Fetch one bulk snapshot of the catalog or of a single location."""
+        rows = fetch_components(supabase, 'id,barcode,description,quantity,location', location)
+        return cls(rows, location)
+
+    def lookup(self, code):
+        """Find an item by barcode, or by ID for manual entry; returns a copy."""
+        item = self.items.get(code)
+        if item is None and code in self.ids:
+            item = self.items[self.ids[code]]
+        return dict(item) if item else None
+
+    def lookup_many(self, codes):
+        """Return {code: row} for the codes found in the snapshot."""
+        rows = {}
+        for code in codes:
+            item = self.lookup(code)
+            if item:
+                rows[code] = item
+        return rows
+
+    def all_items(self):
+        """Compact catalog of the snapshotted items, in the shape the apps use."""
+        return CompactCatalog.build(self.items.values())
+
+    def movements(self, supabase):
+        """Compare frozen quantities with live ones; returns rows that moved."""
+        live = fetch_components(supabase, 'barcode,quantity,location', self.location)
+        moved = []
+        live_barcodes = set()
+        for row in live:
+            live_barcodes.add(row['barcode'])
+            frozen = self.items.get(row['barcode'])
+            frozen_qty = frozen['quantity'] if frozen else None
+            if frozen_qty != row['quantity']:
+                moved.append({
+                    'barcode': row['barcode'],
+                    'frozen_qty': frozen_qty,
+                    'live_qty': row['quantity'],
+                    'change': (row['quantity'] or 0) - (frozen_qty or 0)
+                })
+        for barcode, frozen in self.items.items():
+            if barcode not in live_barcodes:
+                moved.append({
+                    'barcode': barcode,
+                    'frozen_qty': frozen['quantity'],
+                    'live_qty': None,
+                    'change': -(frozen['quantity'] or 0)
+                })
+        return moved
+
+    def save(self, path):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'location': self.location, 'taken_at': self.taken_at,
+                       'rows': list(self.items.values())}, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['rows'], data['location'], data['taken_at'])
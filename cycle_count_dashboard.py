@@ -1,13 +1,14 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
 from tkinter.font import Font
-import threading
-import time
-from datetime import datetime
 import configparser
 import sys
 import os
-from supabase import create_client
+import socket
+from workstation import shared_client
+from ui_profiler import start_profiling
+from count_screen import CountScreen
+from connection_monitor import STATE_COLORS
 
 # Configuration handling
 def load_config():
@@ -36,18 +37,22 @@ def load_config():
 config = load_config()
 SUPABASE_URL = config['SUPABASE']['URL']
 SUPABASE_KEY = config['SUPABASE']['KEY']
+STATION_NAME = config.get('STATION', 'NAME', fallback=socket.gethostname())
+CATALOG_CACHE = config.get('CATALOG', 'CACHE', fallback=None)
+SERVICE_URL = config.get('SERVICE', 'URL', fallback=None)
+SERVICE_TOKEN = config.get('SERVICE', 'TOKEN', fallback=None)
 
 # Initialize Supabase client
 try:
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    supabase = shared_client(SUPABASE_URL, SUPABASE_KEY)
 except Exception as e:
     print(f"Error connecting to Supabase: {e}")
     messagebox.showerror("Connection Error", f"Failed to connect to Supabase: {e}")
     sys.exit(1)
 
 # Cycle Count Dashboard Application
-class CycleCountDashboard:
-    def __init__(self, root):
+class CycleCountDashboard(CountScreen):
+    def __init__(self, root, workstation=None):
         self.root = root
         self.root.title("Cycle Count Dashboard")
         self.root.geometry("800x600")
@@ -62,35 +67,13 @@ class CycleCountDashboard:
         # Default PIN
         self.default_pin = "0000"
         
-        # Current mode (admin or user)
-        self.mode = None
-        
-        # Current item being counted
-        self.current_item = None
-        
-        # Session tracking
-        self.scanned_items = {}  # Dictionary to store scanned items: {barcode: {details}}
-        self.all_items = {}  # Dictionary of all items: {barcode: {id, description}}
-        
-        # Load all items at startup
-        self.load_all_items()
+        # Session, connection and tally handling live in CountScreen
+        self.setup_counting(supabase, STATION_NAME, SERVICE_URL, CATALOG_CACHE, 'cycle_count', workstation,
+                           SERVICE_TOKEN)
         
         # Show the main menu directly
         self.show_main_menu()
-    
-    def load_all_items(self):
-        """Load all items from Supabase to track unscanned items."""
-        try:
-            result = supabase.table('components').select('barcode', 'id', 'description').execute()
-            if result.data:
-                self.all_items = {item['barcode']: {'id': item['id'], 'description': item['description']} for item in result.data}
-                print(f"Loaded {len(self.all_items)} items from Supabase")
-            else:
-                self.all_items = {}
-                print("No items found in Supabase")
-        except Exception as e:
-            print(f"Error loading all items: {e}")
-            self.all_items = {}
+        self.monitor.start()
     
     def show_main_menu(self):
         """Display the main menu with options for Admin Count and User Count."""
@@ -111,36 +94,33 @@ class CycleCountDashboard:
         # Menu options
         ttk.Button(self.main_frame, text="Start New Scan Session", 
                   command=self.start_new_session).pack(pady=10)
+        ttk.Button(self.main_frame, text="Start Frozen Session", 
+                  command=self.start_frozen_session).pack(pady=10)
+        ttk.Button(self.main_frame, text="Check Movements", 
+                  command=self.check_movements).pack(pady=10)
+        ttk.Button(self.main_frame, text="Join Shared Session", 
+                  command=self.join_shared_session).pack(pady=10)
         ttk.Button(self.main_frame, text="Admin Count", 
                   command=self.show_admin_pin_screen).pack(pady=10)
         ttk.Button(self.main_frame, text="User Count", 
                   command=lambda: self.show_count_screen("user")).pack(pady=10)
         
         # Status bar
+        status_frame = ttk.Frame(self.root)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
         self.status_var = tk.StringVar()
-        self.status_bar = ttk.Label(self.root, textvariable=self.status_var, 
+        self.status_bar = ttk.Label(status_frame, textvariable=self.status_var, 
                                    relief=tk.SUNKEN, anchor=tk.W)
-        self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.status_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.connection_label = ttk.Label(status_frame, textvariable=self.connection_var, relief=tk.SUNKEN,
+                                          width=22, anchor=tk.CENTER,
+                                          foreground=STATE_COLORS.get(self.connection_state, ""))
+        self.connection_label.pack(side=tk.RIGHT)
+        ttk.Label(self.root, textvariable=self.pending_var, foreground="#b36b00",
+                  anchor=tk.E).pack(side=tk.BOTTOM, fill=tk.X)
         
         self.check_connection()
     
-    def check_connection(self):
-        """Check the connection to Supabase."""
-        def perform_check():
-            try:
-                result = supabase.table('components').select('*').limit(1).execute()
-                self.status_var.set(f"Connected to database. {datetime.now().strftime('%H:%M:%S')}")
-            except Exception as e:
-                self.status_var.set(f"Error connecting to database: {str(e)}")
-        
-        threading.Thread(target=perform_check).start()
-    
-    def start_new_session(self):
-        """Start a new scan session by resetting tracked items."""
-        self.scanned_items.clear()
-        self.status_var.set("New scan session started. Select a mode to begin.")
-        messagebox.showinfo("Session Started", "New scan session has begun. Scanned items will be tracked.")
-    
     def show_admin_pin_screen(self):
         """Display the PIN entry screen for Admin Count."""
         # Clear the window
@@ -210,6 +190,11 @@ class CycleCountDashboard:
                                        command=self.lookup_barcode)
         self.lookup_button.pack(pady=10)
         
+        # Tally mode: every scan counts one piece, committed when the bin is closed
+        self.tally_var = tk.BooleanVar(value=bool(self.session.bin))
+        ttk.Checkbutton(self.main_frame, text="Tally Mode (each scan counts one piece)", 
+                       variable=self.tally_var, command=self.toggle_tally).pack(pady=5)
+        
         # Results frame
         self.result_frame = ttk.Frame(self.main_frame, padding=10)
         self.result_frame.pack(fill=tk.BOTH, expand=True, pady=20)
@@ -260,261 +245,38 @@ class CycleCountDashboard:
         if self.mode == "admin":
             ttk.Button(self.buttons_frame, text="Update Quantity", 
                       command=self.update_quantity).pack(side=tk.LEFT, padx=5)
+            ttk.Button(self.buttons_frame, text="Apply All Variances", 
+                      command=self.show_reconcile).pack(side=tk.LEFT, padx=5)
+            ttk.Button(self.buttons_frame, text="Export Report", 
+                      command=self.export_report).pack(side=tk.LEFT, padx=5)
         ttk.Button(self.buttons_frame, text="View Session Status", 
                   command=self.show_session_status).pack(side=tk.LEFT, padx=5)
         ttk.Button(self.buttons_frame, text="Back to Menu", 
                   command=self.show_main_menu).pack(side=tk.LEFT, padx=5)
         
+        # Tally bin controls, shown in tally mode
+        self.tally_frame = ttk.Frame(self.result_frame)
+        self.bin_var = tk.StringVar()
+        ttk.Label(self.tally_frame, textvariable=self.bin_var).pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.tally_frame, text="Undo Last Piece", 
+                  command=self.undo_tally).pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.tally_frame, text="Close Bin", 
+                  command=self.close_bin).pack(side=tk.LEFT, padx=5)
+        
         # Initialize
+        self.cancel_clear()
         self.clear_display()
+        self.toggle_tally()
         self.status_var.set(f"{mode.capitalize()} mode active. Scan a barcode to begin.")
-    
-    def clear_display(self):
-        """Clear the display fields and prepare for the next scan."""
-        self.id_var.set("")
-        self.desc_var.set("")
-        self.supabase_qty_var.set("")
-        self.user_qty_var.set("")
-        self.match_var.set("")
-        self.match_label.configure(background="#f0f0f0")
-        self.current_item = None
-        self.barcode_var.set("")
-        self.barcode_entry.focus()  # Focus back on barcode entry for the next scan
-    
-    def lookup_barcode(self, event=None):
-        """Look up the scanned barcode in Supabase."""
-        barcode = self.barcode_var.get().strip()
-        
-        if not barcode:
-            messagebox.showwarning("Input Error", "Please scan a barcode")
-            return
-        
-        self.status_var.set(f"Looking up barcode: {barcode}...")
-        self.root.update_idletasks()
-        
-        def perform_lookup():
-            try:
-                # Query Supabase for the barcode (which is the component ID)
-                result = supabase.table('components').select('*').eq('barcode', barcode).execute()
-                
-                # Check if we got a match
-                if result.data and len(result.data) > 0:
-                    item = result.data[0]
-                    # Track the scanned item
-                    self.scanned_items[barcode] = {
-                        'id': item['id'],
-                        'description': item['description'],
-                        'supabase_qty': item['quantity'],
-                        'user_qty': None
-                    }
-                    self.root.after(0, lambda: self.display_item(item))
-                else:
-                    self.root.after(0, lambda: self.handle_not_found(barcode))
-            except Exception as e:
-                self.root.after(0, lambda: self.handle_error(str(e)))
-        
-        threading.Thread(target=perform_lookup).start()
-    
-    def display_item(self, item):
-        """Display the item details based on the mode."""
-        self.current_item = item
-        self.id_var.set(item['id'])
-        if self.mode == "admin":
-            self.desc_var.set(item['description'])
-            self.supabase_qty_var.set(str(item['quantity']))
-        self.user_qty_var.set("")
-        self.match_var.set("")
-        self.match_label.configure(background="#f0f0f0")
-        
-        self.status_var.set(f"Item found: {item['id']}. Enter your count.")
-        self.user_qty_entry.focus()  # Focus on quantity entry after lookup
-    
-    def handle_not_found(self, barcode):
-        """Handle case where the barcode is not found."""
-        self.clear_display()
-        self.status_var.set(f"No item found with barcode: {barcode}")
-        messagebox.showinfo("Not Found", f"No item found with barcode: {barcode}")
-        self.barcode_entry.focus()
-    
-    def handle_error(self, error_msg):
-        """Handle errors during lookup."""
-        self.status_var.set(f"Error: {error_msg}")
-        messagebox.showerror("Database Error", f"An error occurred: {error_msg}")
-        self.clear_display()
-        self.barcode_entry.focus()
-    
-    def compare_quantities(self, event=None):
-        """Compare the user's counted quantity with the Supabase quantity."""
-        if not self.current_item:
-            messagebox.showwarning("No Item", "Please scan an item first")
-            return
-        
-        try:
-            user_qty = int(self.user_qty_var.get().strip())
-            if user_qty < 0:
-                messagebox.showwarning("Invalid Quantity", "Quantity cannot be negative")
-                return
-            
-            supabase_qty = int(self.current_item['quantity'])
-            
-            if user_qty == supabase_qty:
-                self.match_var.set("Match")
-                self.match_label.configure(background="green")
-                self.status_var.set("Quantities match!")
-            else:
-                self.match_var.set("Mismatch")
-                self.match_label.configure(background="red")
-                if self.mode == "admin":
-                    self.status_var.set(f"Mismatch: Supabase has {supabase_qty}, you counted {user_qty}")
-                else:
-                    self.status_var.set("Quantities do not match")
-            
-            # Update tracked item with user quantity
-            barcode = self.current_item['barcode']
-            if barcode in self.scanned_items:
-                self.scanned_items[barcode]['user_qty'] = user_qty
-            
-            # Clear the display for the next scan after 3 seconds
-            self.root.after(15000, self.clear_display)
-        
-        except ValueError:
-            messagebox.showwarning("Invalid Input", "Please enter a valid number")
-            self.user_qty_var.set("")
-            self.user_qty_entry.focus()
-    
-    def update_quantity(self):
-        """Update the quantity in Supabase (admin mode only)."""
-        if self.mode != "admin":
-            return
-        
-        if not self.current_item:
-            messagebox.showwarning("No Item", "Please scan an item first")
-            return
-        
-        try:
-            new_qty = int(self.user_qty_var.get().strip())
-            if new_qty < 0:
-                messagebox.showwarning("Invalid Quantity", "Quantity cannot be negative")
-                return
-            
-            # Update in Supabase
-            result = supabase.table('components').update(
-                {"quantity": new_qty}
-            ).eq('barcode', self.current_item['barcode']).execute()
-            
-            # Update display
-            self.supabase_qty_var.set(str(new_qty))
-            self.current_item['quantity'] = new_qty
-            self.compare_quantities()  # Re-compare to update the match status
-            
-            # Update tracked item with new quantity
-            barcode = self.current_item['barcode']
-            if barcode in self.scanned_items:
-                self.scanned_items[barcode]['user_qty'] = new_qty
-                self.scanned_items[barcode]['supabase_qty'] = new_qty
-            
-            # Clear the display for the next scan after 3 seconds
-            self.root.after(3000, self.clear_display)
-        
-        except ValueError:
-            messagebox.showwarning("Invalid Input", "Please enter a valid number")
-            self.user_qty_var.set("")
-            self.user_qty_entry.focus()
-        except Exception as e:
-            self.status_var.set(f"Error updating quantity: {str(e)}")
-            messagebox.showerror("Update Error", f"Failed to update quantity: {str(e)}")
-    
-    def show_session_status(self):
-        """Display the session status in a new window using Treeview."""
-        # Create a new top-level window
-        status_window = tk.Toplevel(self.root)
-        status_window.title("Session Status")
-        status_window.geometry("800x600")
-        status_window.configure(bg="#f0f0f0")
-        
-        # Scanned items section
-        ttk.Label(status_window, text="Scanned Items:", font=('Arial', 12, 'bold')).pack(pady=5)
-        scanned_frame = ttk.Frame(status_window)
-        scanned_frame.pack(fill=tk.BOTH, expand=True, pady=5)
-        
-        # Treeview for scanned items
-        if self.mode == "admin":
-            columns = ("ID", "Description", "Supabase Qty", "User Qty")
-            scanned_tree = ttk.Treeview(scanned_frame, columns=columns, show="headings")
-            scanned_tree.heading("ID", text="ID")
-            scanned_tree.heading("Description", text="Description")
-            scanned_tree.heading("Supabase Qty", text="Supabase Qty")
-            scanned_tree.heading("User Qty", text="User Qty")
-            scanned_tree.column("ID", width=100)
-            scanned_tree.column("Description", width=300)
-            scanned_tree.column("Supabase Qty", width=100)
-            scanned_tree.column("User Qty", width=100)
-        else:
-            columns = ("ID",)
-            scanned_tree = ttk.Treeview(scanned_frame, columns=columns, show="headings")
-            scanned_tree.heading("ID", text="ID")
-            scanned_tree.column("ID", width=100)
-        
-        # Scrollbar for scanned items
-        scrollbar = ttk.Scrollbar(scanned_frame, orient="vertical", command=scanned_tree.yview)
-        scanned_tree.configure(yscrollcommand=scrollbar.set)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        scanned_tree.pack(fill=tk.BOTH, expand=True)
-        
-        # Populate scanned items
-        for barcode, details in self.scanned_items.items():
-            if self.mode == "admin":
-                scanned_tree.insert("", tk.END, values=(
-                    details['id'],
-                    details['description'],
-                    details['supabase_qty'],
-                    details['user_qty'] if details['user_qty'] is not None else "N/A"
-                ))
-            else:
-                scanned_tree.insert("", tk.END, values=(details['id'],))
-        
-        # Unscanned items section
-        ttk.Label(status_window, text="Unscanned Items:", font=('Arial', 12, 'bold')).pack(pady=5)
-        unscanned_frame = ttk.Frame(status_window)
-        unscanned_frame.pack(fill=tk.BOTH, expand=True, pady=5)
-        
-        # Treeview for unscanned items
-        if self.mode == "admin":
-            columns = ("ID", "Description")
-            unscanned_tree = ttk.Treeview(unscanned_frame, columns=columns, show="headings")
-            unscanned_tree.heading("ID", text="ID")
-            unscanned_tree.heading("Description", text="Description")
-            unscanned_tree.column("ID", width=100)
-            unscanned_tree.column("Description", width=300)
-        else:
-            columns = ("ID",)
-            unscanned_tree = ttk.Treeview(unscanned_frame, columns=columns, show="headings")
-            unscanned_tree.heading("ID", text="ID")
-            unscanned_tree.column("ID", width=100)
-        
-        # Scrollbar for unscanned items
-        scrollbar = ttk.Scrollbar(unscanned_frame, orient="vertical", command=unscanned_tree.yview)
-        unscanned_tree.configure(yscrollcommand=scrollbar.set)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        unscanned_tree.pack(fill=tk.BOTH, expand=True)
-        
-        # Populate unscanned items
-        unscanned_items = [barcode for barcode in self.all_items.keys() if barcode not in self.scanned_items]
-        for barcode in unscanned_items:
-            item = self.all_items[barcode]
-            if self.mode == "admin":
-                unscanned_tree.insert("", tk.END, values=(item['id'], item['description']))
-            else:
-                unscanned_tree.insert("", tk.END, values=(item['id'],))
-        
-        # Close button
-        ttk.Button(status_window, text="Close", command=status_window.destroy).pack(pady=10)
 
 # Main function
 def main():
     root = tk.Tk()
     app = CycleCountDashboard(root)
+    profiler = start_profiling(root, config, 'cycle_count')
     root.mainloop()
+    if profiler:
+        profiler.stop()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -4,7 +4,9 @@ from barcode.writer import ImageWriter
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 import os
+import sys
 from datetime import datetime
+from zpl_labels import labels_zpl, send_zpl, write_zpl
 
 # Load data from CSV file with UTF-8 encoding
 df = pd.read_csv("components.csv", encoding='utf-8')
@@ -65,5 +67,14 @@ def create_labels(df, output_pdf="barcode_labels.pdf"):
     c.save()
     print(f"Labels saved to {output_pdf}")
 
-# Generate the labels
-create_labels(df, f"barcode_labels_{datetime.now().strftime('%Y%m%d')}.pdf")
\ No newline at end of file
+# Generate the labels; "--zpl [printer-host]" makes native Zebra labels instead of a PDF
+if "--zpl" in sys.argv:
+    zpl = labels_zpl(df["ID"])
+    args = sys.argv[sys.argv.index("--zpl") + 1:]
+    if args:
+        print(f"Sent {send_zpl(zpl, args[0])} bytes to {args[0]}")
+    else:
+        output_zpl = write_zpl(zpl, f"barcode_labels_{datetime.now().strftime('%Y%m%d')}.zpl")
+        print(f"Labels saved to {output_zpl}")
+else:
+    create_labels(df, f"barcode_labels_{datetime.now().strftime('%Y%m%d')}.pdf")
\ No newline at end of file
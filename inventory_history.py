@@ -0,0 +1,216 @@
+import argparse
+import configparser
+import os
+import sys
+from datetime import date, datetime, timedelta
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from catalog import fetch_components
+
+# Daily inventory history in date-partitioned Parquet files
+#
+# history/date=2026-03-01/components.parquet holds the components table as it
+# was when that day's snapshot ran, sorted by barcode so lookups of a few
+# items skip most row groups. Queries read only the partitions and columns
+# they need and never touch the live database.
+
+SCHEMA = pa.schema([
+    ('barcode', pa.string()),
+    ('id', pa.string()),
+    ('description', pa.string()),
+    ('location', pa.dictionary(pa.int32(), pa.string())),
+    ('quantity', pa.int64()),
+])
+COLUMNS = tuple(SCHEMA.names)
+# Quantities stay integers even where some are missing
+PANDAS_TYPES = {pa.int64(): pd.Int64Dtype()}.get
+
+def load_config():
+    """Load configuration from config.ini"""
+    config = configparser.ConfigParser()
+    config_file = 'config.ini'
+    if not os.path.exists(config_file):
+        print(f"Error: {config_file} not found. Create it with your Supabase credentials (see README.md).")
+        sys.exit(1)
+    config.read(config_file)
+    return config
+
+def parse_date(value):
+    return value if isinstance(value, date) else datetime.strptime(value, '%Y-%m-%d').date()
+
+def take_snapshot(supabase, directory='history', day=None, row_group_size=50000):
+    """Export the components table as the partition for `day` (today by default); returns its path.
+
+    Re-running on the same day replaces that day's partition.
+    """
+    day = parse_date(day) if day else date.today()
+    rows = fetch_components(supabase, ','.join(COLUMNS))
+    table = pa.Table.from_pylist(
+        [{name: row.get(name) for name in COLUMNS} for row in rows], schema=SCHEMA
+    ).sort_by('barcode')
+    table = table.replace_schema_metadata({'taken_at': datetime.now().isoformat(timespec='seconds')})
+    partition = os.path.join(directory, f"date={day.isoformat()}")
+    os.makedirs(partition, exist_ok=True)
+    path = os.path.join(partition, 'components.parquet')
+    tmp_path = path + '.tmp'
+    pq.write_table(table, tmp_path, compression='zstd', row_group_size=row_group_size)
+    os.replace(tmp_path, path)
+    return path
+
+class InventoryHistory:
+    """Point-in-time and range queries over the snapshots in `directory`."""
+
+    def __init__(self, directory='history'):
+        self.directory = directory
+
+    def dates(self):
+        """Dates that have a snapshot, oldest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        found = []
+        for name in os.listdir(self.directory):
+            if name.startswith('date=') and os.path.exists(os.path.join(self.directory, name, 'components.parquet')):
+                found.append(parse_date(name[5:]))
+        return sorted(found)
+
+    def snapshot_date(self, day):
+        """The latest snapshot taken on or before `day`, or None."""
+        day = parse_date(day)
+        earlier = [d for d in self.dates() if d <= day]
+        return earlier[-1] if earlier else None
+
+    def _path(self, day):
+        return os.path.join(self.directory, f"date={day.isoformat()}", 'components.parquet')
+
+    def _filter(self, barcodes, location):
+        conditions = []
+        if barcodes is not None:
+            conditions.append(ds.field('barcode').isin(list(barcodes)))
+        if location is not None:
+            conditions.append(ds.field('location') == location)
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        return expression
+
+    def on_hand(self, day, barcodes=None, location=None, columns=('barcode', 'id', 'location', 'quantity')):
+        """Rows as they stood on `day`, from the latest snapshot on or before it.
+
+        Only the requested columns are read, and a barcode or location filter
+        skips row groups that cannot match. Raises LookupError when no
+        snapshot is that old.
+        """
+        snapshot = self.snapshot_date(day)
+        if snapshot is None:
+            raise LookupError(f"No inventory snapshot on or before {day}")
+        table = ds.dataset(self._path(snapshot), format='parquet').to_table(
+            columns=list(columns), filter=self._filter(barcodes, location)
+        )
+        df = table.to_pandas(types_mapper=PANDAS_TYPES)
+        df.attrs['snapshot_date'] = snapshot
+        return df
+
+    def history(self, start, end, barcodes=None, location=None, columns=('barcode', 'quantity')):
+        """Rows from every snapshot between `start` and `end` inclusive, with a 'date' column."""
+        start, end = parse_date(start), parse_date(end)
+        frames = []
+        for day in self.dates():
+            if start <= day <= end:
+                table = ds.dataset(self._path(day), format='parquet').to_table(
+                    columns=list(columns), filter=self._filter(barcodes, location)
+                )
+                frame = table.to_pandas(types_mapper=PANDAS_TYPES)
+                frame.insert(0, 'date', pd.Timestamp(day))
+                frames.append(frame)
+        if not frames:
+            return pd.DataFrame(columns=['date', *columns])
+        return pd.concat(frames, ignore_index=True)
+
+    def totals(self, start, end, by='location'):
+        """Total quantity per snapshot date and `by` column (e.g. month-end stock per location)."""
+        df = self.history(start, end, columns=(by, 'quantity'))
+        return df.groupby(['date', by], observed=True, sort=True)['quantity'].sum().reset_index()
+
+    def changes(self, start, end, location=None):
+        """Items whose quantity or location differs between the snapshots for `start` and `end`."""
+        columns = ('barcode', 'id', 'location', 'quantity')
+        before = self.on_hand(start, location=location, columns=columns)
+        after = self.on_hand(end, location=location, columns=columns)
+        merged = before.merge(after, on='barcode', how='outer', suffixes=('_before', '_after'))
+        moved = differs(merged['quantity_before'], merged['quantity_after']) | \
+                differs(merged['location_before'].astype(object), merged['location_after'].astype(object))
+        return merged[moved].reset_index(drop=True)
+
+    def prune(self, keep_days, keep_month_ends=True):
+        """Delete snapshots older than `keep_days`, keeping each month's last one; returns the dates removed."""
+        cutoff = date.today() - timedelta(days=keep_days)
+        dates = self.dates()
+        month_ends = {max(d for d in dates if (d.year, d.month) == (day.year, day.month)) for day in dates}
+        removed = []
+        for day in dates:
+            if day < cutoff and not (keep_month_ends and day in month_ends):
+                os.remove(self._path(day))
+                os.rmdir(os.path.dirname(self._path(day)))
+                removed.append(day)
+        return removed
+
+def differs(before, after):
+    """Element-wise inequality where two missing values count as equal."""
+    missing = before.isna() & after.isna()
+    return (before != after).fillna(True).astype(bool) & ~missing
+
+def main():
+    parser = argparse.ArgumentParser(description="Take and query daily inventory snapshots.")
+    parser.add_argument('--directory', help="Snapshot folder (default: [HISTORY] DIRECTORY or history)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    snapshot = commands.add_parser('snapshot', help="Export today's components table (run daily)")
+    snapshot.add_argument('--date', help="Partition date, YYYY-MM-DD (default: today)")
+    snapshot.add_argument('--keep-days', type=int, help="Also delete older snapshots except month ends")
+    on_hand = commands.add_parser('on-hand', help="Quantities as of a date")
+    on_hand.add_argument('date', help="YYYY-MM-DD")
+    on_hand.add_argument('--barcode', action='append', help="Limit to a barcode (repeatable)")
+    on_hand.add_argument('--location')
+    on_hand.add_argument('--output', help="Write CSV here instead of printing")
+    totals = commands.add_parser('totals', help="Total quantity per snapshot and location over a range")
+    totals.add_argument('start', help="YYYY-MM-DD")
+    totals.add_argument('end', help="YYYY-MM-DD")
+    totals.add_argument('--output', help="Write CSV here instead of printing")
+    args = parser.parse_args()
+
+    config = load_config()
+    directory = args.directory or config.get('HISTORY', 'DIRECTORY', fallback='history')
+    history = InventoryHistory(directory)
+
+    if args.command == 'snapshot':
+        from supabase import create_client
+        try:
+            supabase = create_client(config['SUPABASE']['URL'], config['SUPABASE']['KEY'])
+            path = take_snapshot(supabase, directory, args.date)
+        except Exception as e:
+            print(f"Error taking snapshot: {e}")
+            sys.exit(1)
+        print(f"Snapshot saved to {path} ({os.path.getsize(path) / 1024:.0f} KB)")
+        if args.keep_days is not None:
+            removed = history.prune(args.keep_days)
+            print(f"Removed {len(removed)} old snapshots")
+        return
+
+    try:
+        if args.command == 'on-hand':
+            df = history.on_hand(args.date, args.barcode, args.location)
+            print(f"Snapshot of {df.attrs['snapshot_date']}: {len(df)} items, {df['quantity'].sum()} on hand")
+        else:
+            df = history.totals(args.start, args.end)
+    except (LookupError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if args.output:
+        df.to_csv(args.output, index=False)
+        print(f"Written to {args.output}")
+    else:
+        print(df.to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -7,12 +7,19 @@ from datetime import datetime
 import configparser
 import sys
 import os
+import socket
 import pandas as pd
-from supabase import create_client
+from workstation import shared_client
 from barcode import Code128
 from barcode.writer import ImageWriter
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
+from ui_profiler import start_profiling
+from connection_monitor import catalog_row
+from count_screen import CountScreen
+from catalog_import import import_catalog
+from search_index import SearchIndex
+from zpl_labels import labels_zpl, send_zpl, write_zpl
 
 # Configuration handling
 def load_config():
@@ -36,18 +43,29 @@ def load_config():
 config = load_config()
 SUPABASE_URL = config['SUPABASE']['URL']
 SUPABASE_KEY = config['SUPABASE']['KEY']
+STATION_NAME = config.get('STATION', 'NAME', fallback=socket.gethostname())
+CATALOG_CACHE = config.get('CATALOG', 'CACHE', fallback=None)
+SERVICE_URL = config.get('SERVICE', 'URL', fallback=None)
+SERVICE_TOKEN = config.get('SERVICE', 'TOKEN', fallback=None)
+# Zebra label printer for native ZPL labels; without a host, ZPL jobs are saved to .zpl files
+LABEL_FORMAT = config.get('PRINTER', 'FORMAT', fallback='PDF').upper()
+PRINTER_HOST = config.get('PRINTER', 'HOST', fallback=None)
+PRINTER_PORT = config.getint('PRINTER', 'PORT', fallback=9100)
+PRINTER_DPI = config.getint('PRINTER', 'DPI', fallback=203)
 
 # Initialize Supabase client
 try:
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    supabase = shared_client(SUPABASE_URL, SUPABASE_KEY)
 except Exception as e:
     print(f"Error connecting to Supabase: {e}")
     messagebox.showerror("Connection Error", f"Failed to connect to Supabase: {e}")
     sys.exit(1)
 
 # Main Application Class
-class InventoryManager:
-    def __init__(self, root):
+class InventoryManager(CountScreen):
+    COUNT_CLEAR_MS = 3000
+
+    def __init__(self, root, workstation=None):
         self.root = root
         self.root.title("Inventory Manager")
         self.root.geometry("1000x700")
@@ -62,9 +80,13 @@ class InventoryManager:
 
         # Data storage (initialize before tabs)
         self.components_df = None
-        self.scanned_items = {}
-        self.all_items = {}
-        self.load_all_items()  # Load items before setting up tabs
+        self.search_index = SearchIndex()
+        self.print_search_job = None
+        self.print_listbox = None  # Set up with the print tab
+        # Session, connection and tally handling live in CountScreen; lookups
+        # fall back to the local catalog while the database is unreachable
+        self.setup_counting(supabase, STATION_NAME, SERVICE_URL, CATALOG_CACHE, 'inventory_manager', workstation,
+                           SERVICE_TOKEN)
 
         # Notebook (tabbed interface)
         self.notebook = ttk.Notebook(self.root)
@@ -85,32 +107,50 @@ class InventoryManager:
         self.setup_print_tab()
 
         # Status bar
+        status_frame = ttk.Frame(self.root)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
         self.status_var = tk.StringVar()
-        self.status_bar = ttk.Label(self.root, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
-        self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
-        self.check_connection()
-
-    def check_connection(self):
-        def perform_check():
+        self.status_bar = ttk.Label(status_frame, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
+        self.status_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.connection_label = ttk.Label(status_frame, textvariable=self.connection_var, relief=tk.SUNKEN,
+                                          width=22, anchor=tk.CENTER)
+        self.connection_label.pack(side=tk.RIGHT)
+        ttk.Label(self.root, textvariable=self.pending_var, foreground="#b36b00",
+                  anchor=tk.E).pack(side=tk.BOTTOM, fill=tk.X)
+        self.monitor.start()
+
+    def offline_lookup(self, code):
+        # The search index holds the session's catalog, by barcode and by ID
+        barcode = code if code in self.search_index.items else self.search_index.exact_ids.get(code.lower())
+        if barcode is None:
+            return None
+        id_str, desc = self.search_index.items[barcode][:2]
+        return catalog_row(barcode, id_str, desc)
+
+    def catalog_changed(self):
+        self.load_search_index()
+        if self.print_listbox is not None:
+            self.update_print_listbox()
+
+    def load_search_index(self):
+        all_items = self.all_items
+
+        def perform_load():
             try:
-                supabase.table('components').select('*').limit(1).execute()
-                self.status_var.set(f"Connected to database. {datetime.now().strftime('%H:%M:%S')}")
+                index = SearchIndex.from_catalog(all_items)
+                self.ui.post(self.set_search_index, index, all_items)
             except Exception as e:
-                self.status_var.set(f"Error connecting to database: {str(e)}")
-        threading.Thread(target=perform_check).start()
+                print(f"Error loading search index: {e}")
 
-    def load_all_items(self):
-        try:
-            result = supabase.table('components').select('barcode', 'id', 'description').execute()
-            if result.data:
-                self.all_items = {item['barcode']: {'id': item['id'], 'description': item['description']} for item in result.data}
-                print(f"Loaded {len(self.all_items)} items from Supabase")
-            else:
-                self.all_items = {}
-                print("No items found in Supabase")
-        except Exception as e:
-            print(f"Error loading all items: {e}")
-            self.all_items = {}
+        # Build off the UI thread, then swap the finished index in
+        threading.Thread(target=perform_load, daemon=True).start()
+
+    def set_search_index(self, index, all_items):
+        if all_items is not self.all_items:
+            return  # The catalog was replaced while this index was being built
+        self.search_index = index
+        if self.print_search_var.get().strip():
+            self.update_print_listbox()
 
     # Generate Labels Tab
     def setup_generate_tab(self):
@@ -131,7 +171,9 @@ class InventoryManager:
         ttk.Button(self.gen_frame, text="Browse", command=self.upload_csv).pack(pady=5)
 
         # Generate Button
-        ttk.Button(self.gen_frame, text="Generate Labels & Sync", command=self.generate_and_sync).pack(pady=20)
+        self.generate_button = ttk.Button(self.gen_frame, text="Generate Labels & Sync",
+                                          command=self.generate_and_sync)
+        self.generate_button.pack(pady=20)
 
         # Progress
         self.gen_progress_var = tk.StringVar(value="Ready")
@@ -167,53 +209,44 @@ class InventoryManager:
                 messagebox.showwarning("Input Error", "Please enter data manually or upload a CSV")
                 return
 
-        # Sync with Supabase
+        # Sync with Supabase on a worker thread; batches report progress as they commit
+        df = self.components_df
+        self.generate_button.configure(state=tk.DISABLED)
         self.gen_progress_var.set("Syncing with Supabase...")
-        self.root.update_idletasks()
-        success = self.import_components(self.components_df)
-        if success:
-            self.gen_progress_var.set("Generating labels...")
-            self.root.update_idletasks()
-            output_pdf = f"barcode_labels_{datetime.now().strftime('%Y%m%d')}.pdf"
-            self.create_labels(self.components_df, output_pdf)
-            self.gen_progress_var.set(f"Labels generated: {output_pdf}")
-            self.components_df = None  # Reset after processing
-            self.manual_entry.delete("1.0", tk.END)
-            self.load_all_items()  # Refresh items list
-        else:
+
+        def perform_sync():
+            success = self.import_components(df)
+            self.ui.post(self.finish_sync, df, success)
+
+        threading.Thread(target=perform_sync, daemon=True).start()
+
+    def finish_sync(self, df, success):
+        self.generate_button.configure(state=tk.NORMAL)
+        if not success:
             self.gen_progress_var.set("Failed to sync with Supabase")
+            return
+        self.gen_progress_var.set("Generating labels...")
+        self.root.update_idletasks()
+        output_pdf = f"barcode_labels_{datetime.now().strftime('%Y%m%d')}.pdf"
+        output = self.create_labels(df, output_pdf)
+        self.gen_progress_var.set(f"Labels generated: {output}")
+        if self.components_df is df:
+            self.components_df = None  # Reset after processing, unless another CSV was loaded meanwhile
+        self.manual_entry.delete("1.0", tk.END)
+        self.load_all_items()  # Refresh items list
 
     def import_components(self, df):
+        """Import on a worker thread, reporting progress through the UI dispatcher."""
+        def progress(sent, total):
+            self.ui.set(self.gen_progress_var, f"Syncing with Supabase... {sent:,} / {total:,} rows sent")
+
+        # Only new rows and changed descriptions are sent, so re-imports keep on-hand quantities
         try:
-            barcodes = {}
-            duplicate_count = 0
-            count = 0
-            for index, row in df.iterrows():
-                id_str = row["ID"]
-                desc = row["Description"]
-                barcode = id_str
-
-                if barcode in barcodes:
-                    print(f"WARNING: Duplicate barcode {barcode} for {id_str} and {barcodes[barcode]}")
-                    duplicate_count += 1
-                    continue
-
-                barcodes[barcode] = id_str
-                data = {
-                    "id": id_str,
-                    "barcode": barcode,
-                    "description": desc,
-                    "quantity": 0,
-                    "location": "Warehouse"
-                }
-                result = supabase.table('components').upsert(data).execute()
-                count += 1
-                if count % 10 == 0:
-                    print(f"Processed {count} records...")
-
-            print(f"Successfully imported {count} components to Supabase")
-            if duplicate_count > 0:
-                print(f"WARNING: Found {duplicate_count} duplicate barcodes (skipped)")
+            diff = import_catalog(supabase, df, progress=progress)
+            print(f"Imported components: {len(diff['new'])} new, {len(diff['changed'])} changed, "
+                  f"{len(diff['unchanged'])} unchanged")
+            if len(diff['duplicates']) > 0:
+                print(f"WARNING: Found {len(diff['duplicates'])} duplicate barcodes (skipped)")
             return True
         except Exception as e:
             print(f"Error importing components: {e}")
@@ -225,6 +258,8 @@ class InventoryManager:
         return barcode
 
     def create_labels(self, df, output_pdf):
+        if self.label_format_var.get() == "ZPL":
+            return self.print_zpl(list(df["ID"]), 4, 1.5, True, os.path.splitext(output_pdf)[0])
         c = canvas.Canvas(output_pdf, pagesize=letter)
         width, height = letter
         label_width, label_height = 4 * 72, 1.5 * 72
@@ -258,6 +293,27 @@ class InventoryManager:
 
         c.save()
         print(f"Labels saved to {output_pdf}")
+        return output_pdf
+
+    def print_zpl(self, ids, width, height, include_id, name):
+        """Print labels as native ZPL on the label printer, or save them to name.zpl without one.
+
+        Returns where the labels went. Printing runs in the background and
+        reports on the status bar.
+        """
+        zpl = labels_zpl(ids, width, height, PRINTER_DPI, include_id)
+        if not PRINTER_HOST:
+            return write_zpl(zpl, f"{name}.zpl")
+
+        def perform_send():
+            try:
+                sent = send_zpl(zpl, PRINTER_HOST, PRINTER_PORT)
+                self.ui.set(self.status_var, f"Sent {len(ids)} labels ({sent / 1024:.1f} KB) to {PRINTER_HOST}")
+            except OSError as e:
+                self.ui.post(self.show_task_error, "Print Error",
+                             f"Could not send labels to the printer at {PRINTER_HOST}:{PRINTER_PORT}: {e}")
+        threading.Thread(target=perform_send, daemon=True).start()
+        return f"printer {PRINTER_HOST}"
 
     # Count Items Tab
     def setup_count_tab(self):
@@ -271,14 +327,12 @@ class InventoryManager:
 
         # Mode selection
         ttk.Button(self.count_frame, text="Start New Session", command=self.start_new_session).pack(pady=5)
+        ttk.Button(self.count_frame, text="Start Frozen Session", command=self.start_frozen_session).pack(pady=5)
+        ttk.Button(self.count_frame, text="Check Movements", command=self.check_movements).pack(pady=5)
+        ttk.Button(self.count_frame, text="Join Shared Session", command=self.join_shared_session).pack(pady=5)
         ttk.Button(self.count_frame, text="Admin Count", command=self.show_admin_pin_screen).pack(pady=5)
         ttk.Button(self.count_frame, text="User Count", command=lambda: self.show_count_screen("user")).pack(pady=5)
 
-    def start_new_session(self):
-        self.scanned_items.clear()
-        self.status_var.set("New scan session started.")
-        messagebox.showinfo("Session Started", "New scan session has begun.")
-
     def show_admin_pin_screen(self):
         for widget in self.count_frame.winfo_children():
             widget.destroy()
@@ -315,6 +369,9 @@ class InventoryManager:
         self.barcode_entry.bind('<Return>', self.lookup_barcode)
         self.barcode_entry.focus()
         ttk.Button(self.count_frame, text="Look Up Item", command=self.lookup_barcode).pack(pady=10)
+        self.tally_var = tk.BooleanVar(value=bool(self.session.bin))
+        ttk.Checkbutton(self.count_frame, text="Tally Mode (each scan counts one piece)",
+                        variable=self.tally_var, command=self.toggle_tally).pack(pady=5)
 
         self.result_frame = ttk.Frame(self.count_frame, padding=10)
         self.result_frame.pack(fill=tk.BOTH, expand=True, pady=20)
@@ -354,203 +411,21 @@ class InventoryManager:
         ttk.Button(buttons_frame, text="Compare", command=self.compare_quantities).pack(side=tk.LEFT, padx=5)
         if mode == "admin":
             ttk.Button(buttons_frame, text="Update Quantity", command=self.update_quantity).pack(side=tk.LEFT, padx=5)
+            ttk.Button(buttons_frame, text="Apply All Variances", command=self.show_reconcile).pack(side=tk.LEFT, padx=5)
+            ttk.Button(buttons_frame, text="Export Report", command=self.export_report).pack(side=tk.LEFT, padx=5)
         ttk.Button(buttons_frame, text="View Session Status", command=self.show_session_status).pack(side=tk.LEFT, padx=5)
         ttk.Button(buttons_frame, text="Back", command=self.setup_count_tab).pack(side=tk.LEFT, padx=5)
 
-        self.clear_display()
-        self.status_var.set(f"{mode.capitalize()} mode active. Scan a barcode to begin.")
-
-    def clear_display(self):
-        self.id_var.set("")
-        self.desc_var.set("")
-        self.supabase_qty_var.set("")
-        self.user_qty_var.set("")
-        self.match_var.set("")
-        self.match_label.configure(background="#f0f0f0")
-        self.current_item = None
-        self.barcode_var.set("")
-        self.barcode_entry.focus()
-
-    def lookup_barcode(self, event=None):
-        barcode = self.barcode_var.get().strip()
-        if not barcode:
-            messagebox.showwarning("Input Error", "Please scan a barcode")
-            return
-
-        self.status_var.set(f"Looking up barcode: {barcode}...")
-        self.root.update_idletasks()
-
-        def perform_lookup():
-            try:
-                result = supabase.table('components').select('*').eq('barcode', barcode).execute()
-                if result.data and len(result.data) > 0:
-                    item = result.data[0]
-                    self.scanned_items[barcode] = {
-                        'id': item['id'],
-                        'description': item['description'],
-                        'supabase_qty': item['quantity'],
-                        'user_qty': None
-                    }
-                    self.root.after(0, lambda: self.display_item(item))
-                else:
-                    self.root.after(0, lambda: self.handle_not_found(barcode))
-            except Exception as e:
-                self.root.after(0, lambda: self.handle_error(str(e)))
-
-        threading.Thread(target=perform_lookup).start()
-
-    def display_item(self, item):
-        self.current_item = item
-        self.id_var.set(item['id'])
-        if self.mode == "admin":
-            self.desc_var.set(item['description'])
-            self.supabase_qty_var.set(str(item['quantity']))
-        self.user_qty_var.set("")
-        self.match_var.set("")
-        self.match_label.configure(background="#f0f0f0")
-        self.status_var.set(f"Item found: {item['id']}. Enter your count.")
-        self.user_qty_entry.focus()
-
-    def handle_not_found(self, barcode):
-        self.clear_display()
-        self.status_var.set(f"No item found with barcode: {barcode}")
-        messagebox.showinfo("Not Found", f"No item found with barcode: {barcode}")
+        self.tally_frame = ttk.Frame(self.result_frame)
+        self.bin_var = tk.StringVar()
+        ttk.Label(self.tally_frame, textvariable=self.bin_var).pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.tally_frame, text="Undo Last Piece", command=self.undo_tally).pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.tally_frame, text="Close Bin", command=self.close_bin).pack(side=tk.LEFT, padx=5)
 
-    def handle_error(self, error_msg):
-        self.status_var.set(f"Error: {error_msg}")
-        messagebox.showerror("Database Error", f"An error occurred: {error_msg}")
+        self.cancel_clear()
         self.clear_display()
-
-    def compare_quantities(self, event=None):
-        if not self.current_item:
-            messagebox.showwarning("No Item", "Please scan an item first")
-            return
-
-        try:
-            user_qty = int(self.user_qty_var.get().strip())
-            if user_qty < 0:
-                messagebox.showwarning("Invalid Quantity", "Quantity cannot be negative")
-                return
-
-            supabase_qty = int(self.current_item['quantity'])
-            if user_qty == supabase_qty:
-                self.match_var.set("Match")
-                self.match_label.configure(background="green")
-                self.status_var.set("Quantities match!")
-            else:
-                self.match_var.set("Mismatch")
-                self.match_label.configure(background="red")
-                self.status_var.set(f"Mismatch: Supabase has {supabase_qty}, you counted {user_qty}")
-
-            barcode = self.current_item['barcode']
-            if barcode in self.scanned_items:
-                self.scanned_items[barcode]['user_qty'] = user_qty
-            self.root.after(3000, self.clear_display)
-
-        except ValueError:
-            messagebox.showwarning("Invalid Input", "Please enter a valid number")
-            self.user_qty_var.set("")
-            self.user_qty_entry.focus()
-
-    def update_quantity(self):
-        if self.mode != "admin" or not self.current_item:
-            return
-
-        try:
-            new_qty = int(self.user_qty_var.get().strip())
-            if new_qty < 0:
-                messagebox.showwarning("Invalid Quantity", "Quantity cannot be negative")
-                return
-
-            supabase.table('components').update({"quantity": new_qty}).eq('barcode', self.current_item['barcode']).execute()
-            self.supabase_qty_var.set(str(new_qty))
-            self.current_item['quantity'] = new_qty
-            self.compare_quantities()
-
-            barcode = self.current_item['barcode']
-            if barcode in self.scanned_items:
-                self.scanned_items[barcode]['user_qty'] = new_qty
-                self.scanned_items[barcode]['supabase_qty'] = new_qty
-            self.root.after(3000, self.clear_display)
-
-        except Exception as e:
-            self.status_var.set(f"Error updating quantity: {str(e)}")
-            messagebox.showerror("Update Error", f"Failed to update quantity: {str(e)}")
-
-    def show_session_status(self):
-        status_window = tk.Toplevel(self.root)
-        status_window.title("Session Status")
-        status_window.geometry("800x600")
-        status_window.configure(bg="#f0f0f0")
-
-        ttk.Label(status_window, text="Scanned Items:", font=('Arial', 12, 'bold')).pack(pady=5)
-        scanned_frame = ttk.Frame(status_window)
-        scanned_frame.pack(fill=tk.BOTH, expand=True, pady=5)
-
-        if self.mode == "admin":
-            columns = ("ID", "Description", "Supabase Qty", "User Qty")
-            scanned_tree = ttk.Treeview(scanned_frame, columns=columns, show="headings")
-            scanned_tree.heading("ID", text="ID")
-            scanned_tree.heading("Description", text="Description")
-            scanned_tree.heading("Supabase Qty", text="Supabase Qty")
-            scanned_tree.heading("User Qty", text="User Qty")
-            scanned_tree.column("ID", width=100)
-            scanned_tree.column("Description", width=300)
-            scanned_tree.column("Supabase Qty", width=100)
-            scanned_tree.column("User Qty", width=100)
-        else:
-            columns = ("ID",)
-            scanned_tree = ttk.Treeview(scanned_frame, columns=columns, show="headings")
-            scanned_tree.heading("ID", text="ID")
-            scanned_tree.column("ID", width=100)
-
-        scrollbar = ttk.Scrollbar(scanned_frame, orient="vertical", command=scanned_tree.yview)
-        scanned_tree.configure(yscrollcommand=scrollbar.set)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        scanned_tree.pack(fill=tk.BOTH, expand=True)
-
-        for barcode, details in self.scanned_items.items():
-            if self.mode == "admin":
-                scanned_tree.insert("", tk.END, values=(
-                    details['id'],
-                    details['description'],
-                    details['supabase_qty'],
-                    details['user_qty'] if details['user_qty'] is not None else "N/A"
-                ))
-            else:
-                scanned_tree.insert("", tk.END, values=(details['id'],))
-
-        ttk.Label(status_window, text="Unscanned Items:", font=('Arial', 12, 'bold')).pack(pady=5)
-        unscanned_frame = ttk.Frame(status_window)
-        unscanned_frame.pack(fill=tk.BOTH, expand=True, pady=5)
-
-        if self.mode == "admin":
-            columns = ("ID", "Description")
-            unscanned_tree = ttk.Treeview(unscanned_frame, columns=columns, show="headings")
-            unscanned_tree.heading("ID", text="ID")
-            unscanned_tree.heading("Description", text="Description")
-            unscanned_tree.column("ID", width=100)
-            unscanned_tree.column("Description", width=300)
-        else:
-            columns = ("ID",)
-            unscanned_tree = ttk.Treeview(unscanned_frame, columns=columns, show="headings")
-            unscanned_tree.heading("ID", text="ID")
-            unscanned_tree.column("ID", width=100)
-
-        scrollbar = ttk.Scrollbar(unscanned_frame, orient="vertical", command=unscanned_tree.yview)
-        unscanned_tree.configure(yscrollcommand=scrollbar.set)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        unscanned_tree.pack(fill=tk.BOTH, expand=True)
-
-        unscanned_items = [barcode for barcode in self.all_items.keys() if barcode not in self.scanned_items]
-        for barcode in unscanned_items:
-            item = self.all_items[barcode]
-            if self.mode == "admin":
-                unscanned_tree.insert("", tk.END, values=(item['id'], item['description']))
-            else:
-                unscanned_tree.insert("", tk.END, values=(item['id'],))
-
-        ttk.Button(status_window, text="Close", command=status_window.destroy).pack(pady=10)
+        self.toggle_tally()
+        self.status_var.set(f"{mode.capitalize()} mode active. Scan a barcode to begin.")
 
     # Print Settings Tab
     def setup_print_tab(self):
@@ -563,6 +438,12 @@ class InventoryManager:
 
         # Component Selection
         ttk.Label(self.print_frame, text="Select Components to Print:").pack(pady=(10, 5))
+        search_frame = ttk.Frame(self.print_frame)
+        search_frame.pack(fill=tk.X, pady=5)
+        ttk.Label(search_frame, text="Search:").pack(side=tk.LEFT, padx=5)
+        self.print_search_var = tk.StringVar()
+        ttk.Entry(search_frame, textvariable=self.print_search_var, width=40).pack(side=tk.LEFT, padx=5)
+        self.print_search_var.trace_add('write', self.schedule_print_search)
         self.print_listbox = tk.Listbox(self.print_frame, height=10, selectmode=tk.MULTIPLE)
         self.print_listbox.pack(fill=tk.BOTH, expand=True, pady=5)
         self.update_print_listbox()
@@ -575,11 +456,29 @@ class InventoryManager:
         ttk.Label(self.print_frame, text="Label Size (inches):").pack(pady=(10, 0))
         ttk.Combobox(self.print_frame, textvariable=self.label_size_var, values=["4x1.5", "3x1", "2x1"]).pack(pady=5)
 
+        # ZPL prints natively on Zebra thermal printers; PDF makes letter-size sheets
+        self.label_format_var = tk.StringVar(value="ZPL" if LABEL_FORMAT == "ZPL" else "PDF")
+        ttk.Label(self.print_frame, text="Label Format:").pack(pady=(10, 0))
+        ttk.Combobox(self.print_frame, textvariable=self.label_format_var, values=["PDF", "ZPL"],
+                     state="readonly").pack(pady=5)
+
         # Print Button
         ttk.Button(self.print_frame, text="Print Selected Labels", command=self.print_selected_labels).pack(pady=20)
 
+    def schedule_print_search(self, *args):
+        # Search once typing pauses rather than on every keystroke
+        if self.print_search_job is not None:
+            self.root.after_cancel(self.print_search_job)
+        self.print_search_job = self.root.after(150, self.update_print_listbox)
+
     def update_print_listbox(self):
+        self.print_search_job = None
         self.print_listbox.delete(0, tk.END)
+        query = self.print_search_var.get().strip()
+        if query:
+            for barcode, id_str, desc in self.search_index.search(query, limit=200):
+                self.print_listbox.insert(tk.END, f"{id_str} - {desc}")
+            return
         for barcode, item in self.all_items.items():
             self.print_listbox.insert(tk.END, f"{item['id']} - {item['description']}")
 
@@ -601,6 +500,14 @@ class InventoryManager:
         label_width, label_height = float(label_size[0]) * 72, float(label_size[1]) * 72
         output_pdf = f"selected_labels_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
 
+        if self.label_format_var.get() == "ZPL":
+            output = self.print_zpl(list(df["ID"]), float(label_size[0]), float(label_size[1]),
+                                    self.include_id_var.get(), os.path.splitext(output_pdf)[0])
+            self.status_var.set(f"Printing {len(df)} labels to {output}")
+            if not PRINTER_HOST:
+                messagebox.showinfo("Success", f"Labels printed to {output}")
+            return
+
         c = canvas.Canvas(output_pdf, pagesize=letter)
         width, height = letter
         labels_per_row = max(1, int((width - 0.5 * 72) // label_width))
@@ -642,7 +549,10 @@ class InventoryManager:
 def main():
     root = tk.Tk()
     app = InventoryManager(root)
+    profiler = start_profiling(root, config, 'inventory_manager')
     root.mainloop()
+    if profiler:
+        profiler.stop()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
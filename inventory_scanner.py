@@ -1,6 +1,6 @@
 import pandas as pd
 import os
-from supabase import create_client
+from workstation import shared_client
 import tkinter as tk
 from tkinter import messagebox, ttk
 from tkinter.font import Font
@@ -8,7 +8,16 @@ import threading
 import time
 from datetime import datetime
 import configparser
+import socket
 import sys
+from catalog import load_catalog
+from search_index import SearchIndex
+from scan_queue import ScanInput, BatchLookup
+from lookup_client import lookup_source
+from ui_profiler import start_profiling
+from write_queue import WriteQueue
+from ui_dispatch import UIDispatcher
+from connection_monitor import ConnectionMonitor, ResilientSource, STATE_COLORS, database_probe, catalog_row
 
 # Configuration handling
 def load_config():
@@ -40,10 +49,14 @@ def load_config():
 config = load_config()
 SUPABASE_URL = config['SUPABASE']['URL']
 SUPABASE_KEY = config['SUPABASE']['KEY']
+CATALOG_CACHE = config.get('CATALOG', 'CACHE', fallback=None)
+SERVICE_URL = config.get('SERVICE', 'URL', fallback=None)
+SERVICE_TOKEN = config.get('SERVICE', 'TOKEN', fallback=None)
+STATION_NAME = config.get('STATION', 'NAME', fallback=socket.gethostname())
 
 # Initialize Supabase client
 try:
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    supabase = shared_client(SUPABASE_URL, SUPABASE_KEY)
 except Exception as e:
     print(f"Error connecting to Supabase: {e}")
     messagebox.showerror("Connection Error", f"Failed to connect to Supabase: {e}")
@@ -51,8 +64,9 @@ except Exception as e:
 
 # Barcode scanner UI application
 class BarcodeScannerApp:
-    def __init__(self, root):
+    def __init__(self, root, workstation=None):
         self.root = root
+        self.workstation = workstation  # Services shared with other tools when hosted by the launcher
         self.root.title("Inventory Scanner")
         self.root.geometry("800x600")
         self.root.configure(bg="#f0f0f0")
@@ -80,7 +94,8 @@ class BarcodeScannerApp:
         self.entry = ttk.Entry(self.main_frame, textvariable=self.barcode_var, 
                               width=30, font=('Arial', 14))
         self.entry.pack(pady=5)
-        self.entry.bind('<Return>', self.lookup_barcode)
+        # Scanner bursts are queued as whole barcodes; typed entries use Return as before
+        self.scan_input = ScanInput(self.entry, self.queue_scan, self.lookup_barcode)
         self.entry.focus()
         
         # Scan button
@@ -88,6 +103,24 @@ class BarcodeScannerApp:
                                      command=self.lookup_barcode)
         self.scan_button.pack(pady=10)
         
+        # Search by ID or description when a label can't be scanned
+        self.search_frame = ttk.Frame(self.main_frame)
+        self.search_frame.pack(fill=tk.X, pady=5)
+        ttk.Label(self.search_frame, text="Search:").pack(side=tk.LEFT, padx=5)
+        
+        self.search_var = tk.StringVar()
+        self.search_entry = ttk.Entry(self.search_frame, textvariable=self.search_var, width=40)
+        self.search_entry.pack(side=tk.LEFT, padx=5)
+        self.search_var.trace_add('write', self.schedule_search)
+        self.search_entry.bind('<Down>', lambda e: self.focus_results())
+        self.search_entry.bind('<Return>', lambda e: self.focus_results())
+        
+        self.results_listbox = tk.Listbox(self.main_frame, height=5, font=('Arial', 11))
+        self.results_listbox.bind('<Double-Button-1>', self.select_result)
+        self.results_listbox.bind('<Return>', self.select_result)
+        self.result_barcodes = []
+        self.search_job = None
+        
         # Results frame
         self.result_frame = ttk.Frame(self.main_frame, padding=10)
         self.result_frame.pack(fill=tk.BOTH, expand=True, pady=20)
@@ -152,28 +185,145 @@ class BarcodeScannerApp:
         ttk.Button(self.location_frame, text="Update Location", 
                   command=self.update_location).pack(side=tk.LEFT, padx=5)
         
+        # Recent scans, so fast bursts can be checked afterwards
+        ttk.Label(self.result_frame, text="Recent Scans:").pack(anchor=tk.W)
+        self.scan_log = tk.Listbox(self.result_frame, height=4, font=('Arial', 10))
+        self.scan_log.pack(fill=tk.X, pady=5)
+        
         # Status bar
+        status_frame = ttk.Frame(self.root)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
         self.status_var = tk.StringVar()
-        self.status_bar = ttk.Label(self.root, textvariable=self.status_var, 
+        self.status_bar = ttk.Label(status_frame, textvariable=self.status_var, 
                                    relief=tk.SUNKEN, anchor=tk.W)
-        self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.status_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.connection_var = tk.StringVar(value="Connecting...")
+        self.connection_label = ttk.Label(status_frame, textvariable=self.connection_var,
+                                          relief=tk.SUNKEN, width=22, anchor=tk.CENTER)
+        self.connection_label.pack(side=tk.RIGHT)
+        self.pending_var = tk.StringVar()
+        ttk.Label(self.root, textvariable=self.pending_var, foreground="#b36b00",
+                  anchor=tk.E).pack(side=tk.BOTTOM, fill=tk.X)
         
         # Initialize
         self.current_barcode = None
+        # Background threads update the UI through the dispatcher
+        self.ui = UIDispatcher(self.root)
+        # Writes run in the background; the display shows them before they are confirmed
+        self.writes = WriteQueue(self.ui, self.show_pending)
+        self.unconfirmed = {}  # {(barcode, field): value} still being saved
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        # Lookups and writes go through the shared lookup service when one is configured
+        source = lookup_source(supabase, SERVICE_URL, SERVICE_TOKEN)
+        # A heartbeat tracks the connection; after repeated failures lookups
+        # come from the search index instead of waiting for timeouts
+        self.monitor = workstation.monitor if workstation else ConnectionMonitor(database_probe(supabase, source))
+        self.monitor.subscribe(self.on_connection)
+        self.connection_state = self.monitor.state
+        self.source = ResilientSource(source, self.monitor, self.offline_lookup)
+        self.lookups = BatchLookup(self.source, self.on_lookup_result)
+        self.search_index = SearchIndex()
         self.clear_display()
-        self.check_connection()
+        self.monitor.start()
+        # Also loaded with a lookup service, so offline lookups and searches have a catalog
+        self.load_search_index()
     
     def check_connection(self):
-        def perform_check():
+        self.monitor.check_now()
+    
+    def on_connection(self, monitor):
+        # Called on whichever thread made the call or ran the heartbeat
+        self.ui.post(self.show_connection, monitor.state, monitor.describe(), monitor.last_error,
+                     key='connection')
+    
+    def show_connection(self, state, text, error):
+        self.connection_var.set(text)
+        self.connection_label.configure(foreground=STATE_COLORS.get(state, ""))
+        previous, self.connection_state = self.connection_state, state
+        if state == previous:
+            return
+        if state == 'offline':
+            self.status_var.set(f"Database unreachable, scanning from the local catalog: {error}")
+            self.log_scan("Connection lost; working offline")
+        elif previous == 'offline':
+            self.status_var.set(f"Connection restored. Ready to scan. {datetime.now().strftime('%H:%M:%S')}")
+            self.log_scan("Connection restored")
+            if self.current_barcode:
+                self.lookups.put(self.current_barcode, 'refresh')
+        elif previous == 'connecting':
+            self.status_var.set(f"Connected to database. Ready to scan. {datetime.now().strftime('%H:%M:%S')}")
+    
+    def offline_lookup(self, code):
+        barcode = code if code in self.search_index.items else self.search_index.exact_ids.get(code.lower())
+        if barcode is None:
+            return None
+        id_str, desc = self.search_index.items[barcode][:2]
+        return catalog_row(barcode, id_str, desc)
+    
+    def load_search_index(self):
+        def perform_load():
             try:
-                # Try to fetch one record to test connection
-                result = supabase.table('components').select('*').limit(1).execute()
-                self.status_var.set(f"Connected to database. Ready to scan. {datetime.now().strftime('%H:%M:%S')}")
+                catalog = self.workstation.catalog() if self.workstation else load_catalog(supabase, CATALOG_CACHE)
+                index = SearchIndex.from_catalog(catalog)
+                self.ui.post(self.set_search_index, index)
             except Exception as e:
-                self.status_var.set(f"Error connecting to database: {str(e)}")
+                print(f"Error loading search index: {e}")
         
-        # Run this in a thread to avoid blocking UI
-        threading.Thread(target=perform_check).start()
+        # Build off the UI thread, then swap the finished index in
+        threading.Thread(target=perform_load, daemon=True).start()
+    
+    def set_search_index(self, index):
+        self.search_index = index
+        self.update_results()
+    
+    def schedule_search(self, *args):
+        # Search once typing pauses rather than on every keystroke
+        if self.search_job is not None:
+            self.root.after_cancel(self.search_job)
+        self.search_job = self.root.after(100, self.update_results)
+    
+    def update_results(self):
+        self.search_job = None
+        query = self.search_var.get().strip()
+        if query and SERVICE_URL and not self.source.local:
+            def perform_search():
+                try:
+                    results = self.source.search(query)
+                except Exception as e:
+                    print(f"Error searching: {e}")
+                    results = []
+                self.ui.post(self.show_results, query, results, key='search_results')
+            
+            threading.Thread(target=perform_search, daemon=True).start()
+            return
+        self.show_results(query, self.search_index.search(query) if query else [])
+    
+    def show_results(self, query, results):
+        if query != self.search_var.get().strip():
+            return  # Typing moved on while the search ran
+        self.results_listbox.delete(0, tk.END)
+        self.result_barcodes = [barcode for barcode, id_str, desc in results]
+        for barcode, id_str, desc in results:
+            self.results_listbox.insert(tk.END, f"{id_str} - {desc}")
+        if results:
+            self.results_listbox.pack(fill=tk.X, pady=5, after=self.search_frame)
+        else:
+            self.results_listbox.pack_forget()
+    
+    def focus_results(self):
+        if self.result_barcodes:
+            self.results_listbox.focus()
+            self.results_listbox.selection_clear(0, tk.END)
+            self.results_listbox.selection_set(0)
+            self.results_listbox.activate(0)
+    
+    def select_result(self, event=None):
+        selection = self.results_listbox.curselection()
+        if not selection:
+            return
+        self.barcode_var.set(self.result_barcodes[selection[0]])
+        self.search_var.set("")
+        self.lookup_barcode()
     
     def clear_display(self):
         self.id_var.set("")
@@ -189,44 +339,64 @@ class BarcodeScannerApp:
             messagebox.showwarning("Input Error", "Please enter a barcode")
             return
         
-        # The scanned barcode is now the component ID (e.g., "BOT050")
-        lookup_barcode = barcode
-
-        self.status_var.set(f"Looking up barcode: {lookup_barcode}...")
-        self.root.update_idletasks()
-        
-        def perform_lookup():
-            try:
-                # Query Supabase for the barcode (which is now the component ID)
-                # Try matching by barcode first
-                result = supabase.table('components').select('*').eq('barcode', lookup_barcode).execute()
-                
-                # If no match, try matching by ID (for manual entry of the ID)
-                if not result.data or len(result.data) == 0:
-                    result = supabase.table('components').select('*').eq('id', lookup_barcode).execute()
-                
-                # Check if we got a match
-                if result.data and len(result.data) > 0:
-                    item = result.data[0]
-                    
-                    # Update the UI (from the main thread)
-                    self.root.after(0, lambda: self.display_item(item))
-                else:
-                    # No match found
-                    self.root.after(0, lambda: self.handle_not_found(lookup_barcode))
-            except Exception as e:
-                # Handle error
-                self.root.after(0, lambda: self.handle_error(str(e)))
-        
-        # Run the lookup in a separate thread to keep UI responsive
-        threading.Thread(target=perform_lookup).start()
+        # Typed entries may be a barcode or a component ID (e.g., "BOT050")
+        self.status_var.set(f"Looking up barcode: {barcode}...")
+        self.lookups.put(barcode, 'manual')
+    
+    def queue_scan(self, barcode):
+        self.lookups.put(barcode, 'scan')
+        self.status_var.set(f"Scanned {barcode} ({self.lookups.pending()} waiting for lookup)")
+    
+    def on_lookup_result(self, barcode, item, error, source):
+        # Called on the lookup thread. Every result is logged, but within a
+        # frame only the latest one is displayed.
+        if source != 'refresh':
+            self.ui.post(self.log_lookup_result, barcode, item, error, source)
+        self.ui.post(self.show_lookup_result, barcode, item, error, source, key='lookup_result')
+    
+    def log_lookup_result(self, barcode, item, error, source):
+        if item is not None:
+            self.log_scan(f"{barcode}: {item['id']} - {item['description']}")
+        elif error is not None:
+            self.log_scan(f"{barcode}: lookup failed")
+        else:
+            self.log_scan(f"{barcode}: not found")
+            if source != 'manual':
+                # Don't stop a scan burst with a dialog, but ring for every miss
+                self.root.bell()
+    
+    def show_lookup_result(self, barcode, item, error, source):
+        if item is not None:
+            self.display_item(item)
+        elif error is not None:
+            if source == 'manual':
+                self.handle_error(error)
+            else:
+                self.status_var.set(f"Error looking up {barcode}: {error}")
+        else:
+            if source == 'manual':
+                self.handle_not_found(barcode)
+            else:
+                self.status_var.set(f"No item found with barcode: {barcode}")
+    
+    def log_scan(self, text):
+        self.scan_log.insert(0, f"{datetime.now().strftime('%H:%M:%S')}  {text}")
+        self.scan_log.delete(50, tk.END)
     
     def display_item(self, item):
+        # Show changes that are still being saved rather than the older database values
+        item = dict(item, **{name: value for (barcode, name), value in self.unconfirmed.items()
+                             if barcode == item['barcode']})
         self.current_barcode = item['barcode']
+        # Keep the index current with items added since it was built
+        indexed = self.search_index.items.get(item['barcode'])
+        if indexed is None or indexed[:2] != (item['id'], item['description']):
+            self.search_index.add(item['barcode'], item['id'], item['description'])
         self.id_var.set(item['id'])
         self.desc_var.set(item['description'])
-        self.qty_var.set(str(item['quantity']))
-        self.location_var.set(item['location'])
+        # Offline lookups come from the local catalog, without stock figures
+        self.qty_var.set("Offline" if item.get('offline') else str(item['quantity']))
+        self.location_var.set("Offline" if item.get('offline') else item['location'])
         
         # Update the barcode entry field to show the item ID
         self.barcode_var.set(item['id'])
@@ -257,67 +427,112 @@ class BarcodeScannerApp:
         if not self.current_barcode:
             messagebox.showwarning("No Item", "Please scan an item first")
             return
+        if not self.monitor.allow():
+            messagebox.showwarning("Offline", "The database is unreachable. Changes can be saved "
+                                   "once the connection returns.")
+            return
         
         try:
             # Get current quantity from display
             current_qty = int(self.qty_var.get())
             change_qty = int(self.qty_change_var.get())
-            
-            if not is_add:
-                change_qty = -change_qty
-            
-            new_qty = current_qty + change_qty
-            
-            # Don't allow negative quantities
-            if new_qty < 0:
-                messagebox.showwarning("Invalid Quantity", "Quantity cannot be negative")
-                return
-            
-            # Update in Supabase
-            result = supabase.table('components').update(
-                {"quantity": new_qty}
-            ).eq('barcode', self.current_barcode).execute()
-            
-            # Update display
-            self.qty_var.set(str(new_qty))
-            
-            action = "added to" if change_qty > 0 else "removed from"
-            self.status_var.set(f"{abs(change_qty)} {action} inventory. New quantity: {new_qty}")
-            
-        except Exception as e:
+        except ValueError as e:
             self.status_var.set(f"Error updating quantity: {str(e)}")
             messagebox.showerror("Update Error", f"Failed to update quantity: {str(e)}")
+            return
+        
+        if not is_add:
+            change_qty = -change_qty
+        
+        new_qty = current_qty + change_qty
+        
+        # Don't allow negative quantities
+        if new_qty < 0:
+            messagebox.showwarning("Invalid Quantity", "Quantity cannot be negative")
+            return
+        
+        barcode = self.current_barcode
+        self.save_field(barcode, 'quantity', new_qty, current_qty, 'adjust')
+        
+        action = "added to" if change_qty > 0 else "removed from"
+        self.status_var.set(f"{abs(change_qty)} {action} inventory. New quantity: {new_qty}")
     
     def update_location(self):
         if not self.current_barcode:
             messagebox.showwarning("No Item", "Please scan an item first")
             return
+        if not self.monitor.allow():
+            messagebox.showwarning("Offline", "The database is unreachable. Changes can be saved "
+                                   "once the connection returns.")
+            return
         
         new_location = self.new_location_var.get().strip()
         if not new_location:
             messagebox.showwarning("Input Error", "Please select a location")
             return
         
-        try:
-            # Update in Supabase
-            result = supabase.table('components').update(
-                {"location": new_location}
-            ).eq('barcode', self.current_barcode).execute()
-            
-            # Update display
-            self.location_var.set(new_location)
-            self.status_var.set(f"Location updated to: {new_location}")
-            
-        except Exception as e:
-            self.status_var.set(f"Error updating location: {str(e)}")
-            messagebox.showerror("Update Error", f"Failed to update location: {str(e)}")
+        barcode = self.current_barcode
+        old_location = self.location_var.get()
+        self.save_field(barcode, 'location', new_location, old_location, 'move')
+        self.status_var.set(f"Location updated to: {new_location}")
+    
+    def save_field(self, barcode, name, value, previous, reason):
+        """Show a new quantity or location at once and save it in the background.
+
+        If the write fails and no newer change to the same field is still
+        being saved, the display goes back to `previous` and the operator is
+        told. The database records the movement, with `reason`, as it saves.
+        """
+        key = (barcode, name)
+        self.unconfirmed[key] = value
+        self.show_field(barcode, name, value)
+        
+        def saved(row):
+            if not self.writes.pending(key):
+                self.unconfirmed.pop(key, None)
+        
+        def failed(error):
+            if not self.writes.pending(key):
+                self.unconfirmed.pop(key, None)
+                self.show_field(barcode, name, previous)
+            self.status_var.set(f"Failed to save {name} for {barcode}; change rolled back: {error}")
+            messagebox.showerror(
+                "Update Failed",
+                f"The {name} change for {barcode} was not saved and has been rolled back "
+                f"to {previous}.\n\n{error}"
+            )
+        
+        self.writes.submit(key, lambda: self.source.update(barcode, {name: value}, reason, STATION_NAME), saved, failed)
+    
+    def show_field(self, barcode, name, value):
+        if barcode == self.current_barcode:
+            (self.qty_var if name == 'quantity' else self.location_var).set(str(value))
+    
+    def show_pending(self, count):
+        self.pending_var.set(f"Saving {count} change{'s' if count != 1 else ''}..." if count else "")
+    
+    def on_close(self):
+        if self.writes.pending():
+            wait = messagebox.askyesnocancel(
+                "Unsaved Changes", f"{self.writes.pending()} changes are still being saved. "
+                "Wait for them to finish before closing?"
+            )
+            if wait is None:
+                return
+            if wait:
+                self.writes.wait()
+        self.monitor.unsubscribe(self.on_connection)
+        self.root.destroy()
 
 # Main function
 def main():
     # Start the UI
     root = tk.Tk()
     app = BarcodeScannerApp(root)
+    profiler = start_profiling(root, config, 'inventory_scanner')
     root.mainloop()
+    if profiler:
+        profiler.stop()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
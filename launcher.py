@@ -0,0 +1,100 @@
+import tkinter as tk
+from tkinter import ttk
+from tkinter.font import Font
+import cycle_count_dashboard
+import inventory_manager
+import inventory_scanner
+from inventory_manager import config, supabase, STATION_NAME, SERVICE_URL, SERVICE_TOKEN, CATALOG_CACHE
+from connection_monitor import STATE_COLORS
+from ui_dispatch import UIDispatcher
+from ui_profiler import start_profiling
+from workstation import Workstation
+
+# Tools the launcher can open: (name, button text, app class)
+TOOLS = (
+    ('inventory_manager', "Inventory Manager", inventory_manager.InventoryManager),
+    ('inventory_scanner', "Barcode Scanner", inventory_scanner.BarcodeScannerApp),
+    ('cycle_count', "Cycle Count Dashboard", cycle_count_dashboard.CycleCountDashboard),
+)
+
+# Single-process launcher for all the tools
+class Launcher:
+    """Open the manager, scanner and cycle count dashboard as windows of one process.
+
+    The tools share one Supabase client, one connection heartbeat and the
+    loaded catalogs through a Workstation, so a workstation pays for them
+    once. A tool that is already open is brought to the front instead of
+    being started again.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.root.title("Warehouse Tools")
+        self.root.geometry("360x320")
+        self.root.configure(bg="#f0f0f0")
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.ui = UIDispatcher(self.root)
+        self.workstation = Workstation(supabase, STATION_NAME, SERVICE_URL, CATALOG_CACHE, SERVICE_TOKEN)
+        self.tools = {}  # {name: (window, app)}
+
+        frame = ttk.Frame(self.root, padding=20)
+        frame.pack(fill=tk.BOTH, expand=True)
+        tk.Label(frame, text="Warehouse Tools", font=Font(family="Arial", size=18, weight="bold"),
+                 bg="#f0f0f0").pack(pady=10)
+        for name, text, app_class in TOOLS:
+            ttk.Button(frame, text=text, width=25,
+                       command=lambda name=name: self.open_tool(name)).pack(pady=5)
+
+        self.catalog_var = tk.StringVar(value="Loading catalog...")
+        ttk.Label(frame, textvariable=self.catalog_var).pack(pady=(15, 0))
+        self.connection_var = tk.StringVar(value=self.workstation.monitor.describe())
+        self.connection_label = ttk.Label(self.root, textvariable=self.connection_var, relief=tk.SUNKEN,
+                                          anchor=tk.CENTER)
+        self.connection_label.pack(side=tk.BOTTOM, fill=tk.X)
+
+        self.workstation.monitor.subscribe(self.on_connection)
+        self.workstation.start()
+        self.workstation.preload(self.on_catalog_loaded)
+
+    def on_connection(self, monitor):
+        self.ui.post(self.show_connection, monitor.state, monitor.describe(), key='connection')
+
+    def show_connection(self, state, text):
+        self.connection_var.set(text)
+        self.connection_label.configure(foreground=STATE_COLORS.get(state, ""))
+
+    def on_catalog_loaded(self, catalog):
+        # Called on the preload thread
+        self.ui.set(self.catalog_var, f"Catalog loaded: {len(catalog)} items")
+
+    def open_tool(self, name):
+        window, app = self.tools.get(name, (None, None))
+        if window is not None and window.winfo_exists():
+            window.deiconify()
+            window.lift()
+            window.focus_force()
+            return
+        app_class = next(app_class for tool, text, app_class in TOOLS if tool == name)
+        window = tk.Toplevel(self.root)
+        self.tools[name] = (window, app_class(window, self.workstation))
+
+    def on_close(self):
+        """Close every open tool (each may ask first), then the launcher."""
+        for window, app in list(self.tools.values()):
+            if window.winfo_exists():
+                app.on_close()
+                if window.winfo_exists():
+                    return  # The tool was kept open
+        self.root.destroy()
+
+# Main function
+def main():
+    root = tk.Tk()
+    app = Launcher(root)
+    profiler = start_profiling(root, config, 'launcher')
+    root.mainloop()
+    if profiler:
+        profiler.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import http.client
+import json
+import threading
+from urllib.parse import quote, urlencode, urlsplit
+from count_session import LiveLookup
+
+def lookup_source(supabase, service_url=None, service_token=None):
+    """Use the shared lookup service when one is configured, else query Supabase directly."""
+    return LookupClient(service_url, service_token) if service_url else LiveLookup(supabase)
+
+# Client for lookup_service.py
+class LookupClient:
+    """Talk to a shared lookup service instead of Supabase.
+
+    Offers the same `lookup` and `lookup_many` as LiveLookup, so it can be a
+    CountSession source, plus `search` and `update` for the scanner. Each
+    thread keeps its own keep-alive connection to the service. The service's
+    token, if it has one, is sent with every request.
+    """
+
+    local = False
+
+    def __init__(self, url, token=None, timeout=10):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 8765
+        self.token = token
+        self.timeout = timeout
+        self.connections = threading.local()
+
+    def _request(self, method, path, payload=None):
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        if self.token:
+            headers['X-Service-Token'] = self.token
+        for attempt in range(2):
+            connection = getattr(self.connections, 'connection', None)
+            if connection is None:
+                connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+                self.connections.connection = connection
+            try:
+                connection.request(method, path, body, headers)
+                response = connection.getresponse()
+                data = json.loads(response.read() or b'{}')
+                break
+            except (http.client.HTTPException, ConnectionError):
+                # The service closed an idle connection; reconnect once
+                connection.close()
+                self.connections.connection = None
+                if attempt:
+                    raise
+        if response.status == 404:
+            return None
+        if response.status != 200:
+            raise RuntimeError(data.get('error', f"Lookup service returned {response.status}"))
+        return data
+
+    def health(self):
+        return self._request('GET', '/health')
+
+    def lookup(self, code):
+        return self._request('GET', f"/items/{quote(code, safe='')}")
+
+    def lookup_many(self, codes):
+        codes = list(dict.fromkeys(codes))
+        if not codes:
+            return {}
+        return self._request('POST', '/lookup', {'codes': codes})['items']
+
+    def search(self, query, limit=20):
+        """Return (barcode, id, description) tuples like SearchIndex.search."""
+        data = self._request('GET', f"/search?q={quote(query)}&limit={limit}")
+        return [(r['barcode'], r['id'], r['description']) for r in data['results']]
+
+    def update(self, barcode, fields, reason='adjust', station=None, session_id=None):
+        """Update quantity and/or location through the service; returns the updated row."""
+        movement = urlencode({name: value for name, value in
+                              (('reason', reason), ('station', station), ('session_id', session_id)) if value})
+        row = self._request('PATCH', f"/items/{quote(barcode, safe='')}?{movement}", fields)
+        if row is None:
+            raise RuntimeError(f"No item found with barcode: {barcode}")
+        return row
+
+    def refresh(self, barcodes):
+        """Have the service re-read items changed without going through it."""
+        return self._request('POST', '/refresh', {'codes': list(barcodes)})
@@ -0,0 +1,308 @@
+import asyncio
+import configparser
+import hmac
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import parse_qs, unquote, urlsplit
+from catalog import fetch_components
+from search_index import SearchIndex
+
+# Fields a client may change through the service
+WRITABLE_FIELDS = ('quantity', 'location')
+MOVEMENT_REASONS = ('adjust', 'count', 'move')
+MAX_BODY = 1 << 20
+MAX_CODES = 5000
+# Hosts that only accept connections from this machine
+LOOPBACK_HOSTS = ('127.0.0.1', 'localhost', '::1')
+
+def load_config():
+    """Load configuration from config.ini"""
+    config = configparser.ConfigParser()
+    config_file = 'config.ini'
+    if not os.path.exists(config_file):
+        print(f"Error: {config_file} not found. Create it with your Supabase credentials (see README.md).")
+        sys.exit(1)
+    config.read(config_file)
+    return config
+
+# Shared lookup service
+class LookupService:
+    """Serve catalog lookups from memory and front writes for many stations.
+
+    The whole components table is held in memory with a search index, so
+    lookups, batch lookups and searches never leave the process. Every
+    upstream call (catalog loads and writes) runs on a single worker thread,
+    so the service holds one Supabase connection however many stations and
+    handhelds connect. Writes made through the service update the in-memory
+    rows at once; changes made elsewhere are picked up by a periodic reload,
+    or right away when a client asks the service to refresh those rows. A
+    reload builds the new rows and index on another thread and swaps them in
+    when ready, so requests keep being served from the old ones meanwhile.
+    With a `token`, writes (PATCH /items and POST /refresh) must send it in
+    an X-Service-Token header; reads stay open for handheld browsers.
+    """
+
+    def __init__(self, supabase, refresh_interval=300, token=None):
+        self.supabase = supabase
+        self.refresh_interval = refresh_interval
+        self.token = token
+        self.upstream = ThreadPoolExecutor(max_workers=1)
+        self.items = {}  # {barcode: components row}
+        self.ids = {}    # {id: barcode}
+        self.index = SearchIndex()
+        self.loaded_at = None
+        self.pending = None  # Rows written while a reload is building, re-applied after the swap
+
+    async def upstream_call(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.upstream, func, *args)
+
+    @staticmethod
+    def _build(rows):
+        items = {row['barcode']: row for row in rows}
+        ids = {row['id']: row['barcode'] for row in rows}
+        return items, ids, SearchIndex.from_catalog(items)
+
+    async def reload(self):
+        self.pending = []
+        try:
+            rows = await self.upstream_call(fetch_components, self.supabase)
+            # Indexing a large catalog takes seconds, too long to hold up the event loop
+            items, ids, index = await asyncio.get_running_loop().run_in_executor(None, self._build, rows)
+        except Exception:
+            self.pending = None
+            raise
+        pending, self.pending = self.pending, None
+        self.items, self.ids, self.index = items, ids, index
+        for row in pending:
+            self._apply_row(row)
+        self.loaded_at = datetime.now().isoformat(timespec='seconds')
+        print(f"Loaded {len(self.items)} items")
+
+    def _apply_row(self, row):
+        self.items[row['barcode']] = row
+        self.ids[row['id']] = row['barcode']
+        self.index.add(row['barcode'], row['id'], row['description'])
+        if self.pending is not None:
+            self.pending.append(row)
+
+    async def refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.reload()
+            except Exception as e:
+                print(f"Error reloading catalog: {e}")
+
+    def lookup(self, code):
+        row = self.items.get(code)
+        if row is None and code in self.ids:
+            row = self.items.get(self.ids[code])
+        return row
+
+    def _update_row(self, barcode, fields, reason, station, session_id):
+        result = self.supabase.rpc('update_component', {
+            'p_barcode': barcode, 'p_fields': fields, 'p_reason': reason, 'p_station': station,
+            'p_session_id': session_id
+        }).execute()
+        return result.data[0] if result.data else None
+
+    async def update(self, barcode, fields, reason='adjust', station=None, session_id=None):
+        """Write fields upstream, recording the movement there, then update the in-memory row."""
+        row = await self.upstream_call(self._update_row, barcode, fields, reason, station, session_id)
+        if row is not None:
+            self._apply_row(row)
+        return row
+
+    def _fetch_rows(self, barcodes):
+        result = self.supabase.table('components').select('*').in_('barcode', barcodes).execute()
+        return result.data or []
+
+    async def refresh(self, barcodes):
+        """Re-read rows changed upstream without going through the service, e.g. by a reconcile."""
+        rows = await self.upstream_call(self._fetch_rows, barcodes)
+        for row in rows:
+            self._apply_row(row)
+        return rows
+
+    def authorized(self, headers):
+        if self.token is None:
+            return True
+        return hmac.compare_digest(headers.get('x-service-token', '').encode('utf-8'), self.token.encode('utf-8'))
+
+    # HTTP
+    async def route(self, method, target, body, headers=None):
+        """Return (status, payload) for one request; payload is a dict or an HTML string."""
+        url = urlsplit(target)
+        path = url.path.rstrip('/') or '/'
+        writes = method == 'PATCH' or (method == 'POST' and path == '/refresh')
+        if writes and not self.authorized(headers or {}):
+            return 403, {'error': "A valid service token is required for changes"}
+        if method == 'GET' and path == '/':
+            return 200, LOOKUP_PAGE
+        if method == 'GET' and path == '/health':
+            return 200, {'items': len(self.items), 'loaded_at': self.loaded_at}
+        if method == 'GET' and path == '/search':
+            query = parse_qs(url.query)
+            limit = min(int(query.get('limit', ['20'])[0]), 200)
+            results = self.index.search(query.get('q', [''])[0], limit)
+            return 200, {'results': [{'barcode': b, 'id': i, 'description': d} for b, i, d in results]}
+        if method == 'POST' and path == '/lookup':
+            payload = json.loads(body or b'{}')
+            codes = payload.get('codes') if isinstance(payload, dict) else None
+            if not isinstance(codes, list) or len(codes) > MAX_CODES:
+                return 400, {'error': f"codes must be a list of at most {MAX_CODES} codes"}
+            items = {}
+            for code in codes:
+                row = self.lookup(code)
+                if row is not None:
+                    items[code] = row
+            return 200, {'items': items}
+        if method == 'POST' and path == '/refresh':
+            payload = json.loads(body or b'{}')
+            codes = payload.get('codes') if isinstance(payload, dict) else None
+            if not isinstance(codes, list) or len(codes) > MAX_CODES:
+                return 400, {'error': f"codes must be a list of at most {MAX_CODES} codes"}
+            rows = await self.refresh(codes)
+            return 200, {'refreshed': len(rows)}
+        if path.startswith('/items/'):
+            code = unquote(path[len('/items/'):])
+            if method == 'GET':
+                row = self.lookup(code)
+                return (200, row) if row is not None else (404, {'error': f"No item found with barcode: {code}"})
+            if method == 'PATCH':
+                fields = json.loads(body or b'{}')
+                if not isinstance(fields, dict) or not fields or any(name not in WRITABLE_FIELDS for name in fields):
+                    return 400, {'error': f"Only {', '.join(WRITABLE_FIELDS)} can be updated"}
+                if 'quantity' in fields and (not isinstance(fields['quantity'], int) or fields['quantity'] < 0):
+                    return 400, {'error': "Quantity must be a non-negative integer"}
+                query = parse_qs(url.query)
+                reason = query.get('reason', ['adjust'])[0]
+                if reason not in MOVEMENT_REASONS:
+                    return 400, {'error': f"reason must be one of {', '.join(MOVEMENT_REASONS)}"}
+                row = await self.update(code, fields, reason, query.get('station', [None])[0],
+                                        query.get('session_id', [None])[0])
+                return (200, row) if row is not None else (404, {'error': f"No item found with barcode: {code}"})
+        return 404, {'error': "Not found"}
+
+    async def handle(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection, keeping it open between requests."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length') or 0)
+                if length > MAX_BODY:
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                try:
+                    status, payload = await self.route(method, target, body, headers)
+                except (ValueError, json.JSONDecodeError) as e:
+                    status, payload = 400, {'error': str(e)}
+                except Exception as e:
+                    status, payload = 502, {'error': str(e)}
+
+                if isinstance(payload, str):
+                    content, content_type = payload.encode('utf-8'), 'text/html; charset=utf-8'
+                else:
+                    content, content_type = json.dumps(payload, default=str).encode('utf-8'), 'application/json'
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(content)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + content
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        await self.reload()
+        server = await asyncio.start_server(self.handle, host, port)
+        refresher = asyncio.create_task(self.refresh_loop())
+        print(f"Lookup service listening on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            refresher.cancel()
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 403: 'Forbidden', 404: 'Not Found', 502: 'Bad Gateway'}
+
+# Minimal lookup page for handheld browsers
+LOOKUP_PAGE = """<!DOCTYPE html>
+<html><head><meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Item Lookup</title>
+<style>body{font-family:Arial,sans-serif;margin:1em}input{font-size:1.4em;width:100%}
+li{padding:.4em 0;border-bottom:1px solid #ddd}</style></head>
+<body><h2>Item Lookup</h2>
+<input id="q" autofocus placeholder="Scan a barcode or type to search">
+<ul id="results"></ul>
+<script>
+const q = document.getElementById('q'), results = document.getElementById('results');
+function show(items) {
+  results.innerHTML = '';
+  for (const item of items) {
+    const li = document.createElement('li');
+    li.textContent = item.id + ' - ' + item.description +
+      (item.quantity !== undefined ? ' | Qty: ' + item.quantity + ' | ' + item.location : '');
+    li.onclick = () => lookup(item.barcode);
+    results.appendChild(li);
+  }
+}
+async function lookup(code) {
+  const response = await fetch('/items/' + encodeURIComponent(code));
+  show(response.ok ? [await response.json()] : []);
+}
+let timer;
+q.addEventListener('input', () => {
+  clearTimeout(timer);
+  timer = setTimeout(async () => {
+    const response = await fetch('/search?q=' + encodeURIComponent(q.value));
+    show((await response.json()).results);
+  }, 150);
+});
+q.addEventListener('keydown', e => { if (e.key === 'Enter') { lookup(q.value.trim()); q.select(); } });
+</script></body></html>
+"""
+
+def main():
+    config = load_config()
+    host = config.get('SERVICE', 'HOST', fallback='127.0.0.1')
+    port = config.getint('SERVICE', 'PORT', fallback=8765)
+    refresh = config.getint('SERVICE', 'REFRESH', fallback=300)
+    token = config.get('SERVICE', 'TOKEN', fallback=None) or None
+    if host not in LOOPBACK_HOSTS and token is None:
+        print(f"Error: set TOKEN in the [SERVICE] section of config.ini before serving on {host}, "
+              f"so only the apps can change quantities.")
+        sys.exit(1)
+    from supabase import create_client
+    try:
+        supabase = create_client(config['SUPABASE']['URL'], config['SUPABASE']['KEY'])
+    except Exception as e:
+        print(f"Error connecting to Supabase: {e}")
+        sys.exit(1)
+    try:
+        asyncio.run(LookupService(supabase, refresh, token).serve(host, port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
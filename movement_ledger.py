@@ -0,0 +1,14 @@
+# Reads of the inventory movement ledger. Movements are recorded by the
+# database itself, in update_component and apply_count_adjustments (see
+# README.md), in the same transaction as the quantity change.
+
+def on_hand(supabase, barcodes):
+    """Return {barcode: quantity} from each item's latest snapshot plus the movements after it."""
+    result = supabase.rpc('inventory_on_hand', {'barcodes': list(barcodes)}).execute()
+    return {row['barcode']: row['quantity'] for row in result.data or []}
+
+def history(supabase, barcode, limit=100):
+    """Return the latest movements of one item, newest first."""
+    result = (supabase.table('inventory_movements').select('*').eq('barcode', barcode)
+              .order('id', desc=True).limit(limit).execute())
+    return result.data
@@ -0,0 +1,149 @@
+import threading
+import tkinter as tk
+from tkinter import messagebox, ttk
+
+def find_variances(scanned_items):
+    """Return every counted item whose count differs from the database quantity."""
+    variances = []
+    for barcode, details in scanned_items.items():
+        user_qty = details.get('user_qty')
+        if user_qty is None or details.get('supabase_qty') is None:
+            continue
+        if int(user_qty) != int(details['supabase_qty']):
+            variances.append({
+                'barcode': barcode,
+                'id': details['id'],
+                'description': details['description'],
+                'expected_qty': int(details['supabase_qty']),
+                'new_qty': int(user_qty)
+            })
+    return variances
+
+def apply_variances(supabase, variances, station, session_id=None):
+    """Apply counted quantities in one transaction through the apply_count_adjustments RPC.
+
+    Each item is only updated if the database still holds the quantity the
+    count was compared against. Returns {barcode: {'status', 'old_qty', 'new_qty'}}
+    where status is 'applied', 'changed' or 'missing'.
+    """
+    payload = [
+        {'barcode': v['barcode'], 'expected_qty': v['expected_qty'], 'new_qty': v['new_qty']}
+        for v in variances
+    ]
+    result = supabase.rpc('apply_count_adjustments', {
+        'adjustments': payload,
+        'station': station,
+        'session_id': session_id
+    }).execute()
+    return {row['barcode']: row for row in (result.data or [])}
+
+# Preview and apply window
+class ReconcileWindow:
+    """Preview all variances of a session and apply them as one batch.
+
+    The batch is applied by an RPC on the database, so afterwards `source`
+    is asked to re-read the changed items (a lookup service would otherwise
+    keep serving the old quantities). In a `frozen` session the counts stay
+    compared against the snapshot, so a skipped item keeps its frozen quantity.
+    """
+
+    def __init__(self, parent, ui, session_status, supabase, station, session_id=None, source=None,
+                 frozen=False):
+        self.ui = ui
+        self.session_status = session_status
+        self.supabase = supabase
+        self.source = source
+        self.frozen = frozen
+        self.station = station
+        self.session_id = session_id
+        self.variances = find_variances(session_status.scanned_items)
+
+        self.window = tk.Toplevel(parent)
+        self.window.title("Apply All Variances")
+        self.window.geometry("800x600")
+        self.window.configure(bg="#f0f0f0")
+
+        self.summary_var = tk.StringVar(value=f"{len(self.variances)} items differ from the database.")
+        ttk.Label(self.window, textvariable=self.summary_var, font=('Arial', 12, 'bold')).pack(pady=5)
+
+        frame = ttk.Frame(self.window)
+        frame.pack(fill=tk.BOTH, expand=True, pady=5)
+        columns = (("ID", 100), ("Description", 250), ("Supabase Qty", 100),
+                   ("Counted Qty", 100), ("Difference", 90), ("Result", 100))
+        self.tree = ttk.Treeview(frame, columns=[name for name, _ in columns], show="headings")
+        for name, width in columns:
+            self.tree.heading(name, text=name)
+            self.tree.column(name, width=width)
+        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        for v in self.variances:
+            self.tree.insert("", tk.END, iid=v['barcode'], values=(
+                v['id'], v['description'], v['expected_qty'], v['new_qty'],
+                f"{v['new_qty'] - v['expected_qty']:+d}", "Pending"
+            ))
+
+        buttons_frame = ttk.Frame(self.window)
+        buttons_frame.pack(pady=10)
+        self.apply_button = ttk.Button(buttons_frame, text="Apply All", command=self.apply)
+        self.apply_button.pack(side=tk.LEFT, padx=5)
+        if not self.variances:
+            self.apply_button.state(['disabled'])
+        ttk.Button(buttons_frame, text="Close", command=self.window.destroy).pack(side=tk.LEFT, padx=5)
+
+    def apply(self):
+        if not messagebox.askyesno(
+            "Apply All Variances",
+            f"Set the database quantity of {len(self.variances)} items to the counted quantity?",
+            parent=self.window
+        ):
+            return
+        self.apply_button.state(['disabled'])
+        self.summary_var.set(f"Applying {len(self.variances)} updates...")
+
+        def perform_apply():
+            try:
+                results = apply_variances(self.supabase, self.variances, self.station, self.session_id)
+                self.ui.post(self.show_results, results)
+            except Exception as e:
+                error_msg = str(e)
+                self.ui.post(self.handle_error, error_msg)
+                return
+            applied = [barcode for barcode, row in results.items() if row['status'] == 'applied']
+            if self.source is not None and applied:
+                try:
+                    self.source.refresh(applied)
+                except Exception as e:
+                    print(f"Error refreshing reconciled items: {e}")
+
+        threading.Thread(target=perform_apply).start()
+
+    def show_results(self, results):
+        """Mark each row with its outcome and sync applied quantities into the session."""
+        applied = 0
+        for v in self.variances:
+            row = results.get(v['barcode'])
+            status = row['status'] if row else 'missing'
+            if status == 'applied':
+                applied += 1
+                self.session_status.update_scan(v['barcode'], supabase_qty=v['new_qty'])
+            elif status == 'changed' and not self.frozen:
+                self.session_status.update_scan(v['barcode'], supabase_qty=row['old_qty'])
+            if self.tree.exists(v['barcode']):
+                self.tree.set(v['barcode'], "Result", status.capitalize())
+        skipped = len(self.variances) - applied
+        self.summary_var.set(f"Applied {applied} updates, skipped {skipped}.")
+        if skipped:
+            messagebox.showwarning(
+                "Some Items Skipped",
+                f"{skipped} items were skipped because their database quantity changed "
+                "since they were counted or they no longer exist. Recount them.",
+                parent=self.window
+            )
+
+    def handle_error(self, error_msg):
+        self.summary_var.set(f"Error: {error_msg}")
+        self.apply_button.state(['!disabled'])
+        messagebox.showerror("Update Error", f"Failed to apply variances: {error_msg}", parent=self.window)
@@ -0,0 +1,127 @@
+import queue
+import threading
+import tkinter as tk
+
+# Keyboard-wedge scanner input
+class ScanInput:
+    """Separate scanner bursts from human typing in an Entry.
+
+    Scanner guns type a whole barcode within a few milliseconds per key and
+    usually finish with Return. Keys closer together than `burst_gap` ms
+    (by the event timestamps, so a busy UI does not turn typing into a burst)
+    are collected off the entry and handed to `on_scan` as one complete
+    barcode. Slower keys are typed into the entry as usual and Return calls
+    `on_submit`. Bursts without a Return suffix end after `end_delay` ms.
+    """
+
+    def __init__(self, entry, on_scan, on_submit, burst_gap=40, end_delay=150, min_length=3):
+        self.entry = entry
+        self.on_scan = on_scan
+        self.on_submit = on_submit
+        self.burst_gap = burst_gap
+        self.end_delay = end_delay
+        self.min_length = min_length
+
+        self.last_time = None
+        self.first = None      # (char, index) of the last typed key, in case a burst follows
+        self.burst = []
+        self.end_job = None
+        entry.bind('<Key>', self.on_key)
+
+    def on_key(self, event):
+        if event.keysym in ('Return', 'KP_Enter'):
+            self.last_time = None
+            self.first = None
+            if self.burst:
+                self.finish_burst()
+            else:
+                self.on_submit()
+            return 'break'
+
+        char = event.char
+        if not char or not char.isprintable():
+            # Editing and navigation keys end any burst
+            self.last_time = None
+            self.first = None
+            return None
+
+        fast = self.last_time is not None and 0 <= event.time - self.last_time <= self.burst_gap
+        self.last_time = event.time
+        self.schedule_end()
+        if self.burst:
+            if fast:
+                self.burst.append(char)
+                return 'break'
+            self.finish_burst()
+        if fast and self.first is not None:
+            # The previous key was the start of a scan: take it back out of the entry
+            first_char, index = self.first
+            if self.entry.get()[index:index + 1] == first_char:
+                self.entry.delete(index)
+            self.burst = [first_char, char]
+            self.first = None
+            return 'break'
+        self.first = (char, self.entry.index(tk.INSERT))
+        return None
+
+    def schedule_end(self):
+        if self.end_job is not None:
+            self.entry.after_cancel(self.end_job)
+        self.end_job = self.entry.after(self.end_delay, self.end_timeout)
+
+    def end_timeout(self):
+        self.end_job = None
+        self.last_time = None
+        self.first = None
+        if self.burst:
+            self.finish_burst()
+
+    def finish_burst(self):
+        code = ''.join(self.burst).strip()
+        self.burst = []
+        if len(code) >= self.min_length:
+            self.on_scan(code)
+        else:
+            # Too short to be a barcode; treat it as typing
+            self.entry.insert(tk.INSERT, code)
+
+# Batched barcode resolution
+class BatchLookup:
+    """Resolve queued codes against the components table in batches.
+
+    A worker thread takes everything queued since its last query and
+    resolves them with one `source.lookup_many` call (a LiveLookup queries
+    by barcode with a single `in` query and retries the misses by ID), then
+    calls `on_result(code, row, error, context)` for every queued code
+    in scan order, on the worker thread. `row` is None when nothing matched.
+    """
+
+    def __init__(self, source, on_result, max_batch=200):
+        self.source = source
+        self.on_result = on_result
+        self.max_batch = max_batch
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def put(self, code, context=None):
+        self.queue.put((code, context))
+
+    def pending(self):
+        return self.queue.qsize()
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                rows = self.source.lookup_many([code for code, _ in batch])
+                error = None
+            except Exception as e:
+                rows, error = {}, str(e)
+            for code, context in batch:
+                self.on_result(code, rows.get(code), error, context)
@@ -0,0 +1,274 @@
+import bisect
+import re
+from array import array
+import numpy as np
+
+# Word boundaries for word-prefix matching
+NON_WORD_RE = re.compile(r'[^0-9a-z.]+')
+
+# In-memory item search for manual lookup
+class SearchIndex:
+    """Search-as-you-type index over component IDs and descriptions.
+
+    Text is indexed by character trigrams, with a second posting map for
+    the first three letters of every word (shorter words whole). Each
+    posting is an array of integer keys sorted by rank (shorter text
+    first). A search intersects, with numpy and a slice of the shortest
+    posting at a time, the postings of every trigram in the query, narrowed
+    by its one- and two-letter terms where that is cheap. Candidates are
+    verified against their text in rank order, stopping as soon as enough
+    results are found. A query of short terms alone walks the whole catalog
+    in rank order. IDs
+    are also kept sorted for prefix lookups. Results are ranked exact ID,
+    ID prefix, every term starting a word, then any substring match. Items
+    can be added and removed as the catalog changes.
+    """
+
+    # Patching postings costs more per item than indexing from scratch, so a
+    # sync that changes more than 1/REBUILD_RATIO of the catalog rebuilds
+    REBUILD_RATIO = 20
+    # A short term only narrows a search when its trigrams' postings hold
+    # fewer than this many keys per indexed item
+    SHORT_TERM_RATIO = 1
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self.items = {}          # {barcode: (id, description, text, words, key)}
+        self.barcodes = {}       # {key: barcode}
+        self.postings = {}       # {trigram: array of keys in rank order}
+        self.word_postings = {}  # {trigram starting a word: array of keys in rank order}
+        self.sorted_ids = []     # sorted (id_lower, barcode)
+        self.exact_ids = {}      # {id_lower: barcode}
+        self.ranked_keys = None  # Every key in rank order, built when a search needs it
+        self.next_row = 0
+
+    @classmethod
+    def from_catalog(cls, all_items):
+        """Build from a {barcode: {'id', 'description'}} mapping."""
+        index = cls()
+        index._bulk_load(all_items)
+        return index
+
+    def _bulk_load(self, all_items):
+        """Index a whole catalog into an empty index, sorting each posting once."""
+        postings = {}
+        word_postings = {}
+        for barcode, item in all_items.items():
+            key, id_lower, text, words = self._register(barcode, item['id'], item['description'])
+            self.sorted_ids.append((id_lower, barcode))
+            for trigram in self._trigrams(text):
+                postings.setdefault(trigram, []).append(key)
+            for trigram in self._word_trigrams(words):
+                word_postings.setdefault(trigram, []).append(key)
+        self.postings = {t: array('Q', sorted(keys)) for t, keys in postings.items()}
+        self.word_postings = {t: array('Q', sorted(keys)) for t, keys in word_postings.items()}
+        self.sorted_ids.sort()
+
+    def sync(self, all_items):
+        """Bring the index in line with a reloaded catalog, re-indexing only changed items.
+
+        When many items changed, the index is rebuilt from the catalog instead.
+        """
+        removed = [b for b in self.items if b not in all_items]
+        changed = []
+        for barcode, item in all_items.items():
+            entry = self.items.get(barcode)
+            if entry is None or entry[0] != item['id'] or entry[1] != item['description']:
+                changed.append(barcode)
+        if not self.items or len(removed) + len(changed) > len(all_items) // self.REBUILD_RATIO:
+            self._reset()
+            self._bulk_load(all_items)
+            return
+        for barcode in removed:
+            self.remove(barcode)
+        for barcode in changed:
+            item = all_items[barcode]
+            self.add(barcode, item['id'], item['description'])
+
+    @staticmethod
+    def _trigrams(text):
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    @staticmethod
+    def _word_trigrams(words):
+        # Shorter words are kept whole so short terms can find them too
+        return {word[:3] for word in words.split()}
+
+    def _register(self, barcode, id_str, description):
+        id_lower = (id_str or '').lower()
+        text = f"{id_lower} {(description or '').lower()}"
+        words = ' ' + NON_WORD_RE.sub(' ', text)
+        # Rank by text length, ties broken by insertion order
+        key = (min(len(text), 0xFFFF) << 40) | self.next_row
+        self.next_row += 1
+        self.items[barcode] = (id_str, description, text, words, key)
+        self.barcodes[key] = barcode
+        self.exact_ids[id_lower] = barcode
+        self.ranked_keys = None
+        return key, id_lower, text, words
+
+    def add(self, barcode, id_str, description):
+        """Index an item, replacing any previous entry for the barcode."""
+        if barcode in self.items:
+            self.remove(barcode)
+        key, id_lower, text, words = self._register(barcode, id_str, description)
+        bisect.insort(self.sorted_ids, (id_lower, barcode))
+        for postings, trigrams in ((self.postings, self._trigrams(text)),
+                                   (self.word_postings, self._word_trigrams(words))):
+            for trigram in trigrams:
+                posting = postings.get(trigram)
+                if posting is None:
+                    postings[trigram] = array('Q', [key])
+                else:
+                    posting.insert(bisect.bisect_left(posting, key), key)
+
+    def remove(self, barcode):
+        entry = self.items.pop(barcode, None)
+        if entry is None:
+            return
+        text, words, key = entry[2], entry[3], entry[4]
+        del self.barcodes[key]
+        self.ranked_keys = None
+        for postings, trigrams in ((self.postings, self._trigrams(text)),
+                                   (self.word_postings, self._word_trigrams(words))):
+            for trigram in trigrams:
+                posting = postings.get(trigram)
+                if posting is None:
+                    continue
+                position = bisect.bisect_left(posting, key)
+                if position < len(posting) and posting[position] == key:
+                    del posting[position]
+                if not posting:
+                    del postings[trigram]
+        id_lower = text.split(' ', 1)[0]
+        position = bisect.bisect_left(self.sorted_ids, (id_lower, barcode))
+        if position < len(self.sorted_ids) and self.sorted_ids[position] == (id_lower, barcode):
+            del self.sorted_ids[position]
+        if self.exact_ids.get(id_lower) == barcode:
+            del self.exact_ids[id_lower]
+
+    def __len__(self):
+        return len(self.items)
+
+    def _id_prefix(self, prefix, limit):
+        """Barcodes whose ID starts with prefix, in ID order."""
+        matches = []
+        position = bisect.bisect_left(self.sorted_ids, (prefix,))
+        while position < len(self.sorted_ids) and len(matches) < limit:
+            id_lower, barcode = self.sorted_ids[position]
+            if not id_lower.startswith(prefix):
+                break
+            matches.append(barcode)
+            position += 1
+        return matches
+
+    @staticmethod
+    def _members(posting, keys):
+        """Mask of the sorted `keys` that are in the sorted array `posting`."""
+        if not len(posting):
+            return np.zeros(len(keys), dtype=bool)
+        positions = np.searchsorted(posting, keys)
+        positions[positions == len(posting)] = 0
+        return posting[positions] == keys
+
+    def _short_keys(self, postings, match):
+        """Sorted keys of the postings whose trigram passes `match`, or None if too many to help."""
+        found = []
+        total = 0
+        for trigram, posting in postings.items():
+            if match(trigram):
+                total += len(posting)
+                if total > len(self.items) * self.SHORT_TERM_RATIO:
+                    return None
+                found.append(np.frombuffer(posting, dtype=np.uint64))
+        # An item can sit in several of the postings; _walk skips the repeats
+        return np.sort(np.concatenate(found)) if found else np.zeros(0, dtype=np.uint64)
+
+    def _candidates(self, postings, short=()):
+        """Key arrays a match must be in, shortest first.
+
+        A short term's None (too common to narrow anything) is skipped; with
+        nothing to intersect every key is a candidate.
+        """
+        arrays = [np.frombuffer(posting, dtype=np.uint64) for posting in postings]
+        arrays.extend(keys for keys in short if keys is not None)
+        if not arrays:
+            if self.ranked_keys is None:
+                self.ranked_keys = np.sort(np.fromiter(self.barcodes, dtype=np.uint64, count=len(self.barcodes)))
+            return [self.ranked_keys]
+        return sorted(arrays, key=len)
+
+    def _walk(self, arrays, needed, accept, seen):
+        """Keep up to `needed` items in all of `arrays` that pass accept, in rank order.
+
+        The shortest array is intersected with the others a slice at a time,
+        so a common query stops after its first few slices.
+        """
+        found = []
+        barcodes = self.barcodes
+        keys, others = arrays[0], arrays[1:]
+        start, step = 0, 1024
+        while start < len(keys):
+            chunk = keys[start:start + step]
+            start += step
+            step *= 2
+            for other in others:
+                chunk = chunk[self._members(other, chunk)]
+                if not len(chunk):
+                    break
+            for key in chunk.tolist():
+                barcode = barcodes[key]
+                # Short-term keys can repeat, so passed items join `seen` at once
+                if barcode not in seen and accept(barcode):
+                    seen.add(barcode)
+                    found.append(barcode)
+                    if len(found) == needed:
+                        return found
+        return found
+
+    def search(self, query, limit=20):
+        """Return up to `limit` (barcode, id, description) tuples, best match first."""
+        query = query.strip().lower()
+        if not query:
+            return []
+        terms = query.split()
+        long_terms = set(term for term in terms if len(term) >= 3)
+        short_terms = set(term for term in terms if len(term) < 3)
+
+        ranked = []
+        exact = self.exact_ids.get(query)
+        if exact is not None:
+            ranked.append(exact)
+        ranked.extend(b for b in self._id_prefix(query, limit) if b != exact)
+        if len(ranked) >= limit:
+            return [(barcode,) + self.items[barcode][:2] for barcode in ranked[:limit]]
+
+        # A long term's trigrams must all occur in a match; one that never
+        # occurs rules out every item
+        postings = [self.postings.get(t) for t in set().union(*(self._trigrams(term) for term in long_terms))]
+        if None in postings:
+            return [(barcode,) + self.items[barcode][:2] for barcode in ranked]
+        items = self.items
+
+        def contains_all(barcode):
+            text = items[barcode][2]
+            return all(term in text for term in terms)
+
+        def starts_words(barcode):
+            words = items[barcode][3]
+            return all(f" {term}" in words for term in terms) and contains_all(barcode)
+
+        seen = set(ranked)
+        word_postings = [self.word_postings.get(term[:3]) for term in long_terms]
+        if None not in word_postings:
+            short = [self._short_keys(self.word_postings, lambda trigram: trigram.startswith(term))
+                     for term in short_terms]
+            ranked.extend(self._walk(self._candidates(word_postings + postings, short), limit - len(ranked),
+                                     starts_words, seen))
+        if len(ranked) < limit:
+            short = [self._short_keys(self.postings, lambda trigram: term in trigram) for term in short_terms]
+            ranked.extend(self._walk(self._candidates(postings, short), limit - len(ranked), contains_all, seen))
+
+        return [(barcode,) + self.items[barcode][:2] for barcode in ranked[:limit]]
@@ -0,0 +1,291 @@
+import threading
+import tkinter as tk
+from tkinter import ttk
+from shared_session import fetch_summary, fetch_items
+
+# Live session status window
+class SessionStatusWindow:
+    """A single status window per app that applies CountSession diffs as they arrive.
+
+    Closing the window only hides it, so reopening it costs nothing and the
+    trees stay in sync with the session while hidden.
+    """
+
+    def __init__(self, parent, session, mode):
+        self.session = session
+        self.mode = mode
+
+        self.window = tk.Toplevel(parent)
+        self.window.title("Session Status")
+        self.window.geometry("800x600")
+        self.window.configure(bg="#f0f0f0")
+        self.window.protocol("WM_DELETE_WINDOW", self.hide)
+        self.window.bind('<Destroy>', self._on_destroy)
+
+        # Scanned items section
+        self.scanned_label_var = tk.StringVar()
+        ttk.Label(self.window, textvariable=self.scanned_label_var,
+                  font=('Arial', 12, 'bold')).pack(pady=5)
+        if self.mode == "admin":
+            columns = (("ID", 100), ("Description", 300), ("Supabase Qty", 100), ("User Qty", 100))
+        else:
+            columns = (("ID", 100),)
+        self.scanned_tree = self._build_tree(columns)
+
+        # Unscanned items section
+        self.unscanned_label_var = tk.StringVar()
+        ttk.Label(self.window, textvariable=self.unscanned_label_var,
+                  font=('Arial', 12, 'bold')).pack(pady=5)
+        if self.mode == "admin":
+            columns = (("ID", 100), ("Description", 300))
+        else:
+            columns = (("ID", 100),)
+        self.unscanned_tree = self._build_tree(columns)
+
+        # Close button
+        ttk.Button(self.window, text="Close", command=self.hide).pack(pady=10)
+
+        self.rebuild()
+        self.session.subscribe(self.apply_diff)
+
+    def _build_tree(self, columns):
+        frame = ttk.Frame(self.window)
+        frame.pack(fill=tk.BOTH, expand=True, pady=5)
+        tree = ttk.Treeview(frame, columns=[name for name, _ in columns], show="headings")
+        for name, width in columns:
+            tree.heading(name, text=name)
+            tree.column(name, width=width)
+        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(fill=tk.BOTH, expand=True)
+        return tree
+
+    def _scanned_values(self, details):
+        if self.mode == "admin":
+            return (
+                details['id'],
+                details['description'],
+                details['supabase_qty'],
+                details['user_qty'] if details['user_qty'] is not None else "N/A"
+            )
+        return (details['id'],)
+
+    def _unscanned_values(self, item):
+        if self.mode == "admin":
+            return (item['id'], item['description'])
+        return (item['id'],)
+
+    def _update_counts(self):
+        scanned, unscanned = self.session.counts()
+        self.scanned_label_var.set(f"Scanned Items ({scanned}):")
+        self.unscanned_label_var.set(f"Unscanned Items ({unscanned}):")
+
+    def rebuild(self):
+        """Populate both trees from the session; only used on open and reset."""
+        self.scanned_tree.delete(*self.scanned_tree.get_children())
+        self.unscanned_tree.delete(*self.unscanned_tree.get_children())
+        for barcode, details in self.session.scanned_items.items():
+            self.scanned_tree.insert("", tk.END, iid=barcode, values=self._scanned_values(details))
+        for barcode, item in self.session.all_items.items():
+            if barcode in self.session.unscanned:
+                self.unscanned_tree.insert("", tk.END, iid=barcode, values=self._unscanned_values(item))
+        self._update_counts()
+
+    def apply_diff(self, event, barcode, details):
+        """Apply a single session change to the trees."""
+        if event in ('reset', 'cleared'):
+            self.rebuild()
+            return
+        if self.scanned_tree.exists(barcode):
+            self.scanned_tree.item(barcode, values=self._scanned_values(details))
+        else:
+            self.scanned_tree.insert("", tk.END, iid=barcode, values=self._scanned_values(details))
+        if self.unscanned_tree.exists(barcode):
+            self.unscanned_tree.delete(barcode)
+        self._update_counts()
+
+    def matches(self, mode):
+        """Whether this window can be reused for the given mode."""
+        return self.mode == mode and bool(self.window.winfo_exists())
+
+    def show(self):
+        self.window.deiconify()
+        self.window.lift()
+
+    def hide(self):
+        self.window.withdraw()
+
+    def destroy(self):
+        if self.window.winfo_exists():
+            self.window.destroy()
+
+    def _on_destroy(self, event):
+        if event.widget is self.window:
+            self.session.unsubscribe(self.apply_diff)
+
+# Server-side status for shared sessions
+class SessionSummaryWindow:
+    """Status of a shared session as computed by the database.
+
+    The totals come from count_session_summary and the items one page at a
+    time from count_session_items, so the window fetches a few kilobytes
+    whatever the catalog size and needs no catalog in memory. Refresh
+    reloads the totals and the current page.
+    """
+
+    PAGE_SIZE = 100
+
+    def __init__(self, parent, ui, supabase, session_id, mode):
+        self.ui = ui
+        self.supabase = supabase
+        self.session_id = session_id
+        self.mode = mode
+        self.pages = [None]  # Barcode each visited page starts after
+        self.rows = []
+        self.loading = None  # (status, after) of the page being fetched
+
+        self.window = tk.Toplevel(parent)
+        self.window.title(f"Session Status - {session_id}")
+        self.window.geometry("800x600")
+        self.window.configure(bg="#f0f0f0")
+        self.window.protocol("WM_DELETE_WINDOW", self.hide)
+
+        self.summary_var = tk.StringVar(value="Loading session totals...")
+        ttk.Label(self.window, textvariable=self.summary_var, font=('Arial', 12, 'bold')).pack(pady=5)
+
+        controls = ttk.Frame(self.window)
+        controls.pack(pady=5)
+        ttk.Label(controls, text="Show:").pack(side=tk.LEFT, padx=5)
+        statuses = ["scanned", "unscanned", "matched", "mismatched"] if mode == "admin" else ["scanned", "unscanned"]
+        self.status_var = tk.StringVar(value="scanned")
+        status_box = ttk.Combobox(controls, textvariable=self.status_var, values=statuses, state="readonly", width=12)
+        status_box.pack(side=tk.LEFT, padx=5)
+        status_box.bind('<<ComboboxSelected>>', lambda event: self.first_page())
+        self.page_var = tk.StringVar()
+        ttk.Label(controls, textvariable=self.page_var).pack(side=tk.LEFT, padx=10)
+
+        if self.mode == "admin":
+            columns = (("ID", 100), ("Description", 300), ("Supabase Qty", 100), ("User Qty", 100), ("Stations", 80))
+        else:
+            columns = (("ID", 100),)
+        frame = ttk.Frame(self.window)
+        frame.pack(fill=tk.BOTH, expand=True, pady=5)
+        self.tree = ttk.Treeview(frame, columns=[name for name, _ in columns], show="headings")
+        for name, width in columns:
+            self.tree.heading(name, text=name)
+            self.tree.column(name, width=width)
+        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        buttons = ttk.Frame(self.window)
+        buttons.pack(pady=10)
+        self.previous_button = ttk.Button(buttons, text="Previous", command=self.previous_page)
+        self.previous_button.pack(side=tk.LEFT, padx=5)
+        self.next_button = ttk.Button(buttons, text="Next", command=self.next_page)
+        self.next_button.pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Refresh", command=self.refresh).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Close", command=self.hide).pack(side=tk.LEFT, padx=5)
+
+        self.refresh()
+
+    def refresh(self):
+        self.load_summary()
+        self.load_page()
+
+    def load_summary(self):
+        def perform_load():
+            try:
+                summary, error = fetch_summary(self.supabase, self.session_id), None
+            except Exception as e:
+                summary, error = None, str(e)
+            self.ui.post(self.show_summary, summary, error, key=('session_summary', self.session_id))
+
+        threading.Thread(target=perform_load, daemon=True).start()
+
+    def show_summary(self, summary, error):
+        if error is not None:
+            self.summary_var.set(f"Error loading session totals: {error}")
+        elif summary is None:
+            self.summary_var.set(f"Session {self.session_id} has no scans in the database yet")
+        elif self.mode == "admin":
+            self.summary_var.set(
+                f"{summary['location'] or 'All locations'}: {summary['scanned']} scanned, "
+                f"{summary['unscanned']} unscanned, {summary['matched']} matched, "
+                f"{summary['mismatched']} mismatched ({summary['stations']} stations)"
+            )
+        else:
+            self.summary_var.set(f"{summary['scanned']} scanned, {summary['unscanned']} unscanned")
+
+    def first_page(self):
+        self.pages = [None]
+        self.load_page()
+
+    def next_page(self):
+        if self.rows:
+            self.pages.append(self.rows[-1]['barcode'])
+            self.load_page()
+
+    def previous_page(self):
+        if len(self.pages) > 1:
+            self.pages.pop()
+            self.load_page()
+
+    def load_page(self):
+        status, after = self.status_var.get(), self.pages[-1]
+        self.loading = (status, after)
+        self.previous_button.state(['disabled'])
+        self.next_button.state(['disabled'])
+
+        def perform_load():
+            try:
+                # One extra row tells whether there is a next page
+                rows, error = fetch_items(self.supabase, self.session_id, status, after, self.PAGE_SIZE + 1), None
+            except Exception as e:
+                rows, error = [], str(e)
+            self.ui.post(self.show_page, status, after, rows, error, key=('session_items', self.session_id))
+
+        threading.Thread(target=perform_load, daemon=True).start()
+
+    def show_page(self, status, after, rows, error):
+        if (status, after) != self.loading:
+            return  # A newer page was asked for while this one loaded
+        self.loading = None
+        self.rows = rows[:self.PAGE_SIZE]
+        self.tree.delete(*self.tree.get_children())
+        for row in self.rows:
+            self.tree.insert("", tk.END, iid=row['barcode'], values=self._values(row))
+        if error is not None:
+            self.page_var.set(f"Error: {error}")
+        else:
+            self.page_var.set(f"Page {len(self.pages)}")
+        self.previous_button.state(['!disabled'] if len(self.pages) > 1 else ['disabled'])
+        self.next_button.state(['!disabled'] if len(rows) > self.PAGE_SIZE else ['disabled'])
+
+    def _values(self, row):
+        if self.mode == "admin":
+            return (
+                row['id'],
+                row['description'],
+                row['supabase_qty'],
+                row['user_qty'] if row['user_qty'] is not None else "N/A",
+                row['stations']
+            )
+        return (row['id'],)
+
+    def matches(self, mode, session_id):
+        """Whether this window can be reused for the given mode and session."""
+        return self.mode == mode and self.session_id == session_id and bool(self.window.winfo_exists())
+
+    def show(self):
+        self.window.deiconify()
+        self.window.lift()
+
+    def hide(self):
+        self.window.withdraw()
+
+    def destroy(self):
+        if self.window.winfo_exists():
+            self.window.destroy()
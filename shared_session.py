@@ -0,0 +1,140 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+# Multi-station shared count sessions
+class SharedSessionSync:
+    """Stream a station's counts to a shared session and pull merged state back.
+
+    This station's own counts (`local_qty`) are coalesced per barcode in an
+    outbox and upserted to `count_session_scans` in batches. The merge across stations happens in the
+    `count_session_merged` view; only rows changed since the last poll are
+    fetched and handed to `on_merged`, which runs on the sync thread, with
+    `others_qty` set to what the other stations counted. The
+    first station to join sets the session's `location` (None for the whole
+    catalog), which scopes its server-side summary.
+    """
+
+    # Re-read a few seconds behind the cursor so rows committed late are not missed
+    CURSOR_OVERLAP = timedelta(seconds=5)
+
+    def __init__(self, supabase, session_id, station, on_merged, batch_size=200, interval=2.0, location=None):
+        self.supabase = supabase
+        self.session_id = session_id
+        self.station = station
+        self.location = location
+        self.on_merged = on_merged
+        self.batch_size = batch_size
+        self.interval = interval
+
+        self.outbox = {}  # {barcode: this station's count}, latest count wins
+        self.lock = threading.Lock()
+        self.cursor = None
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop polling after a final flush of pending counts."""
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+
+    def queue_count(self, barcode, user_qty):
+        with self.lock:
+            self.outbox[barcode] = user_qty
+
+    def listener(self, event, barcode, details):
+        """CountSession listener that forwards this station's scans and counts.
+
+        Only the station's own count is sent; the view adds up the stations.
+        """
+        if event in ('scanned', 'updated'):
+            self.queue_count(barcode, details.get('local_qty'))
+
+    def _run(self):
+        try:
+            self.supabase.table('count_sessions').upsert(
+                {'id': self.session_id, 'location': self.location}, ignore_duplicates=True
+            ).execute()
+        except Exception as e:
+            print(f"Error joining shared session {self.session_id}: {e}")
+        while True:
+            stopping = self.stop_event.wait(self.interval)
+            try:
+                self.flush()
+                if not stopping:
+                    self.pull()
+            except Exception as e:
+                print(f"Error syncing shared session {self.session_id}: {e}")
+            if stopping:
+                return
+
+    def flush(self):
+        """Upsert pending counts in batches; failed batches go back to the outbox."""
+        with self.lock:
+            pending, self.outbox = self.outbox, {}
+        rows = [
+            {'session_id': self.session_id, 'station': self.station, 'barcode': barcode, 'user_qty': qty}
+            for barcode, qty in pending.items()
+        ]
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            try:
+                self.supabase.table('count_session_scans').upsert(batch).execute()
+            except Exception:
+                with self.lock:
+                    for row in rows[start:]:
+                        self.outbox.setdefault(row['barcode'], row['user_qty'])
+                raise
+
+    def pull(self):
+        """Fetch merged rows changed since the last poll."""
+        query = self.supabase.table('count_session_merged').select('*').eq('session_id', self.session_id)
+        if self.cursor is not None:
+            query = query.gte('updated_at', (self.cursor - self.CURSOR_OVERLAP).isoformat())
+        result = query.order('updated_at').execute()
+        if not result.data:
+            return
+        latest = max(parse_timestamp(row['updated_at']) for row in result.data)
+        if self.cursor is None or latest > self.cursor:
+            self.cursor = latest
+        for row in result.data:
+            # The total may not include this station's latest count yet
+            if row.get('station_qtys') is not None:
+                row['others_qty'] = others_count(row['station_qtys'], self.station)
+        self.on_merged(result.data)
+
+def others_count(station_qtys, station):
+    """Total counted by every station but `station`, or None if none of them entered a count."""
+    counts = [qty for name, qty in station_qtys.items() if name != station and qty is not None]
+    return sum(counts) if counts else None
+
+def fetch_summary(supabase, session_id):
+    """Return the database's totals for a shared session (count_session_summary), or None if unknown."""
+    result = supabase.rpc('count_session_summary', {'p_session_id': session_id}).execute()
+    return result.data[0] if result.data else None
+
+def fetch_items(supabase, session_id, status='scanned', after=None, limit=100):
+    """Return up to `limit` of a session's items with `status`, in barcode order after `after`."""
+    result = supabase.rpc('count_session_items', {
+        'p_session_id': session_id, 'p_status': status, 'p_after': after, 'p_limit': limit
+    }).execute()
+    return result.data or []
+
+def parse_timestamp(value):
+    """Parse a PostgREST timestamptz string into an aware datetime."""
+    value = value.replace('Z', '+00:00')
+    # Python < 3.11 only accepts 0, 3 or 6 fractional digits
+    if '.' in value:
+        head, rest = value.split('.', 1)
+        digits = len(rest) - len(rest.lstrip('0123456789'))
+        value = f"{head}.{rest[:digits][:6].ljust(6, '0')}{rest[digits:]}"
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
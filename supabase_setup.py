@@ -1,9 +1,12 @@
+import argparse
 import pandas as pd
 import sys
 import os
 import configparser
 from supabase import create_client
 from datetime import datetime
+from catalog_import import (prepare_components, diff_catalog, fetch_current, apply_catalog_diff, summarize,
+                            ImportCheckpoint, stream_import)
 
 def load_config():
     """Load configuration from config.ini file or create it if not exists"""
@@ -14,8 +17,8 @@ def load_config():
     if not os.path.exists(config_file):
         # Create a new config file with default settings
         config['SUPABASE'] = {
-            'URL': '',
-            'KEY': 
+            'URL': 'YOUR_SUPABASE_URL',
+            'KEY': 'YOUR_SUPABASE_SERVICE_KEY'
         }
         
         with open(config_file, 'w') as f:
@@ -29,61 +32,52 @@ def load_config():
     return config
 
 def import_components(csv_file, supabase):
-    """Import components from CSV file to Supabase"""
+    """Import components from CSV file to Supabase, sending only new and changed rows"""
     try:
         # Read CSV file
         df = pd.read_csv(csv_file, encoding='utf-8')
         print(f"Loaded {len(df)} rows from {csv_file}")
         
-        # Collect all barcodes to check for duplicates
-        barcodes = {}
-        duplicate_count = 0
+        # Compare with the current catalog; existing quantities and locations are never reset
+        components, duplicates = prepare_components(df)
+        diff = diff_catalog(components, fetch_current(supabase))
+        print(f"Compared with the current catalog: {summarize(diff)}")
+        if len(duplicates) > 0:
+            print(f"WARNING: Found {len(duplicates)} duplicate barcodes (these were skipped)")
         
-        # Process each component
-        count = 0
-        for index, row in df.iterrows():
-            id_str = row["ID"]
-            desc = row["Description"]
-            
-            # Use the component ID directly as the barcode
-            barcode = id_str
-            
-            # Check for duplicates (should not happen since IDs are unique)
-            if barcode in barcodes:
-                print(f"WARNING: Duplicate barcode {barcode} for {id_str} and {barcodes[barcode]}")
-                duplicate_count += 1
-                continue
-            
-            barcodes[barcode] = id_str
-            
-            # Insert into Supabase
-            data = {
-                "id": id_str,
-                "barcode": barcode,  # Store the component ID as the barcode
-                "description": desc,
-                "quantity": 0,  # Default quantity
-                "location": "Warehouse"  # Default location
-            }
-            
-            try:
-                # Upsert (insert if not exists, update if exists)
-                result = supabase.table('components').upsert(data).execute()
-                count += 1
-                
-                # Print progress every 10 records
-                if count % 10 == 0:
-                    print(f"Processed {count} records...")
-            except Exception as e:
-                print(f"Error importing {id_str}: {e}")
-                
-        print(f"Successfully imported {count} components to Supabase")
-        if duplicate_count > 0:
-            print(f"WARNING: Found {duplicate_count} duplicate barcodes (these were skipped)")
+        delete_removed = False
+        if len(diff['removed']) > 0:
+            delete_choice = input(f"Delete the {len(diff['removed'])} components not in {csv_file}? (y/n): ")
+            delete_removed = delete_choice.lower() == 'y'
+        
+        sent = apply_catalog_diff(supabase, diff, delete_removed=delete_removed)
+        print(f"Successfully imported {csv_file}: {sent} rows sent to Supabase")
         return True
     except Exception as e:
         print(f"Error importing components: {e}")
         return False
 
+def resumable_import(csv_file, supabase, chunk_size, batch_size, restart=False):
+    """Stream a large CSV into the components table without prompting, resuming after a failure."""
+    if not os.path.exists(csv_file):
+        print(f"Error: {csv_file} not found.")
+        sys.exit(1)
+    checkpoint = ImportCheckpoint(csv_file)
+    if restart:
+        checkpoint.clear()
+    try:
+        state = stream_import(supabase, csv_file, checkpoint, chunk_size, batch_size)
+    except ValueError as e:
+        print(f"Error: {e}. Run again with --restart to import from the beginning.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Import stopped: {e}")
+        print(f"Progress is saved in {checkpoint.path}; run the same command again to resume.")
+        sys.exit(1)
+    checkpoint.clear()
+    print(f"Import complete: {state['rows_done']:,} rows, {state['new']:,} new, {state['changed']:,} changed, "
+          f"{state['unchanged']:,} unchanged, {state['duplicates']:,} duplicate IDs skipped")
+
 def check_table_exists(supabase):
     """Check if the components table exists in Supabase"""
     try:
@@ -97,6 +91,14 @@ def check_table_exists(supabase):
 
 def main():
     """Main function to set up Supabase database"""
+    parser = argparse.ArgumentParser(description="Set up the components table and import components.")
+    parser.add_argument('--import', dest='import_file', metavar='CSV',
+                        help="import this ID/Description CSV without prompting, resuming from its checkpoint")
+    parser.add_argument('--chunk-size', type=int, default=5000, help="rows read from the CSV at a time")
+    parser.add_argument('--batch-size', type=int, default=500, help="rows committed per checkpoint")
+    parser.add_argument('--restart', action='store_true', help="discard the checkpoint and import from the start")
+    args = parser.parse_args()
+
     print("Supabase Setup Utility")
     print("======================")
     
@@ -118,6 +120,10 @@ def main():
     except Exception as e:
         print(f"Error connecting to Supabase: {e}")
         sys.exit(1)
+
+    if args.import_file:
+        resumable_import(args.import_file, supabase, args.chunk_size, args.batch_size, args.restart)
+        return
     
     # Check if table exists
     if check_table_exists(supabase):
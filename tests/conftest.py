@@ -0,0 +1,109 @@
+import os
+import sys
+from types import SimpleNamespace
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class FakeQuery:
+    """One PostgREST-style query against FakeSupabase; chain calls, then execute()."""
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.action = 'select'
+        self.columns = None
+        self.filters = []
+        self.order_by = None
+        self.bounds = None
+        self.payload = None
+
+    def select(self, columns='*'):
+        self.columns = None if columns == '*' else columns.split(',')
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def order(self, column):
+        self.order_by = column
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end)
+        return self
+
+    def upsert(self, rows):
+        self.action, self.payload = 'upsert', rows
+        return self
+
+    def update(self, fields):
+        self.action, self.payload = 'update', fields
+        return self
+
+    def delete(self):
+        self.action = 'delete'
+        return self
+
+    def execute(self):
+        self.client.calls.append((self.table, self.action, self.payload))
+        if self.client.fail_on and self.client.fail_on(self):
+            raise ConnectionError("simulated failure")
+        rows = self.client.tables.setdefault(self.table, [])
+        if self.action == 'upsert':
+            by_id = {row['id']: row for row in rows}
+            for new in self.payload:
+                if new['id'] in by_id:
+                    by_id[new['id']].update(new)
+                else:
+                    rows.append(dict(new))
+            return SimpleNamespace(data=self.payload)
+        matched = [row for row in rows if all(test(row) for test in self.filters)]
+        if self.action == 'delete':
+            self.client.tables[self.table] = [row for row in rows if row not in matched]
+            return SimpleNamespace(data=matched)
+        if self.action == 'update':
+            for row in matched:
+                row.update(self.payload)
+            return SimpleNamespace(data=[dict(row) for row in matched])
+        if self.order_by:
+            matched.sort(key=lambda row: row[self.order_by])
+        if self.bounds:
+            matched = matched[self.bounds[0]:self.bounds[1] + 1]
+        if self.columns:
+            matched = [{column: row.get(column) for column in self.columns} for row in matched]
+        return SimpleNamespace(data=[dict(row) for row in matched])
+
+class FakeSupabase:
+    """In-memory stand-in for the parts of the Supabase client the engines use.
+
+    `tables` holds {table: [row, ...]}, `calls` records every executed
+    (table, action, payload), `rpcs` maps function names to handlers taking
+    the parameters, and `fail_on(query)` can make a query raise.
+    """
+
+    def __init__(self, tables=None):
+        self.tables = tables or {}
+        self.calls = []
+        self.rpcs = {}
+        self.fail_on = None
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params):
+        handler = self.rpcs[name]
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=handler(params)))
+
+    def writes(self, action='upsert'):
+        return [payload for table, done, payload in self.calls if done == action]
+
+@pytest.fixture
+def supabase():
+    return FakeSupabase()
@@ -0,0 +1,59 @@
+import pandas as pd
+from batch_reconcile import apply_mismatches, has_header, read_counts, reconcile_counts
+
+CATALOG = pd.DataFrame([
+    {'barcode': 'B1', 'id': 'MSC001', 'description': 'Screw', 'quantity': 10, 'location': 'Assembly'},
+    {'barcode': 'B2', 'id': 'MSC002', 'description': 'Nut', 'quantity': 4, 'location': 'Assembly'},
+    {'barcode': 'B3', 'id': 'LAB003', 'description': 'Label', 'quantity': None, 'location': 'Shipping'},
+])
+
+def counts_of(counts):
+    return dict(zip(counts['code'], counts['user_qty']))
+
+def test_count_sheet_with_a_header(tmp_path):
+    path = tmp_path / 'sheet.csv'
+    path.write_text('Item ID, Counted Qty\nB1,5\nB2, 3\nB1,2\n,4\nB3,-1\nB3,1.5\nB4,x\n', encoding='utf-8')
+    assert has_header(str(path))
+    counts, invalid = read_counts(str(path))
+    assert counts_of(counts) == {'B1': 7, 'B2': 3}
+    assert len(invalid) == 4
+
+def test_count_sheet_without_a_quantity_column_counts_one_per_line(tmp_path):
+    path = tmp_path / 'sheet.csv'
+    path.write_text('barcode\nB1\nB1\nB2\n', encoding='utf-8')
+    counts, _ = read_counts(str(path))
+    assert counts_of(counts) == {'B1': 2, 'B2': 1}
+
+def test_scanner_dump_with_bare_codes_and_quantities(tmp_path):
+    path = tmp_path / 'dump.txt'
+    path.write_text('B1\nB1\n\nB2;3\nB2\t2\nB3,\n', encoding='utf-8')
+    assert not has_header(str(path))
+    counts, invalid = read_counts(str(path))
+    assert counts_of(counts) == {'B1': 2, 'B2': 5, 'B3': 1}
+    assert invalid.empty
+
+def test_reconcile_joins_by_barcode_then_id():
+    counts = pd.DataFrame({'code': ['B1', 'MSC001', 'MSC002', 'B3', 'ZZZ'], 'user_qty': [6, 4, 4, 2, 9]})
+    lines, unknown = reconcile_counts(counts, CATALOG)
+    lines = lines.set_index('barcode')
+    # A barcode and its ID in one file are one item
+    assert lines.loc['B1', 'user_qty'] == 10 and lines.loc['B1', 'match']
+    assert lines.loc['B2', 'id'] == 'MSC002' and lines.loc['B2', 'match']
+    # No database quantity compares as 0
+    assert lines.loc['B3', 'expected_qty'] == 0 and lines.loc['B3', 'variance'] == 2
+    assert unknown.to_dict('records') == [{'code': 'ZZZ', 'user_qty': 9}]
+
+def test_apply_mismatches_batches_the_rpc(supabase):
+    calls = []
+    def apply_count_adjustments(params):
+        calls.append(params)
+        return [{'barcode': a['barcode'], 'status': 'applied', 'old_qty': a['expected_qty'],
+                 'new_qty': a['new_qty']} for a in params['adjustments']]
+    supabase.rpcs['apply_count_adjustments'] = apply_count_adjustments
+    mismatches = pd.DataFrame({'barcode': ['B1', 'B2', 'B3'], 'expected_qty': [10, 4, 0],
+                               'user_qty': [8, 5, 2]})
+    results = apply_mismatches(supabase, mismatches, 'dock-1', 'session-1', batch_size=2)
+    assert [len(call['adjustments']) for call in calls] == [2, 1]
+    assert calls[0]['station'] == 'dock-1' and calls[0]['session_id'] == 'session-1'
+    assert calls[0]['adjustments'][0] == {'barcode': 'B1', 'expected_qty': 10, 'new_qty': 8}
+    assert set(results) == {'B1', 'B2', 'B3'}
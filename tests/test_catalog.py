@@ -0,0 +1,128 @@
+import random
+import time
+import pytest
+from catalog import CompactCatalog, fetch_components, load_catalog
+
+ROWS = [
+    {'barcode': 'MSC001', 'id': 'MSC001', 'description': 'Screw M3'},
+    {'barcode': '0042', 'id': 'LAB042', 'description': 'Étiquette 4×6'},
+    {'barcode': 'MSC002', 'id': 'MSC002', 'description': 'Screw M3'},
+    {'barcode': 'EMPTY', 'id': 'EMPTY1', 'description': None},
+]
+
+def test_lookup_by_barcode():
+    catalog = CompactCatalog.build(ROWS)
+    assert len(catalog) == 4
+    assert catalog['0042'] == {'id': 'LAB042', 'description': 'Étiquette 4×6'}
+    assert catalog['EMPTY'] == {'id': 'EMPTY1', 'description': ''}
+    assert 'MSC002' in catalog and 'LAB042' not in catalog and 42 not in catalog
+    assert catalog.get('missing') is None
+    with pytest.raises(KeyError):
+        catalog['missing']
+
+def test_iterates_in_row_order():
+    catalog = CompactCatalog.build(ROWS)
+    assert list(catalog) == ['MSC001', '0042', 'MSC002', 'EMPTY']
+    assert next(iter(catalog.rows())) == ('MSC001', 'MSC001', 'Screw M3')
+    assert dict(catalog) == {row['barcode']: {'id': row['id'], 'description': row['description'] or ''}
+                             for row in ROWS}
+
+def test_later_duplicates_are_skipped():
+    catalog = CompactCatalog.build(ROWS + [{'barcode': 'MSC001', 'id': 'OTHER', 'description': 'Other'}])
+    assert len(catalog) == 4
+    assert catalog['MSC001']['id'] == 'MSC001'
+
+def test_repeated_strings_are_stored_once():
+    catalog = CompactCatalog.build(ROWS)
+    # An ID equal to its barcode and the repeated description add nothing to the blob
+    strings = {'MSC001', 'Screw M3', '0042', 'LAB042', 'Étiquette 4×6', 'MSC002', 'EMPTY', 'EMPTY1'}
+    assert len(catalog.blob) == sum(len(s.encode('utf-8')) for s in strings)
+
+def test_from_items_matches_build():
+    items = {row['barcode']: {'id': row['id'], 'description': row['description'] or ''} for row in ROWS}
+    assert dict(CompactCatalog.from_items(items)) == items
+
+def test_large_catalog_finds_every_barcode():
+    rng = random.Random(7)
+    barcodes = {f"{rng.choice('ABCDEFGH')}{rng.randrange(10 ** 9):09d}" for _ in range(20_000)}
+    catalog = CompactCatalog.build({'barcode': b, 'id': b, 'description': b[::-1]} for b in barcodes)
+    assert len(catalog) == len(barcodes)
+    assert all(catalog[b]['description'] == b[::-1] for b in barcodes)
+    assert not any(f"Z{b}" in catalog for b in list(barcodes)[:1000])
+
+@pytest.mark.parametrize('rows', [ROWS, ROWS[:3], []])
+def test_saved_file_maps_back_unchanged(tmp_path, rows):
+    path = str(tmp_path / 'catalog.bin')
+    catalog = CompactCatalog.build(rows)
+    catalog.save(path)
+    mapped = CompactCatalog.open(path)
+    assert mapped.mapped is not None
+    assert dict(mapped) == dict(catalog)
+    assert list(mapped.rows()) == list(catalog.rows())
+
+def test_open_rejects_other_files(tmp_path):
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'NOTACAT!' + bytes(12))
+    with pytest.raises(ValueError):
+        CompactCatalog.open(str(path))
+
+def test_fetch_components_pages_past_the_row_limit(supabase):
+    supabase.tables['components'] = [
+        {'barcode': f"B{i:04d}", 'id': f"I{i:04d}", 'description': 'x', 'location': 'A' if i % 2 else 'B'}
+        for i in range(25)
+    ]
+    rows = fetch_components(supabase, 'barcode,id', page_size=10)
+    assert [row['barcode'] for row in rows] == [f"B{i:04d}" for i in range(25)]
+    assert set(rows[0]) == {'barcode', 'id'}
+    assert len(fetch_components(supabase, location='A', page_size=10)) == 12
+
+def components(supabase, *barcodes):
+    supabase.tables['components'] = [{'barcode': b, 'id': b, 'description': f"Part {b}"} for b in barcodes]
+
+def fetches(supabase):
+    return sum(1 for table, action, _ in supabase.calls if table == 'components' and action == 'select')
+
+def test_load_catalog_maps_an_existing_cache_without_fetching(tmp_path, supabase):
+    path = str(tmp_path / 'catalog.bin')
+    components(supabase, 'A', 'B')
+    first = load_catalog(supabase, path)
+    assert first.mapped is not None and fetches(supabase) == 1
+    components(supabase, 'A', 'B', 'C')
+    cached = load_catalog(supabase, path)
+    assert cached.mapped is not None and list(cached) == ['A', 'B']
+    assert fetches(supabase) == 1
+    refreshed = load_catalog(supabase, path, refresh=True)
+    assert list(refreshed) == ['A', 'B', 'C'] and fetches(supabase) == 2
+    assert list(load_catalog(supabase, path)) == ['A', 'B', 'C']
+
+def test_load_catalog_refreshes_a_stale_cache_in_the_background(tmp_path, supabase):
+    path = str(tmp_path / 'catalog.bin')
+    components(supabase, 'A')
+    load_catalog(supabase, path)
+    components(supabase, 'A', 'B')
+    stale = load_catalog(supabase, path, max_age=-1)
+    assert list(stale) == ['A']  # The old copy is served at once
+    deadline = time.time() + 5
+    while 'B' not in CompactCatalog.open(path) and time.time() < deadline:
+        time.sleep(0.01)
+    assert list(load_catalog(supabase, path)) == ['A', 'B']
+    assert list(stale) == ['A']  # Mappings of the replaced file stay valid
+
+def test_load_catalog_falls_back_to_the_cache_when_the_fetch_fails(tmp_path, supabase):
+    path = str(tmp_path / 'catalog.bin')
+    components(supabase, 'A')
+    load_catalog(supabase, path)
+    supabase.fail_on = lambda query: True
+    assert list(load_catalog(supabase, path, refresh=True)) == ['A']
+    with pytest.raises(ConnectionError):
+        load_catalog(supabase, str(tmp_path / 'missing.bin'))
+
+def test_load_catalog_for_a_location_skips_the_cache(tmp_path, supabase):
+    path = tmp_path / 'catalog.bin'
+    supabase.tables['components'] = [
+        {'barcode': 'A', 'id': 'A', 'description': 'a', 'location': 'Assembly'},
+        {'barcode': 'B', 'id': 'B', 'description': 'b', 'location': 'Shipping'},
+    ]
+    catalog = load_catalog(supabase, str(path), 'Assembly')
+    assert list(catalog) == ['A'] and catalog.mapped is None
+    assert not path.exists()
@@ -0,0 +1,115 @@
+import pandas as pd
+import pytest
+from catalog_import import (ImportCheckpoint, apply_catalog_diff, count_rows, diff_catalog, import_catalog,
+                            prepare_components, stream_import, summarize)
+
+def frame(*rows):
+    return pd.DataFrame(rows, columns=['ID', 'Description'])
+
+def ids(df):
+    return sorted(df['id'])
+
+def test_prepare_components_strips_and_reports_duplicates():
+    components, duplicates = prepare_components(frame((' MSC1 ', 'Screw '), ('', 'blank'), ('MSC2', None),
+                                                      ('MSC1', 'again')))
+    assert components.to_dict('records') == [
+        {'id': 'MSC1', 'barcode': 'MSC1', 'description': 'Screw'},
+        {'id': 'MSC2', 'barcode': 'MSC2', 'description': ''},
+    ]
+    assert duplicates['description'].tolist() == ['again']
+
+def test_diff_sorts_rows_into_new_changed_unchanged_and_removed():
+    components, _ = prepare_components(frame(('A', 'same'), ('B', 'new text'), ('C', 'brand new')))
+    current = pd.DataFrame({'id': ['A', 'B', 'D'], 'description': ['same', 'old text', 'gone']})
+    diff = diff_catalog(components, current)
+    assert ids(diff['new']) == ['C']
+    assert ids(diff['changed']) == ['B']
+    assert diff['changed']['description_current'].tolist() == ['old text']
+    assert ids(diff['unchanged']) == ['A']
+    assert ids(diff['removed']) == ['D']
+    assert summarize(diff) == "1 new, 1 changed, 1 unchanged, 1 not in the import"
+
+def test_missing_descriptions_count_as_empty():
+    components, _ = prepare_components(frame(('A', None)))
+    diff = diff_catalog(components, pd.DataFrame({'id': ['A'], 'description': [None]}))
+    assert ids(diff['unchanged']) == ['A']
+
+def test_apply_sends_only_new_rows_and_changed_descriptions(supabase):
+    components, _ = prepare_components(frame(*[(f"N{i}", 'new') for i in range(5)], ('A', 'changed')))
+    diff = diff_catalog(components, pd.DataFrame({'id': ['A', 'R'], 'description': ['old', 'removed']}))
+    reports = []
+    assert apply_catalog_diff(supabase, diff, batch_size=2, progress=lambda *sent: reports.append(sent)) == 6
+    assert reports == [(2, 6), (4, 6), (5, 6), (6, 6)]
+    batches = supabase.writes('upsert')
+    assert [len(batch) for batch in batches] == [2, 2, 1, 1]
+    assert all(set(row) == {'id', 'barcode', 'description'} for batch in batches[:3] for row in batch)
+    # Changed rows keep their quantity, location and barcode
+    assert batches[3] == [{'id': 'A', 'description': 'changed'}]
+    assert supabase.writes('delete') == []
+
+    apply_catalog_diff(supabase, diff, delete_removed=True)
+    assert len(supabase.writes('delete')) == 1
+
+def test_import_catalog_keeps_quantities(supabase):
+    supabase.tables['components'] = [
+        {'id': 'A', 'barcode': 'A', 'description': 'old', 'quantity': 7, 'location': 'Assembly'},
+        {'id': 'B', 'barcode': 'B', 'description': 'kept', 'quantity': 3, 'location': 'Shipping'},
+    ]
+    diff = import_catalog(supabase, frame(('A', 'new'), ('B', 'kept'), ('C', 'added'), ('C', 'dup')))
+    assert (len(diff['new']), len(diff['changed']), len(diff['unchanged']), len(diff['duplicates'])) == (1, 1, 1, 1)
+    rows = {row['id']: row for row in supabase.tables['components']}
+    assert rows['A'] == {'id': 'A', 'barcode': 'A', 'description': 'new', 'quantity': 7, 'location': 'Assembly'}
+    assert rows['C'] == {'id': 'C', 'barcode': 'C', 'description': 'added'}
+
+def write_csv(path, count):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('ID,Description\n')
+        for i in range(count):
+            f.write(f"P{i:04d},Part {i}\n")
+
+def test_count_rows_with_and_without_a_final_line_break(tmp_path):
+    path = tmp_path / 'parts.csv'
+    write_csv(path, 12)
+    assert count_rows(str(path)) == 12
+    path.write_text('ID,Description\nA,x\nB,y', encoding='utf-8')
+    assert count_rows(str(path)) == 2
+
+def test_stream_import_resumes_after_the_last_committed_batch(tmp_path, supabase):
+    path = str(tmp_path / 'parts.csv')
+    write_csv(path, 23)
+    upserts = []
+    def fail_on(query):
+        if query.action == 'upsert':
+            upserts.append(query)
+            return len(upserts) == 3  # Die on the third batch
+        return False
+    supabase.fail_on = fail_on
+    with pytest.raises(ConnectionError):
+        stream_import(supabase, path, ImportCheckpoint(path), chunk_size=7, batch_size=5, retries=0,
+                      progress=lambda message: None)
+    assert ImportCheckpoint(path).load()['rows_done'] == 7  # Batches of 5 and 2 from the first chunk
+
+    supabase.fail_on = None
+    messages = []
+    state = stream_import(supabase, path, ImportCheckpoint(path), chunk_size=7, batch_size=5, retries=0,
+                          progress=messages.append)
+    assert messages[0] == "Resuming after row 7 of about 23"
+    assert state['rows_done'] == 23 and state['new'] == 23
+    assert sorted(row['id'] for row in supabase.tables['components']) == [f"P{i:04d}" for i in range(23)]
+
+    # Replaying the whole file finds nothing to send
+    sent = len(supabase.writes('upsert'))
+    ImportCheckpoint(path).clear()
+    state = stream_import(supabase, path, ImportCheckpoint(path), chunk_size=7, batch_size=5,
+                          progress=lambda message: None)
+    assert state['unchanged'] == 23 and len(supabase.writes('upsert')) == sent
+
+def test_checkpoint_refuses_a_changed_file(tmp_path):
+    path = str(tmp_path / 'parts.csv')
+    write_csv(path, 3)
+    checkpoint = ImportCheckpoint(path)
+    checkpoint.state['rows_done'] = 2
+    checkpoint.save()
+    write_csv(path, 4)
+    with pytest.raises(ValueError):
+        ImportCheckpoint(path).load()
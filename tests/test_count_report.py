@@ -0,0 +1,66 @@
+import math
+import pandas as pd
+import pytest
+from count_report import build_frame, build_report, build_unverified, compute_metrics, write_report
+
+ITEMS = {
+    'B1': {'id': 'MSC001', 'description': 'Screw', 'supabase_qty': 10, 'user_qty': 8, 'location': 'Assembly'},
+    'B2': {'id': 'MSC002', 'description': 'Nut', 'supabase_qty': 4, 'user_qty': 4, 'location': 'Assembly'},
+    'B3': {'id': 'lab003', 'description': 'Label', 'supabase_qty': 0, 'user_qty': 2, 'location': None},
+    'B4': {'id': '0004', 'description': 'Scanned only', 'supabase_qty': 5, 'user_qty': None},
+    'B5': {'id': 'MSC005', 'description': 'Counted offline', 'supabase_qty': None, 'user_qty': 3},
+}
+
+def test_frame_holds_only_verifiable_counted_lines():
+    df = build_frame(ITEMS)
+    assert df['barcode'].tolist() == ['B1', 'B2', 'B3']
+    assert df['prefix'].tolist() == ['MSC', 'MSC', 'LAB']
+    assert df['location'].tolist() == ['Assembly', 'Assembly', 'Unknown']
+    assert 'unit_cost' not in df
+    assert build_unverified(ITEMS).to_dict('records') == [
+        {'barcode': 'B5', 'id': 'MSC005', 'description': 'Counted offline', 'location': 'Unknown', 'user_qty': 3}
+    ]
+
+def test_line_metrics():
+    df = compute_metrics(build_frame(ITEMS)).set_index('barcode')
+    assert df['variance'].tolist() == [-2, 0, 2]
+    assert df.loc['B1', 'pct_error'] == pytest.approx(20.0)
+    assert df.loc['B2', 'pct_error'] == 0.0
+    assert math.isinf(df.loc['B3', 'pct_error'])
+    assert df['match'].tolist() == [False, True, False]
+
+def test_summary_and_rollups_are_weighted_by_quantity():
+    report = build_report(ITEMS)
+    summary = report['summary'].iloc[0]
+    assert (summary['lines'], summary['matched'], summary['mismatched']) == (3, 1, 2)
+    assert (summary['net_variance'], summary['abs_error'], summary['unverified']) == (0, 4, 1)
+    assert summary['item_accuracy'] == pytest.approx(1 / 3)
+    assert summary['qty_accuracy'] == pytest.approx(1 - 4 / 14)
+    assert 'value_accuracy' not in report['summary']
+
+    by_location = report['by_location'].set_index('location')
+    assert by_location.loc['Assembly', 'lines'] == 2
+    assert by_location.loc['Assembly', 'qty_accuracy'] == pytest.approx(1 - 2 / 14)
+    # Nothing on the books and something counted is 0% accurate
+    assert by_location.loc['Unknown', 'qty_accuracy'] == 0.0
+    assert report['by_prefix']['prefix'].tolist() == ['LAB', 'MSC']
+
+def test_unit_costs_add_value_weighting():
+    report = build_report(ITEMS, unit_costs={'B1': 0.5, 'B2': 100.0})
+    assert report['lines'].set_index('barcode')['unit_cost'].tolist() == [0.5, 100.0, 1.0]
+    summary = report['summary'].iloc[0]
+    assert summary['value_accuracy'] == pytest.approx(1 - (2 * 0.5 + 2 * 1.0) / (10 * 0.5 + 4 * 100.0))
+    assert 'value_accuracy' in report['by_prefix']
+
+def test_empty_session():
+    report = build_report({})
+    summary = report['summary'].iloc[0]
+    assert summary['lines'] == 0 and summary['item_accuracy'] == 1.0 and summary['qty_accuracy'] == 1.0
+    assert report['by_location'].empty
+
+def test_write_report(tmp_path):
+    report = build_report(ITEMS)
+    written = write_report(report, str(tmp_path / 'count.csv'), formats=('csv',))
+    assert written == [str(tmp_path / f"count_{name}.csv") for name in report]
+    lines = pd.read_csv(tmp_path / 'count_lines.csv')
+    assert lines['barcode'].tolist() == ['B1', 'B2', 'B3']
@@ -0,0 +1,201 @@
+import pytest
+from count_journal import CountJournal
+from count_session import CountSession, ItemCount, LiveLookup
+from count_snapshot import CountSnapshot
+
+ROWS = [
+    {'barcode': 'B1', 'id': 'MSC001', 'description': 'Screw', 'quantity': 10, 'location': 'Assembly'},
+    {'barcode': 'B2', 'id': 'MSC002', 'description': 'Nut', 'quantity': 0, 'location': 'Assembly'},
+    {'barcode': 'B3', 'id': 'LAB003', 'description': 'Label', 'quantity': 5, 'location': 'Shipping'},
+]
+
+@pytest.fixture
+def snapshot():
+    return CountSnapshot([dict(row) for row in ROWS])
+
+@pytest.fixture
+def session(snapshot):
+    return CountSession(snapshot.all_items(), source=snapshot)
+
+def events_of(session):
+    events = []
+    session.subscribe(lambda event, barcode, item: events.append((event, barcode)))
+    return events
+
+def test_scan_tracks_the_item_and_emits_scanned_then_updated(session):
+    events = events_of(session)
+    item = session.scan(session.lookup('B1'))
+    assert (item.id, item.supabase_qty, item.user_qty) == ('MSC001', 10, None)
+    assert session.counts() == (1, 2)
+    session.scan(session.lookup('MSC001'))  # Manual entry by ID finds the same item
+    assert events == [('scanned', 'B1'), ('updated', 'B1')]
+    assert session.counts() == (1, 2)
+
+def test_count_compares_against_the_database_quantity(session):
+    session.scan(session.lookup('B1'))
+    assert session.count('B1', 10) is True
+    assert session.count('B1', 7) is False
+    assert session.scanned_items['B1'].variance == -3
+    assert [item.barcode for item in session.mismatches()] == ['B1']
+    with pytest.raises(ValueError):
+        session.count('B1', -1)
+
+def test_rescan_resets_this_stations_count(session):
+    session.scan(session.lookup('B1'))
+    session.count('B1', 4)
+    item = session.scan(session.lookup('B1'))
+    assert item.user_qty is None and item.local_qty is None
+
+def test_item_count_reads_like_a_dict():
+    item = ItemCount('B1', 'MSC001', 'Screw', supabase_qty=3, user_qty=5)
+    assert item['id'] == 'MSC001' and item['variance'] == 2
+    assert item.get('missing', 'default') == 'default'
+    with pytest.raises(KeyError):
+        item['missing']
+    assert item.as_dict()['user_qty'] == 5
+
+def test_location_scope(session, snapshot):
+    session.set_catalog(CountSnapshot([r for r in ROWS if r['location'] == 'Assembly']).all_items(), 'Assembly')
+    assert session.in_scope(snapshot.lookup('B1'))
+    assert not session.in_scope(snapshot.lookup('B3'))
+    # Offline rows have no location; the session's catalog decides
+    assert session.in_scope({'barcode': 'B2', 'offline': True})
+    assert not session.in_scope({'barcode': 'B3', 'offline': True})
+    assert session.counts() == (0, 2)
+
+def test_tally_bins_add_up_across_codes_and_bins(session, snapshot):
+    for code in ('B1', 'B1', 'MSC001', 'nope'):
+        session.tally(code)
+    assert session.tally('B1', -1) == 1
+    assert session.bin_totals() == (3, 3)
+    tallies = session.close_bin()
+    assert session.bin == {}
+    unresolved = session.commit_tallies(tallies, snapshot.lookup_many(tallies))
+    assert unresolved == {'nope': 1}
+    assert session.scanned_items['B1'].user_qty == 2  # Barcode and ID counted as one item
+
+    session.tally('B1', 3)
+    tallies = session.close_bin()
+    session.commit_tallies(tallies, snapshot.lookup_many(tallies))
+    assert session.scanned_items['B1'].user_qty == 5
+
+def test_tally_skips_items_outside_the_location(session, snapshot):
+    session.set_catalog(CountSnapshot(ROWS[:2]).all_items(), 'Assembly')
+    session.tally('B3', 2)
+    tallies = session.close_bin()
+    assert session.commit_tallies(tallies, snapshot.lookup_many(tallies)) == {'B3': 2}
+    assert 'B3' not in session.scanned_items
+
+def test_reopen_bin_puts_back_failed_tallies(session):
+    session.tally('B1', 2)
+    tallies = session.close_bin()
+    session.tally('B1')
+    session.reopen_bin(tallies)
+    assert session.bin == {'B1': 3}
+
+def merged(barcode, user_qty, supabase_qty=10, station_qtys=None, others_qty=None):
+    row = {'barcode': barcode, 'id': 'MSC001', 'description': 'Screw', 'supabase_qty': supabase_qty,
+           'user_qty': user_qty, 'location': 'Assembly', 'stations': 2}
+    if station_qtys is not None:
+        row['station_qtys'] = station_qtys
+        row['others_qty'] = others_qty
+    return row
+
+def test_merged_rows_add_this_stations_latest_count(session):
+    session.scan(session.lookup('B1'))
+    session.count('B1', 2)
+    # Pulled before this station's count was uploaded: the total leaves it out
+    session.apply_merged(merged('B1', 3, station_qtys={'other': 3}, others_qty=3))
+    item = session.scanned_items['B1']
+    assert (item.user_qty, item.local_qty) == (5, 2)
+    session.count('B1', 6)
+    assert item.user_qty == 9
+    # Once uploaded the total agrees
+    session.apply_merged(merged('B1', 9, station_qtys={'other': 3, 'me': 6}, others_qty=3))
+    assert item.user_qty == 9
+
+def test_merged_rows_for_items_not_scanned_here(session):
+    events = events_of(session)
+    session.apply_merged(merged('B1', 4, station_qtys={'other': 4}, others_qty=4))
+    item = session.scanned_items['B1']
+    assert (item.user_qty, item.local_qty, item.stations) == (4, None, 2)
+    assert events == [('merged', 'B1')]
+    assert session.counts() == (1, 2)
+    # Counting here adds to the other station's count; a rescan keeps it
+    session.count('B1', 1)
+    assert item.user_qty == 5
+    assert session.scan(session.lookup('B1')).user_qty == 4
+
+def test_merged_rows_without_station_counts_use_the_total(session):
+    session.scan(session.lookup('B1'))
+    session.count('B1', 2)
+    session.apply_merged(merged('B1', 7))
+    assert session.scanned_items['B1'].user_qty == 7
+
+def test_set_quantity_keeps_other_stations_counts(session):
+    session.apply_merged(merged('B1', 4, station_qtys={'other': 4}, others_qty=4))
+    session.count('B1', 3)
+    session.set_quantity('B1', 7)
+    item = session.scanned_items['B1']
+    assert (item.supabase_qty, item.user_qty, item.local_qty) == (7, 7, 3)
+    session.set_quantity('B1', 9)
+    assert (item.user_qty, item.local_qty) == (9, 5)
+
+def test_journal_replay_restores_the_session(tmp_path, snapshot):
+    session = CountSession(snapshot.all_items(), source=snapshot)
+    journal = CountJournal('test', directory=str(tmp_path))
+    session.restore(journal.load())
+    session.subscribe(journal.listener)
+    session.scan(session.lookup('B1'))
+    session.count('B1', 8)
+    session.scan(session.lookup('B2'))
+    session.apply_merged(merged('B3', 4, supabase_qty=5))  # Merged rows are not journaled
+    journal.close()
+
+    resumed = CountSession(snapshot.all_items(), source=snapshot)
+    replay = CountJournal('test', directory=str(tmp_path))
+    resumed.restore(replay.load())
+    replay.close()
+    assert set(resumed.scanned_items) == {'B1', 'B2'}
+    item = resumed.scanned_items['B1']
+    assert (item.supabase_qty, item.user_qty, item.local_qty, item.location) == (10, 8, 8, 'Assembly')
+    assert resumed.counts() == (2, 1)
+
+def test_journal_replay_skips_a_torn_tail_and_archives_on_clear(tmp_path, snapshot):
+    session = CountSession(snapshot.all_items(), source=snapshot)
+    journal = CountJournal('test', directory=str(tmp_path), compact_every=10_000)
+    session.restore(journal.load())
+    session.subscribe(journal.listener)
+    session.scan(session.lookup('B1'))
+    journal.close()
+    with open(journal.journal_path, 'a', encoding='utf-8') as f:
+        f.write('["s","B2","MSC0')  # Crash mid-write
+
+    replay = CountJournal('test', directory=str(tmp_path), compact_every=10_000)
+    assert set(replay.load()) == {'B1'}
+    resumed = CountSession(snapshot.all_items(), source=snapshot)
+    resumed.subscribe(replay.listener)
+    resumed.clear()
+    replay.close()
+    assert list(tmp_path.glob('test_*.archive.json'))
+    assert CountJournal('test', directory=str(tmp_path)).load() == {}
+
+def test_journal_lines_without_local_count_load_as_the_total(tmp_path, snapshot):
+    (tmp_path / 'old.journal').write_text('["s","B1","MSC001","Screw",10,6,"Assembly"]\n', encoding='utf-8')
+    journal = CountJournal('old', directory=str(tmp_path))
+    session = CountSession(snapshot.all_items(), source=snapshot)
+    session.restore(journal.load())
+    journal.close()
+    assert session.scanned_items['B1'].local_qty == 6
+
+def test_live_updates_go_through_update_component(supabase):
+    calls = []
+    supabase.rpcs['update_component'] = lambda params: calls.append(params) or (
+        [dict(ROWS[0], quantity=params['p_fields']['quantity'])] if params['p_barcode'] == 'B1' else [])
+    source = LiveLookup(supabase)
+    assert source.update('B1', {'quantity': 7}, 'count', 'dock-1', 's1')['quantity'] == 7
+    # The database measures the movement, so no old quantity is sent
+    assert calls == [{'p_barcode': 'B1', 'p_fields': {'quantity': 7}, 'p_reason': 'count',
+                      'p_station': 'dock-1', 'p_session_id': 's1'}]
+    with pytest.raises(RuntimeError):
+        source.update('NOPE', {'quantity': 1})
@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import pytest
+from lookup_service import LookupService
+
+def components(supabase):
+    supabase.tables['components'] = [
+        {'barcode': 'B1', 'id': 'MSC001', 'description': 'Screw', 'quantity': 1, 'location': 'Assembly'},
+        {'barcode': 'B2', 'id': 'MSC002', 'description': 'Nut', 'quantity': 2, 'location': 'Assembly'},
+    ]
+    movements = []
+
+    def update_component(params):
+        rows = [row for row in supabase.tables['components'] if row['barcode'] == params['p_barcode']]
+        for row in rows:
+            movements.append((row['barcode'], params['p_fields'], params['p_reason'], params['p_station'],
+                              params['p_session_id']))
+            row.update(params['p_fields'])
+        return [dict(row) for row in rows]
+
+    supabase.rpcs['update_component'] = update_component
+    return movements
+
+def test_reload_serves_the_old_index_until_the_new_one_is_built(supabase):
+    components(supabase)
+    service = LookupService(supabase)
+    build = service._build
+    started, release = threading.Event(), threading.Event()
+
+    def slow_build(rows):
+        started.set()
+        release.wait(5)
+        return build(rows)
+
+    async def scenario():
+        await service.reload()
+        supabase.tables['components'].append({'barcode': 'B3', 'id': 'LAB003', 'description': 'Label',
+                                              'quantity': 0, 'location': 'Shipping'})
+        service._build = slow_build
+        reload = asyncio.create_task(service.reload())
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        # The loop keeps answering from the old catalog, and takes writes
+        assert [r[0] for r in service.index.search('msc')] == ['B1', 'B2']
+        assert service.lookup('LAB003') is None
+        assert (await service.update('B1', {'quantity': 5}))['quantity'] == 5
+        release.set()
+        await reload
+
+    asyncio.run(scenario())
+    assert service.lookup('LAB003')['barcode'] == 'B3'
+    assert service.index.search('label')[0][0] == 'B3'
+    # The write made during the build outlives the swap
+    assert service.lookup('B1')['quantity'] == 5
+
+def test_a_failed_reload_keeps_the_catalog(supabase):
+    components(supabase)
+    service = LookupService(supabase)
+    asyncio.run(service.reload())
+    supabase.fail_on = lambda query: True
+    with pytest.raises(ConnectionError):
+        asyncio.run(service.reload())
+    assert len(service.items) == 2 and service.pending is None
+
+def test_item_writes_record_their_movement_upstream(supabase):
+    movements = components(supabase)
+    service = LookupService(supabase)
+
+    async def scenario():
+        await service.reload()
+        status, row = await service.route('PATCH', '/items/B1?reason=count&station=dock-1&session_id=s1',
+                                          b'{"quantity": 4}')
+        assert status == 200 and row['quantity'] == 4
+        assert (await service.route('PATCH', '/items/B2', b'{"location": "Shipping"}'))[0] == 200
+        assert (await service.route('PATCH', '/items/B2?reason=steal', b'{"quantity": 0}'))[0] == 400
+        assert (await service.route('PATCH', '/items/NOPE', b'{"quantity": 1}'))[0] == 404
+
+    asyncio.run(scenario())
+    assert movements == [('B1', {'quantity': 4}, 'count', 'dock-1', 's1'),
+                         ('B2', {'location': 'Shipping'}, 'adjust', None, None)]
+    assert service.lookup('B2')['location'] == 'Shipping'
+
+def test_writes_need_the_token_and_reads_do_not(supabase):
+    components(supabase)
+    service = LookupService(supabase, token='s3cret')
+
+    async def scenario():
+        await service.reload()
+        body = b'{"quantity": 7}'
+        assert (await service.route('PATCH', '/items/B1', body))[0] == 403
+        assert (await service.route('PATCH', '/items/B1', body, {'x-service-token': 'wrong'}))[0] == 403
+        assert (await service.route('POST', '/refresh', b'{"codes": ["B1"]}'))[0] == 403
+        assert (await service.route('GET', '/items/B1', b''))[0] == 200
+        assert (await service.route('POST', '/lookup', b'{"codes": ["B1"]}'))[0] == 200
+        status, row = await service.route('PATCH', '/items/B1', body, {'x-service-token': 's3cret'})
+        assert status == 200 and row['quantity'] == 7
+
+    asyncio.run(scenario())
+    assert supabase.tables['components'][0]['quantity'] == 7
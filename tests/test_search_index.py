@@ -0,0 +1,136 @@
+import random
+import re
+import pytest
+from search_index import SearchIndex
+
+WORDS = ['GR', 'Flower/Smalls', 'Pouch', '14g', '28g', 'Jar', 'Mylar', '3.25”W', 'x', 'Inner', 'Label', 'THC',
+         'symbol', 'CT', 'Child-Resistant', 'Lid', 'Black', 'Blk', '1oz', 'Pre-Roll', 'Tube', 'Vape', 'Cart',
+         'Box', 'Insert', 'Sticker', 'a', 'ab', 'Abc', 'Screw', 'M3', 'Nut', '.5g', '10CT', 'Tincture']
+PREFIXES = ['MSC', 'LAB', 'PKG', 'RAW']
+
+def make_catalog(count, seed):
+    rng = random.Random(seed)
+    catalog = {}
+    for i in range(count):
+        id_str = f"{PREFIXES[i % 4]}{rng.randrange(10 ** rng.randint(2, 5)):0{rng.randint(3, 5)}d}-{i}"
+        description = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(0, 6))) or None
+        catalog[f"B{i:06d}"] = {'id': id_str, 'description': description}
+    return catalog
+
+def brute_force(entries, query, limit=20):
+    """The ranking SearchIndex promises, computed by scanning every item.
+
+    `entries` lists (barcode, id, description) in the order they were indexed.
+    """
+    query = query.strip().lower()
+    if not query:
+        return []
+    terms = query.split()
+    rows = []
+    for row, (barcode, id_str, description) in enumerate(entries):
+        text = f"{(id_str or '').lower()} {(description or '').lower()}"
+        words = ' ' + re.sub(r'[^0-9a-z.]+', ' ', text)
+        rows.append(((min(len(text), 0xFFFF), row), barcode, (id_str or '').lower(), text, words))
+    ranked = [barcode for _, barcode, id_lower, _, _ in rows if id_lower == query][-1:]
+    ranked += [barcode for id_lower, barcode in sorted((r[2], r[1]) for r in rows)
+               if id_lower.startswith(query) and barcode not in ranked][:limit]
+    rows.sort()
+    contains = [r for r in rows if all(term in r[3] for term in terms)]
+    ranked += [r[1] for r in contains if all(f" {term}" in r[4] for term in terms) and r[1] not in ranked]
+    ranked += [r[1] for r in contains if r[1] not in ranked]
+    by_barcode = {barcode: (id_str, description) for barcode, id_str, description in entries}
+    return [(barcode,) + by_barcode[barcode] for barcode in ranked[:limit]]
+
+def queries(catalog, count, seed):
+    """Queries shaped like manual lookups: IDs, ID prefixes, words, word parts and mixes of them."""
+    rng = random.Random(seed)
+    items = list(catalog.values())
+    found = []
+    for _ in range(count):
+        item = rng.choice(items)
+        text = f"{item['id']} {item['description'] or ''}"
+        words = text.split()
+        kind = rng.randrange(8)
+        if kind == 0:
+            query = item['id']
+        elif kind == 1:
+            query = item['id'][:rng.randint(1, len(item['id']))]
+        elif kind == 2:
+            start = rng.randrange(len(text))
+            query = text[start:start + rng.randint(1, 8)]
+        elif kind == 3:
+            query = ' '.join(rng.sample(words, min(len(words), rng.randint(1, 3))))
+        elif kind == 4:
+            query = ' '.join(word[:rng.randint(1, 3)] for word in rng.sample(words, min(len(words), 2)))
+        elif kind == 5:
+            query = ' '.join(rng.choice(WORDS)[:rng.randint(1, 2)] for _ in range(rng.randint(1, 2)))
+        elif kind == 6:
+            query = f"{rng.choice(WORDS)} {rng.choice(['zzz', 'q', 'x'])}"
+        else:
+            query = rng.choice(WORDS).upper()
+        found.append(query if rng.random() < 0.9 else f"  {query} ")
+    return found
+
+def entries_of(catalog):
+    return [(barcode, item['id'], item['description']) for barcode, item in catalog.items()]
+
+@pytest.fixture(scope='module')
+def catalog():
+    return make_catalog(3000, seed=1)
+
+@pytest.fixture(scope='module')
+def index(catalog):
+    return SearchIndex.from_catalog(catalog)
+
+@pytest.mark.parametrize('limit', [1, 5, 20])
+def test_search_matches_brute_force(catalog, index, limit):
+    entries = entries_of(catalog)
+    for query in queries(catalog, 400, seed=limit):
+        assert index.search(query, limit) == brute_force(entries, query, limit), query
+
+@pytest.mark.parametrize('query', ['x', 'a', 'ab', 'a x', 'm3', '3', '/'])
+def test_short_term_queries_match_brute_force(catalog, index, query):
+    assert index.search(query)
+    assert index.search(query) == brute_force(entries_of(catalog), query)
+
+def test_unknown_and_empty_queries(index):
+    assert index.search('nosuchthing') == []
+    assert index.search('zz') == []
+    assert index.search('   ') == []
+
+def test_exact_id_comes_first(catalog, index):
+    barcode, item = next(iter(catalog.items()))
+    assert index.search(item['id'].upper())[0][0] == barcode
+
+def test_add_and_remove_match_brute_force(catalog):
+    index = SearchIndex.from_catalog(catalog)
+    entries = entries_of(catalog)
+    rng = random.Random(5)
+    for barcode, _, _ in rng.sample(entries, 200):
+        index.remove(barcode)
+        entries = [entry for entry in entries if entry[0] != barcode]
+    for i in range(100):
+        barcode = rng.choice(entries)[0] if i % 2 else f"NEW{i}"
+        entry = (barcode, f"MSC{i:05d}", f"Added Pouch {i}g")
+        index.add(*entry)  # Re-adding an item moves it behind the others of its length
+        entries = [e for e in entries if e[0] != barcode] + [entry]
+    assert len(index) == len(entries)
+    current = {barcode: {'id': id_str, 'description': description} for barcode, id_str, description in entries}
+    for query in queries(current, 300, seed=6) + ['added', 'msc0', 'pouch 1']:
+        assert index.search(query) == brute_force(entries, query), query
+
+@pytest.mark.parametrize('changes', [10, 1000])
+def test_sync_matches_a_fresh_index(catalog, changes):
+    index = SearchIndex.from_catalog(catalog)
+    updated = dict(catalog)
+    rng = random.Random(changes)
+    for barcode in rng.sample(sorted(updated), changes):
+        updated[barcode] = {'id': updated[barcode]['id'], 'description': 'Synced Tube'}
+    del updated['B000000']
+    updated['SYNCED'] = {'id': 'SYN001', 'description': 'Synced Box'}
+    index.sync(updated)
+    fresh = SearchIndex.from_catalog(updated)
+    assert len(index) == len(updated)
+    for query in ['synced', 'synced tube', 'syn001', 'tube', 'b', 'msc'] + queries(updated, 100, seed=9):
+        # A small sync re-adds changed items behind the others, so only the matches are compared
+        assert sorted(index.search(query, 5000)) == sorted(fresh.search(query, 5000)), query
@@ -0,0 +1,56 @@
+import itertools
+import threading
+import traceback
+import tkinter as tk
+
+# Thread-safe hand-off to the Tk thread
+class UIDispatcher:
+    """Collect UI updates from background threads and apply them once per frame.
+
+    Worker threads call `post` (or `set` for a Tk variable) instead of
+    touching widgets or calling `root.after` themselves. The Tk thread
+    drains everything posted every `frame_ms` ms, in the order it was
+    posted. A call posted with a `key` replaces any call with the same key
+    that has not run yet, so a burst of status messages or search results
+    costs one update per frame; calls without a key always run.
+    """
+
+    def __init__(self, root, frame_ms=16):
+        self.root = root
+        self.frame_ms = frame_ms
+        self.lock = threading.Lock()
+        self.calls = {}  # {key: (func, args)} in posting order
+        self.sequence = itertools.count()
+        self.job = root.after(frame_ms, self._drain)
+
+    def post(self, func, *args, key=None):
+        with self.lock:
+            if key is None:
+                key = next(self.sequence)
+            else:
+                # The latest update wins and runs in the latest position
+                self.calls.pop(key, None)
+            self.calls[key] = (func, args)
+
+    def set(self, variable, value):
+        """Set a Tk variable from any thread; only the last value per frame is applied."""
+        self.post(variable.set, value, key=('set', str(variable)))
+
+    def flush(self):
+        """Run everything posted so far right away; call on the Tk thread."""
+        with self.lock:
+            calls, self.calls = self.calls, {}
+        for func, args in calls.values():
+            try:
+                func(*args)
+            except tk.TclError:
+                pass  # The widget went away before the update arrived
+            except Exception:
+                traceback.print_exc()
+
+    def _drain(self):
+        self.flush()
+        try:
+            self.job = self.root.after(self.frame_ms, self._drain)
+        except tk.TclError:
+            self.job = None  # The window has closed
@@ -0,0 +1,148 @@
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, defaultdict
+from datetime import datetime
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+TKINTER_FILE = os.path.join('tkinter', '__init__.py')
+
+# Main-loop stall detector
+class StallMonitor:
+    """Find the moments a Tk window freezes and the callback responsible.
+
+    A heartbeat `after` timer runs on the Tk thread every `interval` ms. A
+    watchdog thread notices when the heartbeat is more than `threshold` ms
+    late and samples the Tk thread's stack every `sample_interval` ms until
+    it returns. Each stall is attributed to the callback Tk was running (the
+    first frame below Tkinter's event dispatch) and to the application line
+    it was waiting in. `stop` writes a report grouped by callback.
+    """
+
+    def __init__(self, root, name, threshold=200, interval=50, sample_interval=20, report_dir='profiles'):
+        self.root = root
+        self.name = name
+        self.threshold = threshold / 1000
+        self.interval = interval
+        self.sample_interval = sample_interval / 1000
+        self.report_dir = report_dir
+        self.main_ident = threading.get_ident()
+        self.stalls = []  # [{'at', 'duration', 'callback', 'samples'}]
+        self.started = time.perf_counter()
+        self.last_beat = self.started
+        self.beat_job = None
+        self.stopped = threading.Event()
+        self.watcher = threading.Thread(target=self._watch, daemon=True)
+
+    def start(self):
+        self.beat_job = self.root.after(self.interval, self._beat)
+        self.watcher.start()
+        print(f"Profiling UI stalls over {self.threshold * 1000:.0f} ms")
+        return self
+
+    def _beat(self):
+        self.last_beat = time.perf_counter()
+        self.beat_job = self.root.after(self.interval, self._beat)
+
+    def _watch(self):
+        beat, samples = None, []
+        while not self.stopped.wait(self.sample_interval):
+            last_beat = self.last_beat
+            if beat is not None and last_beat != beat:
+                # The heartbeat came back: the stall is over
+                self._record(beat, last_beat, samples)
+                beat, samples = None, []
+            if time.perf_counter() - last_beat - self.interval / 1000 > self.threshold:
+                beat = last_beat
+                frame = sys._current_frames().get(self.main_ident)
+                if frame is not None:
+                    samples.append(tuple((f.filename, f.lineno, f.name) for f in traceback.extract_stack(frame)))
+                del frame
+
+    def _record(self, beat, resumed, samples):
+        duration = resumed - beat - self.interval / 1000
+        callback = Counter(callback_frame(stack) for stack in samples).most_common(1)
+        callback = callback[0][0] if callback else None
+        self.stalls.append({'at': datetime.now(), 'duration': duration, 'callback': callback, 'samples': samples})
+        print(f"UI stall: {duration * 1000:.0f} ms in {describe(callback)}")
+
+    def stop(self):
+        """Stop sampling and write the report; returns its path."""
+        if self.beat_job is not None:
+            try:
+                self.root.after_cancel(self.beat_job)
+            except Exception:
+                pass
+        self.stopped.set()
+        self.watcher.join()
+        os.makedirs(self.report_dir, exist_ok=True)
+        path = os.path.join(self.report_dir, f"{self.name}_stalls_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.report())
+        print(f"UI stall report written to {path}")
+        return path
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        frozen = sum(stall['duration'] for stall in self.stalls)
+        lines = [
+            f"UI stall report for {self.name}",
+            f"Profiled {elapsed:.0f} s, heartbeat {self.interval} ms, threshold {self.threshold * 1000:.0f} ms",
+            f"{len(self.stalls)} stalls, {frozen:.2f} s frozen in total",
+            "",
+            "By callback (slowest total first):"
+        ]
+        by_callback = defaultdict(list)
+        for stall in self.stalls:
+            by_callback[stall['callback']].append(stall)
+        for callback, stalls in sorted(by_callback.items(), key=lambda item: -sum(s['duration'] for s in item[1])):
+            durations = [stall['duration'] for stall in stalls]
+            lines.append(f"  {describe(callback)}: {len(stalls)} stalls, total {sum(durations):.2f} s, "
+                         f"max {max(durations):.2f} s")
+            # Where the callback was waiting, by share of stack samples
+            waits = Counter(app_frame(stack) for stall in stalls for stack in stall['samples'])
+            total = sum(waits.values())
+            for frame, count in waits.most_common(5):
+                lines.append(f"      {count / total:4.0%}  {describe(frame)}")
+        lines += ["", "Stalls:"]
+        for stall in self.stalls:
+            lines.append(f"  {stall['at'].strftime('%H:%M:%S')}  {stall['duration'] * 1000:6.0f} ms  "
+                         f"{describe(stall['callback'])}")
+            if stall['samples']:
+                lines.extend(f"      {describe(frame)}" for frame in stall['samples'][len(stall['samples']) // 2][-8:])
+        return "\n".join(lines) + "\n"
+
+def callback_frame(stack):
+    """Return the first application frame below Tkinter's event dispatch."""
+    dispatched = False
+    for frame in stack:
+        if frame[0].endswith(TKINTER_FILE):
+            dispatched = dispatched or frame[2] == '__call__'
+        elif dispatched:
+            return frame
+    return app_frame(stack)
+
+def app_frame(stack):
+    """Return the innermost frame in this application's own files."""
+    for frame in reversed(stack):
+        if os.path.dirname(os.path.abspath(frame[0])) == APP_DIR:
+            return frame
+    return stack[-1] if stack else None
+
+def describe(frame):
+    if frame is None:
+        return "unknown"
+    filename, lineno, name = frame
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+def start_profiling(root, config, name):
+    """Start a StallMonitor when [PROFILE] ENABLED is set in config.ini; returns it or None."""
+    if not config.getboolean('PROFILE', 'ENABLED', fallback=False):
+        return None
+    return StallMonitor(
+        root, name,
+        threshold=config.getint('PROFILE', 'THRESHOLD_MS', fallback=200),
+        report_dir=config.get('PROFILE', 'REPORT_DIR', fallback='profiles')
+    ).start()
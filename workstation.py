@@ -0,0 +1,59 @@
+import threading
+from supabase import create_client
+from catalog import load_catalog
+from connection_monitor import ConnectionMonitor, database_probe
+from lookup_client import lookup_source
+
+clients = {}  # {(url, key): Supabase client} for this process
+
+def shared_client(url, key):
+    """Return this process's Supabase client for `url`, creating it on first use.
+
+    Tools imported into one launcher process share the client, and with it
+    one pool of HTTP connections.
+    """
+    if (url, key) not in clients:
+        clients[(url, key)] = create_client(url, key)
+    return clients[(url, key)]
+
+# Services shared by the tools hosted in one launcher process
+class Workstation:
+    """One connection heartbeat and catalog per location for every hosted tool.
+
+    The scanner, cycle count dashboard and inventory manager take an
+    optional Workstation; without one (run on their own) they start their
+    own. `catalog(location)` loads a location's catalog once and hands the
+    same read-only copy to every tool; `refresh=True` reloads it, e.g. after
+    an import.
+    """
+
+    def __init__(self, supabase, station, service_url=None, catalog_cache=None, service_token=None):
+        self.supabase = supabase
+        self.station = station
+        self.catalog_cache = catalog_cache
+        self.monitor = ConnectionMonitor(database_probe(supabase, lookup_source(supabase, service_url, service_token)))
+        self.catalogs = {}  # {location or None: CompactCatalog}
+        self.lock = threading.Lock()
+
+    def start(self):
+        self.monitor.start()
+        return self
+
+    def catalog(self, location=None, refresh=False):
+        with self.lock:
+            if refresh or location not in self.catalogs:
+                self.catalogs[location] = load_catalog(self.supabase, self.catalog_cache, location, refresh)
+            return self.catalogs[location]
+
+    def preload(self, on_loaded=None):
+        """Load the whole catalog in the background so the first tool opens at once."""
+        def perform_load():
+            try:
+                catalog = self.catalog()
+            except Exception as e:
+                print(f"Error preloading catalog: {e}")
+                return
+            if on_loaded:
+                on_loaded(catalog)
+
+        threading.Thread(target=perform_load, daemon=True).start()
@@ -0,0 +1,69 @@
+import queue
+import threading
+from collections import Counter
+
+# Background database writes for optimistic UI updates
+class WriteQueue:
+    """Run database writes in order on one worker thread, off the Tk thread.
+
+    The UI shows a change at once and calls `submit(key, write, on_success,
+    on_failure)`; `write()` runs on the worker, then `on_success(result)` or
+    `on_failure(error)` runs on the Tk thread. `key` names the item written,
+    so a failed write can check `pending(key)` and leave the display alone
+    when a newer write for the same item is still on its way. `on_pending`
+    is called on the Tk thread with the number of unfinished writes whenever
+    it changes, for a "saving" indicator.
+    """
+
+    def __init__(self, ui, on_pending=None):
+        self.ui = ui
+        self.on_pending = on_pending
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.keys = Counter()  # {key: unfinished writes}
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, key, write, on_success=None, on_failure=None):
+        with self.lock:
+            self.keys[key] += 1
+        self.queue.put((key, write, on_success, on_failure))
+        self._report()
+
+    def pending(self, key=None):
+        with self.lock:
+            return self.keys[key] if key is not None else sum(self.keys.values())
+
+    def _report(self):
+        if self.on_pending:
+            self.on_pending(self.pending())
+
+    def _run(self):
+        while True:
+            key, write, on_success, on_failure = self.queue.get()
+            try:
+                result, error = write(), None
+            except Exception as e:
+                result, error = None, str(e)
+            with self.lock:
+                self.keys[key] -= 1
+                if not self.keys[key]:
+                    del self.keys[key]
+            self.ui.post(self._finish, result, error, on_success, on_failure)
+            self.queue.task_done()
+
+    def _finish(self, result, error, on_success, on_failure):
+        if error is None:
+            if on_success:
+                on_success(result)
+        elif on_failure:
+            on_failure(error)
+        self._report()
+
+    def wait(self):
+        """Block until every submitted write has run and its callbacks are done.
+
+        Call on the Tk thread, e.g. before closing the window.
+        """
+        self.queue.join()
+        self.ui.flush()
@@ -0,0 +1,81 @@
+import argparse
+import os
+import socket
+from datetime import datetime
+
+# Native ZPL labels for Zebra thermal printers
+#
+# Each label is a few hundred bytes of printer commands: the ID as printer
+# text and a printer-drawn Code 128 barcode, so nothing is rasterized on
+# this side and the printer runs at full speed on its own label stock.
+
+def field(text):
+    """Return ^FH^FD data for `text`, with the ZPL control characters hex-escaped."""
+    text = str(text)
+    for char in '_^~':
+        text = text.replace(char, f"_{ord(char):02X}")
+    return f"^FH^FD{text}^FS"
+
+def label_zpl(id_str, width=4, height=1.5, dpi=203, include_id=True):
+    """Return the ZPL for one label of `width` x `height` inches with the ID and its Code 128 barcode."""
+    width_dots, height_dots = round(width * dpi), round(height * dpi)
+    margin = max(8, dpi // 20)
+    text_height = round(dpi * 0.14)
+    # Widest bars that still fit: Code 128 takes 11 modules per character,
+    # plus the start, check and stop characters and the quiet zones
+    modules = 11 * (len(str(id_str)) + 3) + 2 + 20
+    module = max(1, min(3, (width_dots - 2 * margin) // modules))
+    top = margin
+    lines = ["^XA", "^CI28", f"^PW{width_dots}", f"^LL{height_dots}", "^LH0,0"]
+    if include_id:
+        lines.append(f"^FO{margin},{top}^A0N,{text_height},{text_height}{field(id_str)}")
+        top += text_height + margin
+    bar_height = max(dpi // 8, height_dots - top - margin)
+    lines.append(f"^FO{margin},{top}^BY{module}^BCN,{bar_height},N,N,N,A{field(id_str)}")
+    lines.append("^XZ")
+    return "\n".join(lines) + "\n"
+
+def labels_zpl(ids, width=4, height=1.5, dpi=203, include_id=True):
+    """Return one print job with a label per ID."""
+    return "".join(label_zpl(id_str, width, height, dpi, include_id) for id_str in ids)
+
+def send_zpl(zpl, host, port=9100, timeout=10):
+    """Send a print job to a printer's raw socket (port 9100); returns the bytes sent."""
+    data = zpl.encode('utf-8')
+    with socket.create_connection((host, port), timeout=timeout) as connection:
+        connection.sendall(data)
+    return len(data)
+
+def write_zpl(zpl, path):
+    """Save a print job to a .zpl file, e.g. to copy to a printer share later."""
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(zpl)
+    return path
+
+def listen(host='127.0.0.1', port=9100, directory='zpl_jobs'):
+    """Stand in for a label printer: save every job sent to host:port as a .zpl file."""
+    os.makedirs(directory, exist_ok=True)
+    with socket.create_server((host, port)) as server:
+        print(f"Listening for print jobs on {host}:{port}; saving them to {directory}/")
+        while True:
+            connection, address = server.accept()
+            with connection:
+                chunks = []
+                while True:
+                    chunk = connection.recv(65536)
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+            data = b"".join(chunks)
+            path = os.path.join(directory, f"job_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.zpl")
+            with open(path, 'wb') as f:
+                f.write(data)
+            print(f"{address[0]}: {data.count(b'^XA')} labels, {len(data)} bytes -> {path}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a stand-in label printer that saves the ZPL jobs it receives.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9100)
+    parser.add_argument('--directory', default='zpl_jobs')
+    args = parser.parse_args()
+    listen(args.host, args.port, args.directory)